@@ -65,6 +65,7 @@ def initialize_extensions(app: DifyApp):
         ext_mail,
         ext_migrate,
         ext_otel,
+        ext_plugin_model_cache,
         ext_proxy_fix,
         ext_redis,
         ext_request_logging,
@@ -92,6 +93,7 @@ def initialize_extensions(app: DifyApp):
         ext_login,
         ext_mail,
         ext_hosting_provider,
+        ext_plugin_model_cache,
         ext_sentry,
         ext_proxy_fix,
         ext_blueprints,
@@ -5,6 +5,7 @@ from pydantic import (
     Field,
     HttpUrl,
     NegativeInt,
+    NonNegativeFloat,
     NonNegativeInt,
     PositiveFloat,
     PositiveInt,
@@ -74,6 +75,15 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of requests per app per day",
         default=5000,
     )
+    APP_STREAM_CHUNK_COALESCE_WINDOW: NonNegativeFloat = Field(
+        description="Time (in seconds) consecutive text chunks of a streamed answer are waited for to be sent together,"
+        " 0 to only merge the chunks already queued. The first chunk is never delayed.",
+        default=0.02,
+    )
+    APP_STREAM_CHUNK_COALESCE_MAX_LENGTH: NonNegativeInt = Field(
+        description="Maximum length of text chunks merged into one streamed event, 0 to disable merging.",
+        default=1000,
+    )
 
 
 class CodeExecutionSandboxConfig(BaseSettings):
@@ -106,6 +116,27 @@ class CodeExecutionSandboxConfig(BaseSettings):
         default=10.0,
     )
 
+    CODE_EXECUTION_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of concurrent connections to the code execution service",
+        default=100,
+    )
+
+    CODE_EXECUTION_POOL_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of idle connections kept open to the code execution service",
+        default=20,
+    )
+
+    CODE_EXECUTION_POOL_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        description="Seconds an idle connection to the code execution service is kept open",
+        default=5.0,
+    )
+
+    CODE_EXECUTION_BATCH_SIZE: NonNegativeInt = Field(
+        description="Maximum number of iterations of a code node sent to the code execution service in one request,"
+        " 0 to disable batch execution",
+        default=50,
+    )
+
     CODE_MAX_NUMBER: PositiveInt = Field(
         description="Maximum allowed numeric value in code execution",
         default=9223372036854775807,
@@ -146,6 +177,32 @@ class CodeExecutionSandboxConfig(BaseSettings):
         default=1000,
     )
 
+    JINJA2_RENDER_IN_PROCESS: bool = Field(
+        description="Render Jinja2 templates in process with a sandboxed environment,"
+        " templates the sandbox does not allow are still sent to the code execution service",
+        default=True,
+    )
+
+    JINJA2_RENDER_MAX_OUTPUT_LENGTH: PositiveInt = Field(
+        description="Maximum length of the output of a Jinja2 template rendered in process",
+        default=1000000,
+    )
+
+    JINJA2_RENDER_MAX_CALL_DEPTH: PositiveInt = Field(
+        description="Maximum depth of nested macro and recursive loop calls of a Jinja2 template rendered in process",
+        default=64,
+    )
+
+    JINJA2_RENDER_MAX_OPERATIONS: PositiveInt = Field(
+        description="Maximum number of loop iterations and calls of a Jinja2 template rendered in process",
+        default=1000000,
+    )
+
+    JINJA2_TEMPLATE_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled Jinja2 templates kept in memory per process, 0 to disable the cache",
+        default=512,
+    )
+
 
 class PluginConfig(BaseSettings):
     """
@@ -184,6 +241,51 @@ class PluginConfig(BaseSettings):
         default=15728640 * 12,
     )
 
+    PLUGIN_DAEMON_POOL_CONNECTIONS: PositiveInt = Field(
+        description="Number of connection pools kept by the plugin daemon client",
+        default=10,
+    )
+
+    PLUGIN_DAEMON_POOL_MAXSIZE: PositiveInt = Field(
+        description="Maximum number of keep-alive connections per pool of the plugin daemon client",
+        default=100,
+    )
+
+    PLUGIN_DAEMON_CONNECT_TIMEOUT: PositiveFloat = Field(
+        description="Timeout in seconds for connecting to the plugin daemon",
+        default=10.0,
+    )
+
+    PLUGIN_DAEMON_READ_TIMEOUT: Optional[PositiveFloat] = Field(
+        description="Timeout in seconds between bytes received from the plugin daemon, None to wait indefinitely",
+        default=None,
+    )
+
+    PLUGIN_DAEMON_MAX_RETRIES: NonNegativeInt = Field(
+        description="Maximum retries when connecting to the plugin daemon fails",
+        default=3,
+    )
+
+    PLUGIN_MODEL_SCHEMA_CACHE_TTL: NonNegativeInt = Field(
+        description="Seconds model schemas of plugins are cached across requests, 0 to disable",
+        default=3600,
+    )
+
+    PLUGIN_MODEL_PROVIDERS_CACHE_TTL: NonNegativeInt = Field(
+        description="Seconds plugin model providers of a workspace are cached across requests, 0 to disable",
+        default=60,
+    )
+
+    PLUGIN_MODEL_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of model schemas and workspaces of plugin model providers cached per process",
+        default=1024,
+    )
+
+    PLUGIN_MODEL_CACHE_WARM_UP_SIZE: NonNegativeInt = Field(
+        description="Number of recently used model schemas loaded into the process cache on start, 0 to disable",
+        default=256,
+    )
+
 
 class MarketplaceConfig(BaseSettings):
     """
@@ -397,6 +499,21 @@ class HttpConfig(BaseSettings):
         default=5,
     )
 
+    SSRF_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of concurrent connections of each shared SSRF proxy client",
+        default=100,
+    )
+
+    SSRF_POOL_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of idle keep-alive connections of each shared SSRF proxy client",
+        default=20,
+    )
+
+    SSRF_POOL_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        description="Seconds an idle keep-alive connection of the SSRF proxy clients is kept open",
+        default=5.0,
+    )
+
     RESPECT_XFORWARD_HEADERS_ENABLED: bool = Field(
         description="Enable handling of X-Forwarded-For, X-Forwarded-Proto, and X-Forwarded-Port headers"
         " when the app is behind a single trusted reverse proxy.",
@@ -460,6 +577,26 @@ class LoggingConfig(BaseSettings):
         default="UTC",
     )
 
+    CHAT_LOG_QUEUE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of chat interaction logs waiting to be written, further logs are dropped",
+        default=10000,
+    )
+
+    CHAT_LOG_BATCH_SIZE: PositiveInt = Field(
+        description="Maximum number of chat interaction logs inserted in one batch",
+        default=100,
+    )
+
+    CHAT_LOG_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Seconds the chat log writer waits for new logs before checking for shutdown",
+        default=1.0,
+    )
+
+    CHAT_LOG_ENQUEUE_TIMEOUT: NonNegativeFloat = Field(
+        description="Seconds a request waits for room in a full chat log queue before the log is dropped",
+        default=0.05,
+    )
+
 
 class ModelLoadBalanceConfig(BaseSettings):
     """
@@ -476,6 +613,17 @@ class ModelLoadBalanceConfig(BaseSettings):
         default=False,
     )
 
+    PROVIDER_CONFIGURATIONS_CACHE_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) the model provider configurations of a workspace are reused by model"
+        " invocations in each process, 0 to disable the cache. Changes made to them invalidate it right away.",
+        default=60,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of workspaces whose model provider configurations are cached in each process.",
+        default=128,
+    )
+
 
 class BillingConfig(BaseSettings):
     """
@@ -529,6 +677,11 @@ class WorkflowConfig(BaseSettings):
         default=200 * 1024,
     )
 
+    WORKFLOW_COMPILED_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of parsed workflow graphs kept in memory per process, 0 to disable the cache",
+        default=256,
+    )
+
 
 class WorkflowNodeExecutionConfig(BaseSettings):
     """
@@ -542,7 +695,18 @@ class WorkflowNodeExecutionConfig(BaseSettings):
 
     WORKFLOW_NODE_EXECUTION_STORAGE: str = Field(
         default="rdbms",
-        description="Storage backend for WorkflowNodeExecution. Options: 'rdbms', 'hybrid'",
+        description="Storage backend for WorkflowNodeExecution. Options: 'rdbms', 'hybrid', 'write_behind'. "
+        "'write_behind' buffers node executions and writes them in batches instead of on every update",
+    )
+
+    WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_BATCH_SIZE: PositiveInt = Field(
+        description="Number of buffered node executions that triggers a write with the 'write_behind' storage",
+        default=100,
+    )
+
+    WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Maximum seconds a node execution stays buffered with the 'write_behind' storage",
+        default=2.0,
     )
 
 
@@ -633,6 +797,23 @@ class AuthConfig(BaseSettings):
         default=86400,
     )
 
+    API_TOKEN_AUTH_CACHE_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) service API tokens and their app and workspace are cached in redis,"
+        " 0 to disable the cache.",
+        default=60,
+    )
+
+    API_TOKEN_AUTH_LOCAL_CACHE_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) service API tokens and their app and workspace are cached in each process,"
+        " 0 to disable the in-process cache.",
+        default=5,
+    )
+
+    API_TOKEN_LAST_USED_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Interval (in seconds) at which the last used time of service API tokens is written.",
+        default=10.0,
+    )
+
 
 class ModerationConfig(BaseSettings):
     """
@@ -865,6 +1046,18 @@ class CeleryScheduleTasksConfig(BaseSettings):
         description="Enable check upgradable plugin task",
         default=True,
     )
+    ENABLE_APP_STATISTIC_ROLLUP_TASK: bool = Field(
+        description="Enable the task that rolls messages up into hourly per-app statistics",
+        default=False,
+    )
+    APP_STATISTIC_ROLLUP_DELAY: PositiveInt = Field(
+        description="Minutes an hour is left open before it is rolled up, so answers still in progress are complete",
+        default=60,
+    )
+    APP_STATISTIC_ROLLUP_MAX_HOURS_PER_RUN: PositiveInt = Field(
+        description="Maximum number of hours rolled up by one run of the rollup task, limits the initial backfill",
+        default=24 * 7,
+    )
 
 
 class PositionConfig(BaseSettings):
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import Field, NonNegativeInt
+from pydantic import Field, NonNegativeFloat, NonNegativeInt
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +10,12 @@ class HostedCreditConfig(BaseSettings):
         default="",
     )
 
+    HOSTED_QUOTA_FLUSH_INTERVAL: NonNegativeFloat = Field(
+        description="Interval (in seconds) at which quota deductions of hosted providers are written in batches,"
+        " 0 to write each deduction directly.",
+        default=5.0,
+    )
+
     def get_model_credits(self, model_name: str) -> int:
         """
         Get credit value for a specific model name.
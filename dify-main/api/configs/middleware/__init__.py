@@ -94,11 +94,27 @@ class VectorStoreConfig(BaseSettings):
         default="Vector_index",
     )
 
+    VECTOR_STORE_CLIENT_POOL_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of vector store clients and connection pools kept alive per process.",
+        default=16,
+    )
+
+    VECTOR_STORE_CLIENT_IDLE_TIMEOUT: PositiveInt = Field(
+        description="Seconds after which an unused vector store client is closed.",
+        default=600,
+    )
+
+    VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL: NonNegativeInt = Field(
+        description="Minimum seconds between health checks of a shared vector store client.",
+        default=60,
+    )
+
 
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
         description="Method for keyword extraction and storage."
-        " Default is 'jieba', a Chinese text segmentation library.",
+        " Default is 'jieba', a Chinese text segmentation library."
+        " 'jieba_inverted_index' stores per-keyword postings instead of one keyword table per dataset.",
         default="jieba",
     )
 
@@ -12,6 +12,7 @@ from libs.helper import TimestampField
 from libs.login import login_required
 from models.dataset import Dataset
 from models.model import ApiToken, App
+from services.api_token_service import ApiTokenAuthCache
 
 from . import api
 from .wraps import account_initialization_required, setup_required
@@ -130,6 +131,9 @@ class BaseApiKeyResource(Resource):
 
         db.session.query(ApiToken).where(ApiToken.id == api_key_id).delete()
         db.session.commit()
+        # abort raises, but it is not typed as such
+        if key is not None:
+            ApiTokenAuthCache.invalidate_api_token(key.token, key.type)
 
         return {"result": "success"}, 204
 
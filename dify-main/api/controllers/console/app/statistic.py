@@ -15,6 +15,7 @@ from extensions.ext_database import db
 from libs.helper import DatetimeString
 from libs.login import login_required
 from models import AppMode, Message
+from services.app_statistic_service import AppStatisticService
 
 
 class DailyMessageStatistic(Resource):
@@ -30,18 +31,10 @@ class DailyMessageStatistic(Resource):
         parser.add_argument("end", type=DatetimeString("%Y-%m-%d %H:%M"), location="args")
         args = parser.parse_args()
 
-        sql_query = """SELECT
-    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
-    COUNT(*) AS message_count
-FROM
-    messages
-WHERE
-    app_id = :app_id"""
-        arg_dict = {"tz": account.timezone, "app_id": app_model.id}
-
         timezone = pytz.timezone(account.timezone)
         utc_timezone = pytz.utc
 
+        start_datetime_utc = None
         if args["start"]:
             start_datetime = datetime.strptime(args["start"], "%Y-%m-%d %H:%M")
             start_datetime = start_datetime.replace(second=0)
@@ -49,9 +42,7 @@ WHERE
             start_datetime_timezone = timezone.localize(start_datetime)
             start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at >= :start"
-            arg_dict["start"] = start_datetime_utc
-
+        end_datetime_utc = None
         if args["end"]:
             end_datetime = datetime.strptime(args["end"], "%Y-%m-%d %H:%M")
             end_datetime = end_datetime.replace(second=0)
@@ -59,10 +50,18 @@ WHERE
             end_datetime_timezone = timezone.localize(end_datetime)
             end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at < :end"
-            arg_dict["end"] = end_datetime_utc
+        # rolled up hours are read from the hourly rollups, only the rest is scanned in messages
+        messages_query, arg_dict = AppStatisticService.message_facts_query(
+            app_model.id, account.timezone, start_datetime_utc, end_datetime_utc
+        )
+        arg_dict["tz"] = account.timezone
 
-        sql_query += " GROUP BY date ORDER BY date"
+        sql_query = f"""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    SUM(message_count) AS message_count
+FROM
+    ({messages_query}) AS messages
+GROUP BY date ORDER BY date"""
 
         response_data = []
 
@@ -196,19 +195,10 @@ class DailyTokenCostStatistic(Resource):
         parser.add_argument("end", type=DatetimeString("%Y-%m-%d %H:%M"), location="args")
         args = parser.parse_args()
 
-        sql_query = """SELECT
-    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
-    (SUM(messages.message_tokens) + SUM(messages.answer_tokens)) AS token_count,
-    SUM(total_price) AS total_price
-FROM
-    messages
-WHERE
-    app_id = :app_id"""
-        arg_dict = {"tz": account.timezone, "app_id": app_model.id}
-
         timezone = pytz.timezone(account.timezone)
         utc_timezone = pytz.utc
 
+        start_datetime_utc = None
         if args["start"]:
             start_datetime = datetime.strptime(args["start"], "%Y-%m-%d %H:%M")
             start_datetime = start_datetime.replace(second=0)
@@ -216,9 +206,7 @@ WHERE
             start_datetime_timezone = timezone.localize(start_datetime)
             start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at >= :start"
-            arg_dict["start"] = start_datetime_utc
-
+        end_datetime_utc = None
         if args["end"]:
             end_datetime = datetime.strptime(args["end"], "%Y-%m-%d %H:%M")
             end_datetime = end_datetime.replace(second=0)
@@ -226,10 +214,18 @@ WHERE
             end_datetime_timezone = timezone.localize(end_datetime)
             end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at < :end"
-            arg_dict["end"] = end_datetime_utc
+        messages_query, arg_dict = AppStatisticService.message_facts_query(
+            app_model.id, account.timezone, start_datetime_utc, end_datetime_utc
+        )
+        arg_dict["tz"] = account.timezone
 
-        sql_query += " GROUP BY date ORDER BY date"
+        sql_query = f"""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    CAST(SUM(messages.message_tokens) + SUM(messages.answer_tokens) AS BIGINT) AS token_count,
+    SUM(total_price) AS total_price
+FROM
+    ({messages_query}) AS messages
+GROUP BY date ORDER BY date"""
 
         response_data = []
 
@@ -398,18 +394,10 @@ class AverageResponseTimeStatistic(Resource):
         parser.add_argument("end", type=DatetimeString("%Y-%m-%d %H:%M"), location="args")
         args = parser.parse_args()
 
-        sql_query = """SELECT
-    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
-    AVG(provider_response_latency) AS latency
-FROM
-    messages
-WHERE
-    app_id = :app_id"""
-        arg_dict = {"tz": account.timezone, "app_id": app_model.id}
-
         timezone = pytz.timezone(account.timezone)
         utc_timezone = pytz.utc
 
+        start_datetime_utc = None
         if args["start"]:
             start_datetime = datetime.strptime(args["start"], "%Y-%m-%d %H:%M")
             start_datetime = start_datetime.replace(second=0)
@@ -417,9 +405,7 @@ WHERE
             start_datetime_timezone = timezone.localize(start_datetime)
             start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at >= :start"
-            arg_dict["start"] = start_datetime_utc
-
+        end_datetime_utc = None
         if args["end"]:
             end_datetime = datetime.strptime(args["end"], "%Y-%m-%d %H:%M")
             end_datetime = end_datetime.replace(second=0)
@@ -427,10 +413,17 @@ WHERE
             end_datetime_timezone = timezone.localize(end_datetime)
             end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at < :end"
-            arg_dict["end"] = end_datetime_utc
+        messages_query, arg_dict = AppStatisticService.message_facts_query(
+            app_model.id, account.timezone, start_datetime_utc, end_datetime_utc
+        )
+        arg_dict["tz"] = account.timezone
 
-        sql_query += " GROUP BY date ORDER BY date"
+        sql_query = f"""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    SUM(provider_response_latency) / SUM(message_count) AS latency
+FROM
+    ({messages_query}) AS messages
+GROUP BY date ORDER BY date"""
 
         response_data = []
 
@@ -455,21 +448,10 @@ class TokensPerSecondStatistic(Resource):
         parser.add_argument("end", type=DatetimeString("%Y-%m-%d %H:%M"), location="args")
         args = parser.parse_args()
 
-        sql_query = """SELECT
-    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
-    CASE
-        WHEN SUM(provider_response_latency) = 0 THEN 0
-        ELSE (SUM(answer_tokens) / SUM(provider_response_latency))
-    END as tokens_per_second
-FROM
-    messages
-WHERE
-    app_id = :app_id"""
-        arg_dict = {"tz": account.timezone, "app_id": app_model.id}
-
         timezone = pytz.timezone(account.timezone)
         utc_timezone = pytz.utc
 
+        start_datetime_utc = None
         if args["start"]:
             start_datetime = datetime.strptime(args["start"], "%Y-%m-%d %H:%M")
             start_datetime = start_datetime.replace(second=0)
@@ -477,9 +459,7 @@ WHERE
             start_datetime_timezone = timezone.localize(start_datetime)
             start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at >= :start"
-            arg_dict["start"] = start_datetime_utc
-
+        end_datetime_utc = None
         if args["end"]:
             end_datetime = datetime.strptime(args["end"], "%Y-%m-%d %H:%M")
             end_datetime = end_datetime.replace(second=0)
@@ -487,10 +467,20 @@ WHERE
             end_datetime_timezone = timezone.localize(end_datetime)
             end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at < :end"
-            arg_dict["end"] = end_datetime_utc
+        messages_query, arg_dict = AppStatisticService.message_facts_query(
+            app_model.id, account.timezone, start_datetime_utc, end_datetime_utc
+        )
+        arg_dict["tz"] = account.timezone
 
-        sql_query += " GROUP BY date ORDER BY date"
+        sql_query = f"""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    CASE
+        WHEN SUM(provider_response_latency) = 0 THEN 0
+        ELSE (SUM(answer_tokens) / SUM(provider_response_latency))
+    END as tokens_per_second
+FROM
+    ({messages_query}) AS messages
+GROUP BY date ORDER BY date"""
 
         response_data = []
 
@@ -31,6 +31,7 @@ from fields.document_fields import document_status_fields
 from libs.login import login_required
 from models import ApiToken, Dataset, Document, DocumentSegment, UploadFile
 from models.dataset import DatasetPermissionEnum
+from services.api_token_service import ApiTokenAuthCache
 from services.dataset_service import DatasetPermissionService, DatasetService, DocumentService
 
 
@@ -633,6 +634,9 @@ class DatasetApiDeleteApi(Resource):
 
         db.session.query(ApiToken).where(ApiToken.id == api_key_id).delete()
         db.session.commit()
+        # abort raises, but it is not typed as such
+        if key is not None:
+            ApiTokenAuthCache.invalidate_api_token(key.token, key.type)
 
         return {"result": "success"}, 204
 
@@ -1,6 +1,5 @@
 import time
 from collections.abc import Callable
-from datetime import timedelta
 from enum import Enum
 from functools import wraps
 from typing import Optional
@@ -9,17 +8,17 @@ from flask import current_app, request
 from flask_login import user_logged_in  # type: ignore
 from flask_restful import Resource
 from pydantic import BaseModel
-from sqlalchemy import select, update
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from werkzeug.exceptions import Forbidden, NotFound, Unauthorized
 
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
-from libs.datetime_utils import naive_utc_now
 from libs.login import _get_user
 from models.account import Account, Tenant, TenantAccountJoin, TenantStatus
 from models.dataset import Dataset, RateLimitLog
 from models.model import ApiToken, App, EndUser
+from services.api_token_service import ApiTokenAuthCache, ApiTokenUsageRecorder
 from services.feature_service import FeatureService
 
 
@@ -54,32 +53,16 @@ def validate_app_token(view: Optional[Callable] = None, *, fetch_user_arg: Optio
             if not app_model.enable_api:
                 raise Forbidden("The app's API service has been disabled.")
 
-            tenant = db.session.query(Tenant).where(Tenant.id == app_model.tenant_id).first()
-            if tenant is None:
-                raise ValueError("Tenant does not exist.")
-            if tenant.status == TenantStatus.ARCHIVE:
-                raise Forbidden("The workspace's status is archived.")
-
-            tenant_account_join = (
-                db.session.query(Tenant, TenantAccountJoin)
-                .where(Tenant.id == api_token.tenant_id)
-                .where(TenantAccountJoin.tenant_id == Tenant.id)
-                .where(TenantAccountJoin.role.in_(["owner"]))
-                .where(Tenant.status == TenantStatus.NORMAL)
-                .one_or_none()
-            )  # TODO: only owner information is required, so only one is returned.
-            if tenant_account_join:
-                tenant, ta = tenant_account_join
-                account = db.session.query(Account).where(Account.id == ta.account_id).first()
-                # Login admin
-                if account:
-                    account.current_tenant = tenant
-                    current_app.login_manager._update_request_context_with_user(account)  # type: ignore
-                    user_logged_in.send(current_app._get_current_object(), user=_get_user())  # type: ignore
-                else:
-                    raise Unauthorized("Tenant owner account does not exist.")
-            else:
-                raise Unauthorized("Tenant does not exist.")
+            # a cached owner means the workspace was in normal status, so it is not archived
+            tenant_owner = ApiTokenAuthCache.get_tenant_owner(api_token.tenant_id)
+            if tenant_owner is None or app_model.tenant_id != api_token.tenant_id:
+                tenant = db.session.query(Tenant).where(Tenant.id == app_model.tenant_id).first()
+                if tenant is None:
+                    raise ValueError("Tenant does not exist.")
+                if tenant.status == TenantStatus.ARCHIVE:
+                    raise Forbidden("The workspace's status is archived.")
+
+            _login_tenant_owner(api_token.tenant_id, tenant_owner)
 
             kwargs["app_model"] = app_model
 
@@ -211,26 +194,7 @@ def validate_dataset_token(view=None):
         @wraps(view)
         def decorated(*args, **kwargs):
             api_token = validate_and_get_api_token("dataset")
-            tenant_account_join = (
-                db.session.query(Tenant, TenantAccountJoin)
-                .where(Tenant.id == api_token.tenant_id)
-                .where(TenantAccountJoin.tenant_id == Tenant.id)
-                .where(TenantAccountJoin.role.in_(["owner"]))
-                .where(Tenant.status == TenantStatus.NORMAL)
-                .one_or_none()
-            )  # TODO: only owner information is required, so only one is returned.
-            if tenant_account_join:
-                tenant, ta = tenant_account_join
-                account = db.session.query(Account).where(Account.id == ta.account_id).first()
-                # Login admin
-                if account:
-                    account.current_tenant = tenant
-                    current_app.login_manager._update_request_context_with_user(account)  # type: ignore
-                    user_logged_in.send(current_app._get_current_object(), user=_get_user())  # type: ignore
-                else:
-                    raise Unauthorized("Tenant owner account does not exist.")
-            else:
-                raise Unauthorized("Tenant does not exist.")
+            _login_tenant_owner(api_token.tenant_id, ApiTokenAuthCache.get_tenant_owner(api_token.tenant_id))
             return view(api_token.tenant_id, *args, **kwargs)
 
         return decorated
@@ -257,33 +221,51 @@ def validate_and_get_api_token(scope: str | None = None):
     if auth_scheme != "bearer":
         raise Unauthorized("Authorization scheme must be 'Bearer'")
 
-    current_time = naive_utc_now()
-    cutoff_time = current_time - timedelta(minutes=1)
-    with Session(db.engine, expire_on_commit=False) as session:
-        update_stmt = (
-            update(ApiToken)
-            .where(
-                ApiToken.token == auth_token,
-                (ApiToken.last_used_at.is_(None) | (ApiToken.last_used_at < cutoff_time)),
-                ApiToken.type == scope,
-            )
-            .values(last_used_at=current_time)
-            .returning(ApiToken)
-        )
-        result = session.execute(update_stmt)
-        api_token = result.scalar_one_or_none()
-
-        if not api_token:
+    api_token = ApiTokenAuthCache.get_api_token(auth_token, scope)
+    if api_token is None:
+        with Session(db.engine, expire_on_commit=False) as session:
             stmt = select(ApiToken).where(ApiToken.token == auth_token, ApiToken.type == scope)
             api_token = session.scalar(stmt)
-            if not api_token:
-                raise Unauthorized("Access token is invalid")
-        else:
-            session.commit()
+        if not api_token:
+            raise Unauthorized("Access token is invalid")
+        ApiTokenAuthCache.set_api_token(auth_token, scope, api_token)
+
+    # last_used_at is written in the background, at most once a minute per token
+    ApiTokenUsageRecorder.record(api_token)
 
     return api_token
 
 
+def _login_tenant_owner(tenant_id: str, tenant_owner: Optional[tuple[Tenant, Account]] = None):
+    """
+    Log in the owner of the workspace as the current user.
+    """
+    if tenant_owner is None:
+        tenant_account_join = (
+            db.session.query(Tenant, TenantAccountJoin)
+            .where(Tenant.id == tenant_id)
+            .where(TenantAccountJoin.tenant_id == Tenant.id)
+            .where(TenantAccountJoin.role.in_(["owner"]))
+            .where(Tenant.status == TenantStatus.NORMAL)
+            .one_or_none()
+        )  # TODO: only owner information is required, so only one is returned.
+        if not tenant_account_join:
+            raise Unauthorized("Tenant does not exist.")
+
+        tenant, ta = tenant_account_join
+        account = db.session.query(Account).where(Account.id == ta.account_id).first()
+        if not account:
+            raise Unauthorized("Tenant owner account does not exist.")
+        ApiTokenAuthCache.set_tenant_owner(tenant, account)
+        account.current_tenant = tenant
+    else:
+        _, account = tenant_owner
+
+    # Login admin
+    current_app.login_manager._update_request_context_with_user(account)  # type: ignore
+    user_logged_in.send(current_app._get_current_object(), user=_get_user())  # type: ignore
+
+
 def create_or_update_end_user_for_user_id(app_model: App, user_id: Optional[str] = None) -> EndUser:
     """
     Create or update session terminal based on user ID.
@@ -291,6 +273,10 @@ def create_or_update_end_user_for_user_id(app_model: App, user_id: Optional[str]
     if not user_id:
         user_id = "DEFAULT-USER"
 
+    end_user = ApiTokenAuthCache.get_end_user(app_model.id, user_id)
+    if end_user is not None and end_user.tenant_id == app_model.tenant_id:
+        return end_user
+
     end_user = (
         db.session.query(EndUser)
         .where(
@@ -313,6 +299,7 @@ def create_or_update_end_user_for_user_id(app_model: App, user_id: Optional[str]
         db.session.add(end_user)
         db.session.commit()
 
+    ApiTokenAuthCache.set_end_user(end_user)
     return end_user
 
 
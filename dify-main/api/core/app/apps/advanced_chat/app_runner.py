@@ -24,6 +24,7 @@ from core.moderation.base import ModerationError
 from core.moderation.input_moderation import InputModeration
 from core.variables.variables import VariableUnion
 from core.workflow.callbacks import WorkflowCallback, WorkflowLoggingCallback
+from core.workflow.compiled_workflow import CompiledWorkflow, compiled_workflow_cache
 from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.system_variable import SystemVariable
 from core.workflow.variable_loader import VariableLoader
@@ -80,6 +81,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
         if dify_config.DEBUG:
             workflow_callbacks.append(WorkflowLoggingCallback())
 
+        compiled_workflow: Optional[CompiledWorkflow] = None
         if self.application_generate_entity.single_iteration_run:
             # if only single iteration run is requested
             graph, variable_pool = self._get_graph_and_variable_pool_of_single_iteration(
@@ -162,7 +164,8 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
             )
 
             # init graph
-            graph = self._init_graph(graph_config=self._workflow.graph_dict)
+            compiled_workflow = compiled_workflow_cache.get(self._workflow)
+            graph = self._init_graph(graph_config=compiled_workflow.graph_config, compiled_workflow=compiled_workflow)
 
         db.session.close()
 
@@ -173,7 +176,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
             workflow_id=self._workflow.id,
             workflow_type=WorkflowType.value_of(self._workflow.type),
             graph=graph,
-            graph_config=self._workflow.graph_dict,
+            graph_config=compiled_workflow.graph_config if compiled_workflow else self._workflow.graph_dict,
             user_id=self.application_generate_entity.user_id,
             user_from=(
                 UserFrom.ACCOUNT
@@ -183,6 +186,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
             invoke_from=self.application_generate_entity.invoke_from,
             call_depth=self.application_generate_entity.call_depth,
             variable_pool=variable_pool,
+            compiled_workflow=compiled_workflow,
         )
 
         generator = workflow_entry.run(
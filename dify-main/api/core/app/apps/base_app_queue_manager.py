@@ -1,5 +1,9 @@
+import logging
+import os
 import queue
+import threading
 import time
+import weakref
 from abc import abstractmethod
 from enum import Enum
 from typing import Any, Optional
@@ -11,13 +15,19 @@ from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
     MessageQueueMessage,
+    QueueAgentMessageEvent,
     QueueErrorEvent,
+    QueueLLMChunkEvent,
     QueuePingEvent,
     QueueStopEvent,
+    QueueTextChunkEvent,
     WorkflowQueueMessage,
 )
+from core.model_runtime.entities.llm_entities import LLMResultChunk
 from extensions.ext_redis import redis_client
 
+logger = logging.getLogger(__name__)
+
 
 class PublishFrom(Enum):
     APPLICATION_MANAGER = 1
@@ -41,6 +51,8 @@ class AppQueueManager:
         q: queue.Queue[WorkflowQueueMessage | MessageQueueMessage | None] = queue.Queue()
 
         self._q = q
+        self._stopped = threading.Event()
+        _stop_signal_subscriber.register(self._task_id, self)
 
     def listen(self):
         """
@@ -51,18 +63,29 @@ class AppQueueManager:
         listen_timeout = dify_config.APP_MAX_EXECUTION_TIME
         start_time = time.time()
         last_ping_time: int | float = 0
+        timeout: float = min(10, listen_timeout)
+        # messages read from the queue while merging text chunks
+        pending: list[WorkflowQueueMessage | MessageQueueMessage | None] = []
+        chunk_yielded = False
         while True:
             try:
-                message = self._q.get(timeout=1)
+                message = pending.pop() if pending else self._q.get(timeout=timeout)
                 if message is None:
                     break
 
+                if _get_chunk_text(message.event) is not None:
+                    # the first chunk is sent right away, the next ones are merged with those arriving shortly after
+                    window = dify_config.APP_STREAM_CHUNK_COALESCE_WINDOW if chunk_yielded else 0
+                    message = self._coalesce_chunks(message, window, pending)
+                    chunk_yielded = True
+
                 yield message
             except queue.Empty:
                 continue
             finally:
                 elapsed_time = time.time() - start_time
-                if elapsed_time >= listen_timeout or self._is_stopped():
+                stopped = elapsed_time >= listen_timeout or self._is_stopped()
+                if stopped:
                     # publish two messages to make sure the client can receive the stop signal
                     # and stop listening after the stop signal processed
                     self.publish(
@@ -73,6 +96,47 @@ class AppQueueManager:
                     self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
                     last_ping_time = elapsed_time // 10
 
+                # stop signals are published to the queue when they arrive, so it is only waited on until
+                # the next ping or the timeout, and once stopped every second until listening ends
+                if stopped:
+                    timeout = 1
+                else:
+                    timeout = max(min((last_ping_time + 1) * 10, listen_timeout) - elapsed_time, 0.01)
+
+    def _coalesce_chunks(
+        self,
+        message: WorkflowQueueMessage | MessageQueueMessage,
+        window: float,
+        pending: list[WorkflowQueueMessage | MessageQueueMessage | None],
+    ) -> WorkflowQueueMessage | MessageQueueMessage:
+        """
+        Merge the text chunks following a text chunk message into it
+        :param message: text chunk message
+        :param window: time to wait for the following chunks from the start of the merge, so the merged message
+            is never held back longer than it
+        :param pending: list to put the first message read which could not be merged in
+        :return: merged message
+        """
+        max_length = dify_config.APP_STREAM_CHUNK_COALESCE_MAX_LENGTH
+        length = len(_get_chunk_text(message.event) or "")
+        deadline = time.monotonic() + window
+        while length < max_length:
+            try:
+                # once the deadline has passed only the chunks already in the queue are merged
+                next_message = self._q.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+
+            event = _merge_chunk_events(message.event, next_message.event) if next_message is not None else None
+            if event is None:
+                pending.append(next_message)
+                break
+
+            message = message.model_copy(update={"event": event})
+            length = len(_get_chunk_text(event) or "")
+
+        return message
+
     def stop_listen(self) -> None:
         """
         Stop listen to queue
@@ -125,18 +189,25 @@ class AppQueueManager:
 
         stopped_cache_key = cls._generate_stopped_cache_key(task_id)
         redis_client.setex(stopped_cache_key, 600, 1)
+        redis_client.publish(_StopSignalSubscriber.CHANNEL, task_id)
 
     def _is_stopped(self) -> bool:
         """
         Check if task is stopped
         :return:
         """
-        stopped_cache_key = AppQueueManager._generate_stopped_cache_key(self._task_id)
-        result = redis_client.get(stopped_cache_key)
-        if result is not None:
-            return True
+        return self._stopped.is_set()
 
-        return False
+    def _stop(self) -> None:
+        """
+        Stop the task on its stop signal
+        :return:
+        """
+        if self._stopped.is_set():
+            return
+
+        self._stopped.set()
+        self.publish(QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE)
 
     @classmethod
     def _generate_task_belong_cache_key(cls, task_id: str) -> str:
@@ -169,3 +240,117 @@ class AppQueueManager:
                 raise TypeError(
                     "Critical Error: Passing SQLAlchemy Model instances that cause thread safety issues is not allowed."
                 )
+
+
+def _get_chunk_text(event: AppQueueEvent) -> Optional[str]:
+    if isinstance(event, QueueTextChunkEvent):
+        return event.text
+    if isinstance(event, QueueLLMChunkEvent | QueueAgentMessageEvent) and type(event.chunk) is LLMResultChunk:
+        content = event.chunk.delta.message.content
+        if isinstance(content, str) and not event.chunk.delta.message.tool_calls:
+            return content
+    return None
+
+
+def _merge_chunk_events(event: AppQueueEvent, next_event: AppQueueEvent) -> Optional[AppQueueEvent]:
+    """
+    Merge consecutive text chunk events
+    :return: merged event, None if the events can not be merged
+    """
+    if type(event) is not type(next_event):
+        return None
+
+    if isinstance(event, QueueTextChunkEvent) and isinstance(next_event, QueueTextChunkEvent):
+        if (event.from_variable_selector, event.in_iteration_id, event.in_loop_id) != (
+            next_event.from_variable_selector,
+            next_event.in_iteration_id,
+            next_event.in_loop_id,
+        ):
+            return None
+        return event.model_copy(update={"text": event.text + next_event.text})
+
+    if isinstance(event, QueueLLMChunkEvent | QueueAgentMessageEvent) and isinstance(
+        next_event, QueueLLMChunkEvent | QueueAgentMessageEvent
+    ):
+        text = _get_chunk_text(event)
+        next_text = _get_chunk_text(next_event)
+        chunk = event.chunk
+        next_chunk = next_event.chunk
+        # usage and finish reason only come with the last chunk of a result
+        if (
+            text is None
+            or next_text is None
+            or chunk.model != next_chunk.model
+            or chunk.delta.usage is not None
+            or chunk.delta.finish_reason is not None
+        ):
+            return None
+        message = next_chunk.delta.message.model_copy(update={"content": text + next_text})
+        delta = next_chunk.delta.model_copy(update={"message": message})
+        return next_event.model_copy(update={"chunk": next_chunk.model_copy(update={"delta": delta})})
+
+    return None
+
+
+class _StopSignalSubscriber:
+    """
+    Delivers the stop signals of generate tasks to their queue managers in this process.
+
+    A single redis subscription per process replaces polling the stop flag of each task. The stop
+    flags of the registered tasks are still read once every time the subscription is established,
+    so that signals published while it was not are not lost.
+    """
+
+    CHANNEL = "generate_task_stopped"
+    _RESUBSCRIBE_INTERVAL = 1
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._managers: weakref.WeakValueDictionary[str, AppQueueManager] = weakref.WeakValueDictionary()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def register(self, task_id: str, queue_manager: AppQueueManager) -> None:
+        with self._lock:
+            self._managers[task_id] = queue_manager
+            # the thread does not survive forking a worker
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="StopSignalSubscriber", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                try:
+                    pubsub.subscribe(self.CHANNEL)
+                    self._check_stop_flags()
+                    for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._stop(message["data"].decode())
+                finally:
+                    pubsub.close()
+            except Exception:
+                logger.exception("Failed to subscribe to stop signals of generate tasks")
+            time.sleep(self._RESUBSCRIBE_INTERVAL)
+
+    def _check_stop_flags(self) -> None:
+        with self._lock:
+            task_ids = list(self._managers.keys())
+        if not task_ids:
+            return
+
+        flags = redis_client.mget([AppQueueManager._generate_stopped_cache_key(task_id) for task_id in task_ids])
+        for task_id, flag in zip(task_ids, flags):
+            if flag is not None:
+                self._stop(task_id)
+
+    def _stop(self, task_id: str) -> None:
+        with self._lock:
+            queue_manager = self._managers.get(task_id)
+        if queue_manager is not None:
+            queue_manager._stop()
+
+
+_stop_signal_subscriber = _StopSignalSubscriber()
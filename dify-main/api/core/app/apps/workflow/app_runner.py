@@ -10,6 +10,7 @@ from core.app.entities.app_invoke_entities import (
     WorkflowAppGenerateEntity,
 )
 from core.workflow.callbacks import WorkflowCallback, WorkflowLoggingCallback
+from core.workflow.compiled_workflow import CompiledWorkflow, compiled_workflow_cache
 from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.system_variable import SystemVariable
 from core.workflow.variable_loader import VariableLoader
@@ -56,6 +57,7 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
         if dify_config.DEBUG:
             workflow_callbacks.append(WorkflowLoggingCallback())
 
+        compiled_workflow: Optional[CompiledWorkflow] = None
         # if only single iteration run is requested
         if self.application_generate_entity.single_iteration_run:
             # if only single iteration run is requested
@@ -93,7 +95,8 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
             )
 
             # init graph
-            graph = self._init_graph(graph_config=self._workflow.graph_dict)
+            compiled_workflow = compiled_workflow_cache.get(self._workflow)
+            graph = self._init_graph(graph_config=compiled_workflow.graph_config, compiled_workflow=compiled_workflow)
 
         # RUN WORKFLOW
         workflow_entry = WorkflowEntry(
@@ -102,7 +105,7 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
             workflow_id=self._workflow.id,
             workflow_type=WorkflowType.value_of(self._workflow.type),
             graph=graph,
-            graph_config=self._workflow.graph_dict,
+            graph_config=compiled_workflow.graph_config if compiled_workflow else self._workflow.graph_dict,
             user_id=self.application_generate_entity.user_id,
             user_from=(
                 UserFrom.ACCOUNT
@@ -113,6 +116,7 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
             call_depth=self.application_generate_entity.call_depth,
             variable_pool=variable_pool,
             thread_pool_id=self.workflow_thread_pool_id,
+            compiled_workflow=compiled_workflow,
         )
 
         generator = workflow_entry.run(callbacks=workflow_callbacks)
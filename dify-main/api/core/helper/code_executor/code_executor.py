@@ -1,15 +1,19 @@
 import logging
-from collections.abc import Mapping
+import os
+from collections.abc import Mapping, Sequence
 from enum import StrEnum
 from threading import Lock
 from typing import Any, Optional
 
-from httpx import Timeout, post
+import httpx
+from httpx import Timeout
+from jinja2.sandbox import SecurityError
 from pydantic import BaseModel
 from yarl import URL
 
 from configs import dify_config
 from core.helper.code_executor.javascript.javascript_transformer import NodeJsTemplateTransformer
+from core.helper.code_executor.jinja2.jinja2_renderer import Jinja2Renderer, Jinja2RenderError
 from core.helper.code_executor.jinja2.jinja2_transformer import Jinja2TemplateTransformer
 from core.helper.code_executor.python3.python3_transformer import Python3TemplateTransformer
 from core.helper.code_executor.template_transformer import TemplateTransformer
@@ -17,6 +21,32 @@ from core.helper.code_executor.template_transformer import TemplateTransformer
 logger = logging.getLogger(__name__)
 code_execution_endpoint_url = URL(str(dify_config.CODE_EXECUTION_ENDPOINT))
 
+_client: Optional[httpx.Client] = None
+_client_pid: Optional[int] = None
+_client_lock = Lock()
+
+
+def _get_client() -> httpx.Client:
+    """
+    Return the shared client of the code execution service.
+
+    The client is kept for the lifetime of the process so connections are reused across executions;
+    a forked worker starts with its own client.
+    """
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=dify_config.CODE_EXECUTION_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=dify_config.CODE_EXECUTION_POOL_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=dify_config.CODE_EXECUTION_POOL_KEEPALIVE_EXPIRY,
+                )
+            )
+            _client_pid = os.getpid()
+        return _client
+
 
 class CodeExecutionError(Exception):
     pass
@@ -56,6 +86,8 @@ class CodeExecutor:
 
     supported_dependencies_languages: set[CodeLanguage] = {CodeLanguage.PYTHON3}
 
+    supported_batch_languages: set[CodeLanguage] = {CodeLanguage.PYTHON3, CodeLanguage.JAVASCRIPT}
+
     @classmethod
     def execute_code(cls, language: CodeLanguage, preload: str, code: str) -> str:
         """
@@ -77,7 +109,7 @@ class CodeExecutor:
         }
 
         try:
-            response = post(
+            response = _get_client().post(
                 str(url),
                 json=data,
                 headers=headers,
@@ -128,6 +160,15 @@ class CodeExecutor:
         :param inputs: inputs
         :return:
         """
+        if language == CodeLanguage.JINJA2 and dify_config.JINJA2_RENDER_IN_PROCESS and Jinja2Renderer.can_render(code):
+            try:
+                return {"result": Jinja2Renderer.render(code, inputs)}
+            except SecurityError:
+                # not allowed in the sandboxed environment, render in the code execution service
+                logger.debug("Jinja2 template not allowed in process, sending it to the code execution service")
+            except Jinja2RenderError as e:
+                raise CodeExecutionError(str(e)) from e
+
         template_transformer = cls.code_template_transformers.get(language)
         if not template_transformer:
             raise CodeExecutionError(f"Unsupported language {language}")
@@ -140,3 +181,35 @@ class CodeExecutor:
             raise e
 
         return template_transformer.transform_response(response)
+
+    @classmethod
+    def execute_workflow_code_template_batch(
+        cls, language: CodeLanguage, code: str, inputs_list: Sequence[Mapping[str, Any]]
+    ) -> list[Optional[Mapping[str, Any]]]:
+        """
+        Execute code once for each of the inputs, sending up to CODE_EXECUTION_BATCH_SIZE of them
+        to the code execution service in one request
+        :param language: code language
+        :param code: code
+        :param inputs_list: inputs of each execution
+        :return: results in the order of the inputs, None for inputs the code failed for
+        """
+        template_transformer = cls.code_template_transformers.get(language)
+        if not template_transformer or language not in cls.supported_batch_languages:
+            raise CodeExecutionError(f"Unsupported language {language} for batch execution")
+
+        if not inputs_list:
+            return []
+
+        batch_size = dify_config.CODE_EXECUTION_BATCH_SIZE or len(inputs_list)
+        results: list[Optional[Mapping[str, Any]]] = []
+        for offset in range(0, len(inputs_list), batch_size):
+            batch = inputs_list[offset : offset + batch_size]
+            runner, preload = template_transformer.transform_batch_caller(code, batch)
+            response = cls.execute_code(language, preload, runner)
+            batch_results = template_transformer.transform_batch_response(response)
+            if len(batch_results) != len(batch):
+                raise CodeExecutionError(f"Expected {len(batch)} results, got {len(batch_results)}")
+            results.extend(batch_results)
+
+        return results
@@ -1,4 +1,5 @@
 from textwrap import dedent
+from typing import Optional
 
 from core.helper.code_executor.template_transformer import TemplateTransformer
 
@@ -24,3 +25,30 @@ class NodeJsTemplateTransformer(TemplateTransformer):
             """
         )
         return runner_script
+
+    @classmethod
+    def get_batch_runner_script(cls) -> Optional[str]:
+        runner_script = dedent(
+            f"""
+            // declare main function
+            {cls._code_placeholder}
+
+            // decode and prepare list of input objects
+            var inputs_list = JSON.parse(Buffer.from('{cls._inputs_placeholder}', 'base64').toString('utf-8'))
+
+            // execute main function for each input object
+            var results = inputs_list.map(function (inputs_obj) {{
+                try {{
+                    return JSON.stringify({{ output: main(inputs_obj) }})
+                }} catch (e) {{
+                    return JSON.stringify({{ error: String(e) }})
+                }}
+            }})
+
+            // print results as json list
+            var output_json = '[' + results.join(',') + ']'
+            var result = `<<RESULT>>${{output_json}}<<RESULT>>`
+            console.log(result)
+            """
+        )
+        return runner_script
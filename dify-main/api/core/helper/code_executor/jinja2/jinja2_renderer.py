@@ -0,0 +1,164 @@
+import hashlib
+import json
+import threading
+from collections.abc import Generator, Iterable, Mapping
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from cachetools import LRUCache
+from jinja2 import Template, nodes
+from jinja2.runtime import Context
+from jinja2.sandbox import ImmutableSandboxedEnvironment, SecurityError
+
+from configs import dify_config
+from core.variables.utils import SegmentJSONEncoder
+
+_call_depth: ContextVar[int] = ContextVar("jinja2_render_call_depth", default=0)
+
+
+class Jinja2RenderError(Exception):
+    pass
+
+
+class _OperationBudget:
+    """
+    Loop iterations and calls a single render may perform.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+
+    def spend(self):
+        self.used += 1
+        if self.used > self.limit:
+            raise Jinja2RenderError(f"Maximum of {self.limit} operations exceeded")
+
+
+_operation_budget: ContextVar[Optional[_OperationBudget]] = ContextVar("jinja2_render_operation_budget", default=None)
+
+
+def _spend_operation():
+    budget = _operation_budget.get()
+    if budget is not None:
+        budget.spend()
+
+
+def _count_iterations(iterable: Iterable[Any]) -> Generator[Any, None, None]:
+    for item in iterable:
+        _spend_operation()
+        yield item
+
+
+class _LimitedSandboxedEnvironment(ImmutableSandboxedEnvironment):
+    """
+    Sandboxed environment limiting how deep calls nest, how large repeated sequences get and how
+    many loop iterations and calls a render performs.
+    """
+
+    intercepted_binops = frozenset(["*", "**"])
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.filters["_count_iterations"] = _count_iterations
+
+    def _parse(self, source: str, name: Optional[str], filename: Optional[str]) -> nodes.Template:
+        template = super()._parse(source, name, filename)
+        # iterate every loop through the budget, loops do not go through any other sandbox hook
+        for loop in template.find_all(nodes.For):
+            loop.iter = nodes.Filter(loop.iter, "_count_iterations", [], [], None, None, lineno=loop.lineno)
+        return template
+
+    def call(__self, __context: Context, __obj: Any, *args: Any, **kwargs: Any) -> Any:  # noqa: N805
+        _spend_operation()
+        # macros and recursive loops render their body inside the call
+        depth = _call_depth.get()
+        if depth >= dify_config.JINJA2_RENDER_MAX_CALL_DEPTH:
+            raise Jinja2RenderError(f"Maximum call depth of {dify_config.JINJA2_RENDER_MAX_CALL_DEPTH} exceeded")
+        token = _call_depth.set(depth + 1)
+        try:
+            return super().call(__context, __obj, *args, **kwargs)
+        finally:
+            _call_depth.reset(token)
+
+    def call_binop(self, context: Context, operator: str, left: Any, right: Any) -> Any:
+        max_length = dify_config.JINJA2_RENDER_MAX_OUTPUT_LENGTH
+        if operator == "*":
+            for sequence, times in ((left, right), (right, left)):
+                if isinstance(sequence, (str, list, tuple)) and isinstance(times, int):
+                    if len(sequence) * times > max_length:
+                        raise Jinja2RenderError(f"Repeated sequence longer than {max_length}")
+        elif operator == "**":
+            if isinstance(left, int) and isinstance(right, int) and abs(left) > 1:
+                if left.bit_length() * right > max_length:
+                    raise Jinja2RenderError("Power result too large")
+        return super().call_binop(context, operator, left, right)
+
+
+class Jinja2Renderer:
+    """
+    Renders Jinja2 templates in process, instead of in the code execution service.
+
+    Templates are rendered in an immutable sandboxed environment, the output length, the depth of
+    nested calls and the number of loop iterations and calls are limited. Rendering raises
+    `SecurityError` for templates the sandbox does not allow, those have to be rendered by the code
+    execution service.
+    """
+
+    _environment = _LimitedSandboxedEnvironment()
+    _templates: LRUCache[str, Template] = LRUCache(maxsize=max(dify_config.JINJA2_TEMPLATE_CACHE_SIZE, 1))
+    _templates_lock = threading.Lock()
+
+    @classmethod
+    def can_render(cls, template: str) -> bool:
+        """
+        Whether the template renders the same as in the code execution service.
+
+        The code execution service embeds the template in a Python string literal, which resolves
+        backslash escapes before Jinja2 sees the template.
+        """
+        return "\\" not in template and "'''" not in template
+
+    @classmethod
+    def render(cls, template: str, inputs: Mapping[str, Any]) -> str:
+        """
+        Render template
+        :param template: template
+        :param inputs: inputs
+        :return: rendered template
+        """
+        # inputs are passed as JSON like to the code execution service
+        inputs = json.loads(json.dumps(inputs, ensure_ascii=False, cls=SegmentJSONEncoder))
+
+        max_length = dify_config.JINJA2_RENDER_MAX_OUTPUT_LENGTH
+        chunks = []
+        length = 0
+        token = _operation_budget.set(_OperationBudget(dify_config.JINJA2_RENDER_MAX_OPERATIONS))
+        try:
+            for chunk in cls._get_template(template).generate(inputs):
+                length += len(chunk)
+                if length > max_length:
+                    raise Jinja2RenderError(f"Output length exceeds {max_length} characters")
+                chunks.append(chunk)
+        except (SecurityError, Jinja2RenderError):
+            raise
+        except Exception as e:
+            raise Jinja2RenderError(f"{type(e).__name__}: {e}") from e
+        finally:
+            _operation_budget.reset(token)
+
+        return "".join(chunks)
+
+    @classmethod
+    def _get_template(cls, template: str) -> Template:
+        if dify_config.JINJA2_TEMPLATE_CACHE_SIZE <= 0:
+            return cls._environment.from_string(template)
+
+        key = hashlib.sha256(template.encode()).hexdigest()
+        with cls._templates_lock:
+            compiled = cls._templates.get(key)
+        if compiled is None:
+            compiled = cls._environment.from_string(template)
+            with cls._templates_lock:
+                cls._templates[key] = compiled
+        return compiled
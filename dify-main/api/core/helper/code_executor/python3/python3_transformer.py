@@ -1,4 +1,5 @@
 from textwrap import dedent
+from typing import Optional
 
 from core.helper.code_executor.template_transformer import TemplateTransformer
 
@@ -25,3 +26,30 @@ class Python3TemplateTransformer(TemplateTransformer):
             print(result)
             """)
         return runner_script
+
+    @classmethod
+    def get_batch_runner_script(cls) -> Optional[str]:
+        runner_script = dedent(f"""
+            # declare main function
+            {cls._code_placeholder}
+
+            import json
+            from base64 import b64decode
+
+            # decode and prepare list of input dicts
+            inputs_list = json.loads(b64decode('{cls._inputs_placeholder}').decode('utf-8'))
+
+            # execute main function for each input dict
+            results = []
+            for inputs_obj in inputs_list:
+                try:
+                    results.append(json.dumps({{"output": main(**inputs_obj)}}))
+                except Exception as e:
+                    results.append(json.dumps({{"error": f"{{type(e).__name__}}: {{e}}"}}))
+
+            # print results as json list
+            output_json = "[" + ",".join(results) + "]"
+            result = f'''<<RESULT>>{{output_json}}<<RESULT>>'''
+            print(result)
+            """)
+        return runner_script
@@ -2,8 +2,8 @@ import json
 import re
 from abc import ABC, abstractmethod
 from base64 import b64encode
-from collections.abc import Mapping
-from typing import Any
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional
 
 from core.variables.utils import SegmentJSONEncoder
 
@@ -52,14 +52,55 @@ class TemplateTransformer(ABC):
         except Exception as e:
             raise ValueError(f"Unexpected error during response transformation: {str(e)}")
 
+        return cls._check_result(result)
+
+    @classmethod
+    def transform_batch_caller(cls, code: str, inputs_list: Sequence[Mapping[str, Any]]) -> tuple[str, str]:
+        """
+        Transform code to a runner calling it once for each of the inputs
+        :param code: code
+        :param inputs_list: inputs of each call
+        :return: runner, preload
+        """
+        runner_script = cls.get_batch_runner_script()
+        if runner_script is None:
+            raise ValueError(f"{cls.__name__} does not support batch execution")
+
+        runner_script = runner_script.replace(cls._code_placeholder, code)
+        runner_script = runner_script.replace(cls._inputs_placeholder, cls.serialize_inputs(inputs_list))
+        return runner_script, cls.get_preload_script()
+
+    @classmethod
+    def transform_batch_response(cls, response: str) -> list[Optional[Mapping[str, Any]]]:
+        """
+        Transform response of a batch runner to a list of results
+        :param response: response
+        :return: results in the order of the inputs, None for inputs the code failed for
+        """
+        try:
+            results = json.loads(cls.extract_result_str_from_response(response))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse JSON response: {str(e)}.")
+        if not isinstance(results, list):
+            raise ValueError(f"Batch result must be a list, got {type(results).__name__}")
+
+        transformed: list[Optional[Mapping[str, Any]]] = []
+        for result in results:
+            try:
+                transformed.append(cls._check_result(result["output"]) if "output" in result else None)
+            except ValueError:
+                transformed.append(None)
+        return transformed
+
+    @classmethod
+    def _check_result(cls, result: Any) -> Mapping[str, Any]:
         if not isinstance(result, dict):
             raise ValueError(f"Result must be a dict, got {type(result).__name__}")
         if not all(isinstance(k, str) for k in result):
             raise ValueError("Result keys must be strings")
 
         # Post-process the result to convert scientific notation strings back to numbers
-        result = cls._post_process_result(result)
-        return result
+        return cls._post_process_result(result)
 
     @classmethod
     def _post_process_result(cls, result: dict[Any, Any]) -> dict[Any, Any]:
@@ -92,7 +133,17 @@ class TemplateTransformer(ABC):
         pass
 
     @classmethod
-    def serialize_inputs(cls, inputs: Mapping[str, Any]) -> str:
+    def get_batch_runner_script(cls) -> Optional[str]:
+        """
+        Get runner script calling main once for each of a list of inputs, None if not supported.
+
+        The runner prints a JSON list with an object for each call, holding the result of the call
+        in `output`, or the error it raised in `error`.
+        """
+        return None
+
+    @classmethod
+    def serialize_inputs(cls, inputs: Mapping[str, Any] | Sequence[Mapping[str, Any]]) -> str:
         inputs_json_str = json.dumps(inputs, ensure_ascii=False, cls=SegmentJSONEncoder).encode()
         input_base64_encoded = b64encode(inputs_json_str).decode("utf-8")
         return input_base64_encoded
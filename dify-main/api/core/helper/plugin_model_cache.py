@@ -0,0 +1,251 @@
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Optional
+
+from cachetools import LRUCache
+from pydantic import TypeAdapter
+
+from configs import dify_config
+from core.model_runtime.entities.model_entities import AIModelEntity, ModelType
+from core.plugin.entities.plugin_daemon import PluginModelProviderEntity
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_providers_adapter = TypeAdapter(list[PluginModelProviderEntity])
+
+
+class PluginModelCache:
+    """
+    Process and redis cache of the model schemas and model provider declarations of plugins.
+
+    Model schemas are keyed by the unique identifier of the plugin, which changes with every
+    version, so an upgraded or uninstalled plugin never serves the schemas of the old version.
+    Schemas of models the provider does not predefine depend on the credentials, their keys also
+    contain a keyed hash of the credentials. Schemas are kept for PLUGIN_MODEL_SCHEMA_CACHE_TTL
+    seconds.
+
+    The model providers of a workspace are kept for PLUGIN_MODEL_PROVIDERS_CACHE_TTL seconds, behind
+    a version in redis which is bumped when a plugin of the workspace is uninstalled. Plugins are
+    installed and upgraded by tasks of the plugin daemon, so the providers they add are picked up
+    once the cache expires, or when a missing provider is requested.
+    """
+
+    _RECENT_SCHEMAS_KEY = "plugin_model_schema_recent"
+
+    def __init__(self, max_size: int):
+        self._schemas: LRUCache[str, tuple[float, AIModelEntity]] = LRUCache(maxsize=max_size)
+        self._providers: LRUCache[str, tuple[int, float, list[PluginModelProviderEntity]]] = LRUCache(maxsize=max_size)
+        self._lock = threading.Lock()
+
+    def get_model_schema(
+        self,
+        tenant_id: str,
+        plugin_model_provider: PluginModelProviderEntity,
+        model_type: ModelType,
+        model: str,
+        credentials: Optional[dict],
+        fetch: Callable[[], Optional[AIModelEntity]],
+    ) -> Optional[AIModelEntity]:
+        """
+        Get the schema of a model, callers get a copy of the cached schema as some of them modify it.
+
+        :param tenant_id: workspace id
+        :param plugin_model_provider: plugin model provider of the model
+        :param model_type: model type
+        :param model: model name
+        :param credentials: model credentials
+        :param fetch: function fetching the schema from the plugin daemon
+        :return: model schema
+        """
+        ttl = dify_config.PLUGIN_MODEL_SCHEMA_CACHE_TTL
+        if ttl <= 0:
+            return fetch()
+
+        key = self._schema_key(tenant_id, plugin_model_provider, model_type, model, credentials)
+        with self._lock:
+            cached = self._schemas.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1].model_copy(deep=True)
+
+        schema = None
+        try:
+            value = redis_client.get(key)
+            if value:
+                schema = AIModelEntity.model_validate_json(value)
+        except Exception:
+            logger.warning("Failed to get model schema from redis", exc_info=True)
+
+        if schema is None:
+            schema = fetch()
+            if schema is None:
+                return None
+            try:
+                redis_client.setex(key, ttl, schema.model_dump_json())
+            except Exception:
+                logger.warning("Failed to set model schema to redis", exc_info=True)
+
+        self._remember_schema(key)
+        with self._lock:
+            self._schemas[key] = (time.monotonic() + ttl, schema)
+        return schema.model_copy(deep=True)
+
+    def get_model_providers(
+        self,
+        tenant_id: str,
+        fetch: Callable[[], list[PluginModelProviderEntity]],
+        refresh: bool = False,
+    ) -> list[PluginModelProviderEntity]:
+        """
+        Get the plugin model providers of a workspace, shared between requests so they must not be modified.
+
+        :param tenant_id: workspace id
+        :param fetch: function fetching the providers from the plugin daemon
+        :param refresh: fetch the providers even if the cached ones are current
+        :return: plugin model providers
+        """
+        ttl = dify_config.PLUGIN_MODEL_PROVIDERS_CACHE_TTL
+        if ttl <= 0:
+            return fetch()
+
+        # read before fetching, so plugins uninstalled while fetching invalidate the providers fetched
+        version = self._get_providers_version(tenant_id)
+        if version is None:
+            return fetch()
+
+        key = self._providers_key(tenant_id, version)
+        if not refresh:
+            with self._lock:
+                cached = self._providers.get(tenant_id)
+            if cached is not None and cached[0] == version and cached[1] > time.monotonic():
+                return cached[2]
+
+            try:
+                value = redis_client.get(key)
+                if value:
+                    providers = _providers_adapter.validate_json(value)
+                    self._set_providers(tenant_id, version, redis_client.ttl(key), providers)
+                    return providers
+            except Exception:
+                logger.warning("Failed to get model providers from redis", exc_info=True)
+
+        providers = fetch()
+        try:
+            redis_client.setex(key, ttl, _providers_adapter.dump_json(providers))
+        except Exception:
+            logger.warning("Failed to set model providers to redis", exc_info=True)
+        self._set_providers(tenant_id, version, ttl, providers)
+        return providers
+
+    @classmethod
+    def invalidate_model_providers(cls, tenant_id: str) -> None:
+        """
+        Invalidate the cached plugin model providers of a workspace in all processes.
+
+        :param tenant_id: workspace id
+        """
+        try:
+            redis_client.incr(cls._providers_version_key(tenant_id))
+        except Exception:
+            logger.warning("Failed to invalidate model providers of workspace %s", tenant_id, exc_info=True)
+
+    def warm_up(self) -> int:
+        """
+        Load the most recently used model schemas from redis into the process cache.
+
+        :return: number of schemas loaded
+        """
+        size = dify_config.PLUGIN_MODEL_CACHE_WARM_UP_SIZE
+        if size <= 0 or dify_config.PLUGIN_MODEL_SCHEMA_CACHE_TTL <= 0:
+            return 0
+
+        keys = [key.decode() for key in redis_client.zrevrange(self._RECENT_SCHEMAS_KEY, 0, size - 1)]
+        if not keys:
+            return 0
+
+        expires_at = time.monotonic() + dify_config.PLUGIN_MODEL_SCHEMA_CACHE_TTL
+        loaded = 0
+        for key, value in zip(keys, redis_client.mget(keys)):
+            if not value:
+                continue
+            try:
+                schema = AIModelEntity.model_validate_json(value)
+            except ValueError:
+                logger.warning("Skipped invalid model schema %s", key)
+                continue
+            with self._lock:
+                self._schemas[key] = (expires_at, schema)
+            loaded += 1
+        return loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._schemas.clear()
+            self._providers.clear()
+
+    def _set_providers(
+        self, tenant_id: str, version: int, ttl: int, providers: list[PluginModelProviderEntity]
+    ) -> None:
+        with self._lock:
+            self._providers[tenant_id] = (version, time.monotonic() + max(ttl, 0), providers)
+
+    def _remember_schema(self, key: str) -> None:
+        size = dify_config.PLUGIN_MODEL_CACHE_WARM_UP_SIZE
+        if size <= 0:
+            return
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.zadd(self._RECENT_SCHEMAS_KEY, {key: time.time()})
+            pipeline.zremrangebyrank(self._RECENT_SCHEMAS_KEY, 0, -size - 1)
+            pipeline.execute()
+        except Exception:
+            logger.warning("Failed to record recently used model schema", exc_info=True)
+
+    @classmethod
+    def _get_providers_version(cls, tenant_id: str) -> Optional[int]:
+        try:
+            version = redis_client.get(cls._providers_version_key(tenant_id))
+        except Exception:
+            logger.warning("Failed to get model providers version", exc_info=True)
+            return None
+        return int(version) if version else 0
+
+    @staticmethod
+    def _schema_key(
+        tenant_id: str,
+        plugin_model_provider: PluginModelProviderEntity,
+        model_type: ModelType,
+        model: str,
+        credentials: Optional[dict],
+    ) -> str:
+        key = (
+            f"plugin_model_schema:{tenant_id}:{plugin_model_provider.plugin_unique_identifier}"
+            f":{plugin_model_provider.provider}:{model_type.value}:{model}"
+        )
+        predefined = any(
+            predefined_model.model == model and predefined_model.model_type == model_type
+            for predefined_model in plugin_model_provider.declaration.models
+        )
+        if predefined:
+            return key
+
+        # the schema of a customizable model is built from its credentials
+        payload = json.dumps(credentials or {}, sort_keys=True, default=str)
+        digest = hmac.new(dify_config.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        return f"{key}:{digest}"
+
+    @staticmethod
+    def _providers_key(tenant_id: str, version: int) -> str:
+        return f"plugin_model_providers:{tenant_id}:{version}"
+
+    @staticmethod
+    def _providers_version_key(tenant_id: str) -> str:
+        return f"plugin_model_providers_version:{tenant_id}"
+
+
+plugin_model_cache = PluginModelCache(dify_config.PLUGIN_MODEL_CACHE_MAX_SIZE)
@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Optional
+
+from cachetools import LRUCache
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+if TYPE_CHECKING:
+    from core.entities.provider_configuration import ProviderConfigurations
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderConfigurationsCache:
+    """
+    In-process cache of the model provider configurations of workspaces.
+
+    Each workspace has a version in redis, which is bumped whenever its providers, models, model
+    settings, load balancing configs or quotas change. Cached configurations are reused while the
+    version they were built at is current, for at most PROVIDER_CONFIGURATIONS_CACHE_TTL seconds.
+    They hold decrypted credentials, so they are never stored in redis.
+    """
+
+    def __init__(self, max_size: int):
+        self._cache: LRUCache[str, tuple[int, float, ProviderConfigurations]] = LRUCache(maxsize=max_size)
+        self._lock = threading.Lock()
+
+    def get(
+        self, tenant_id: str, build: Callable[[str], "ProviderConfigurations"], refresh: bool = False
+    ) -> "ProviderConfigurations":
+        """
+        Get the provider configurations of a workspace, shared between requests so they must not be modified.
+
+        :param tenant_id: workspace id
+        :param build: function building the configurations of a workspace
+        :param refresh: build the configurations even if the cached ones are current
+        :return: provider configurations
+        """
+        if dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL <= 0:
+            return build(tenant_id)
+
+        # read before building, so changes made while building invalidate the configurations built
+        version = self._get_version(tenant_id)
+        if version is None:
+            return build(tenant_id)
+
+        if not refresh:
+            with self._lock:
+                cached = self._cache.get(tenant_id)
+            if cached is not None and cached[0] == version and cached[1] > time.monotonic():
+                return cached[2]
+
+        configurations = build(tenant_id)
+        with self._lock:
+            self._cache[tenant_id] = (
+                version,
+                time.monotonic() + dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL,
+                configurations,
+            )
+        return configurations
+
+    @classmethod
+    def invalidate(cls, tenant_id: str) -> None:
+        """
+        Invalidate the cached provider configurations of a workspace in all processes.
+
+        :param tenant_id: workspace id
+        """
+        try:
+            redis_client.incr(cls._version_key(tenant_id))
+        except Exception:
+            logger.warning("Failed to invalidate provider configurations of workspace %s", tenant_id, exc_info=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    @classmethod
+    def _get_version(cls, tenant_id: str) -> Optional[int]:
+        try:
+            version = redis_client.get(cls._version_key(tenant_id))
+        except Exception:
+            logger.warning("Failed to get provider configurations version", exc_info=True)
+            return None
+        return int(version) if version else 0
+
+    @staticmethod
+    def _version_key(tenant_id: str) -> str:
+        return f"provider_configurations_version:{tenant_id}"
+
+
+provider_configurations_cache = ProviderConfigurationsCache(dify_config.PROVIDER_CONFIGURATIONS_CACHE_MAX_SIZE)
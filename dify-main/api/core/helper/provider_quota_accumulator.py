@@ -0,0 +1,178 @@
+import logging
+import threading
+from contextlib import nullcontext
+from typing import Optional
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from configs import dify_config
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
+from core.plugin.entities.plugin import ModelProviderID
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from libs.datetime_utils import naive_utc_now
+from models.provider import Provider, ProviderType
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderQuotaAccumulator:
+    """
+    Coalesces quota deductions of hosted providers.
+
+    Deductions are added to a hash of the workspace in redis with atomic increments, and a background
+    timer writes the pending totals of all workspaces to `providers` every HOSTED_QUOTA_FLUSH_INTERVAL
+    seconds. Concurrent requests of a workspace so no longer queue on the lock of its provider row.
+    Quota checks add the pending totals to the quota used from the database.
+    """
+
+    _TENANTS_KEY = "provider_quota_pending_tenants"
+    _FLUSH_LOCK_KEY = "provider_quota_flush_lock"
+    _PENDING_TTL = 86400
+
+    _lock = threading.Lock()
+    _timer: Optional[threading.Timer] = None
+
+    @classmethod
+    def deduct(cls, tenant_id: str, provider_name: str, quota_type: str, quota: int) -> None:
+        """
+        Deduct quota of the hosted provider of a workspace.
+
+        :param tenant_id: workspace id
+        :param provider_name: provider name
+        :param quota_type: quota type
+        :param quota: quota to deduct
+        """
+        provider_name = ModelProviderID(provider_name).provider_name
+        if dify_config.HOSTED_QUOTA_FLUSH_INTERVAL > 0:
+            try:
+                pending_key = cls._pending_key(tenant_id)
+                pipeline = redis_client.pipeline(transaction=False)
+                pipeline.hincrby(pending_key, f"{provider_name}:{quota_type}", quota)
+                pipeline.expire(pending_key, cls._PENDING_TTL)
+                pipeline.sadd(cls._TENANTS_KEY, tenant_id)
+                pipeline.execute()
+            except Exception:
+                logger.warning("Failed to coalesce quota deduction, writing it directly", exc_info=True)
+            else:
+                cls._schedule_flush()
+                return
+
+        with Session(db.engine) as session:
+            cls._deduct_in_database(session, tenant_id, provider_name, quota_type, quota)
+            session.commit()
+        ProviderConfigurationsCache.invalidate(tenant_id)
+
+    @classmethod
+    def get_pending(cls, tenant_id: str) -> dict[tuple[str, str], int]:
+        """
+        Get the quota deducted from the hosted providers of a workspace but not written yet.
+
+        :param tenant_id: workspace id
+        :return: pending quota by provider name and quota type
+        """
+        try:
+            values = redis_client.hgetall(cls._pending_key(tenant_id))
+        except Exception:
+            logger.warning("Failed to get pending quota deductions", exc_info=True)
+            return {}
+
+        pending = {}
+        for field, quota in values.items():
+            provider_name, quota_type = field.decode().rsplit(":", 1)
+            pending[(provider_name, quota_type)] = int(quota)
+        return pending
+
+    @classmethod
+    def flush(cls, flask_app: Optional[Flask] = None) -> None:
+        """
+        Write the pending deductions of all workspaces to the database.
+        """
+        with cls._lock:
+            if cls._timer is threading.current_thread():
+                # the timer is done, deductions made from now on schedule a new one
+                cls._timer = None
+
+        with flask_app.app_context() if flask_app else nullcontext():
+            try:
+                lock = redis_client.lock(cls._FLUSH_LOCK_KEY, timeout=60)
+                if not lock.acquire(blocking=False):
+                    # another process is flushing, deductions made meanwhile are left for the next flush
+                    cls._schedule_flush()
+                    return
+                try:
+                    for tenant_id in redis_client.smembers(cls._TENANTS_KEY):
+                        cls._flush_tenant(tenant_id.decode())
+                finally:
+                    lock.release()
+            except Exception:
+                logger.exception("Failed to flush quota deductions")
+
+    @classmethod
+    def _flush_tenant(cls, tenant_id: str) -> None:
+        # removed first, deductions made while flushing add the workspace again
+        redis_client.srem(cls._TENANTS_KEY, tenant_id)
+        pending = {key: quota for key, quota in cls.get_pending(tenant_id).items() if quota}
+        if not pending:
+            return
+
+        try:
+            with Session(db.engine) as session:
+                for (provider_name, quota_type), quota in sorted(pending.items()):
+                    cls._deduct_in_database(session, tenant_id, provider_name, quota_type, quota)
+                session.commit()
+        except Exception:
+            redis_client.sadd(cls._TENANTS_KEY, tenant_id)
+            raise
+
+        # subtract what was written, keeping deductions made while flushing
+        pending_key = cls._pending_key(tenant_id)
+        pipeline = redis_client.pipeline(transaction=False)
+        for (provider_name, quota_type), quota in pending.items():
+            pipeline.hincrby(pending_key, f"{provider_name}:{quota_type}", -quota)
+        if any(pipeline.execute()):
+            redis_client.sadd(cls._TENANTS_KEY, tenant_id)
+
+        # quota checks read the used quota from the cached configurations, invalidated once the written
+        # deductions are no longer pending so they are not counted twice
+        ProviderConfigurationsCache.invalidate(tenant_id)
+
+    @classmethod
+    def _schedule_flush(cls) -> None:
+        if not has_app_context():
+            # flushed with the deductions of the next request
+            return
+
+        with cls._lock:
+            if cls._timer is None or not cls._timer.is_alive():
+                flask_app = current_app._get_current_object()  # type: ignore
+                cls._timer = threading.Timer(
+                    dify_config.HOSTED_QUOTA_FLUSH_INTERVAL, cls.flush, kwargs={"flask_app": flask_app}
+                )
+                cls._timer.daemon = True
+                cls._timer.start()
+
+    @staticmethod
+    def _deduct_in_database(session: Session, tenant_id: str, provider_name: str, quota_type: str, quota: int):
+        stmt = (
+            update(Provider)
+            .where(
+                Provider.tenant_id == tenant_id,
+                # TODO: Use provider name with prefix after the data migration.
+                Provider.provider_name == provider_name,
+                Provider.provider_type == ProviderType.SYSTEM.value,
+                Provider.quota_type == quota_type,
+                Provider.quota_limit > Provider.quota_used,
+            )
+            .values(
+                quota_used=Provider.quota_used + quota,
+                last_used=naive_utc_now(),
+            )
+        )
+        session.execute(stmt)
+
+    @staticmethod
+    def _pending_key(tenant_id: str) -> str:
+        return f"provider_quota_pending:{tenant_id}"
@@ -2,8 +2,14 @@
 Proxy requests to avoid SSRF
 """
 
+import asyncio
+import http.cookiejar
 import logging
+import os
+import threading
 import time
+import weakref
+from typing import Optional
 
 import httpx
 
@@ -28,13 +34,21 @@ BACKOFF_FACTOR = 0.5
 STATUS_FORCELIST = [429, 500, 502, 503, 504]
 
 
+_clients: dict[tuple, httpx.Client] = {}
+_clients_pid: Optional[int] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
 class MaxRetriesExceededError(ValueError):
     """Raised when the maximum number of retries is exceeded."""
 
     pass
 
 
-def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+def _prepare_request_kwargs(kwargs: dict) -> tuple[dict, bool]:
     if "allow_redirects" in kwargs:
         allow_redirects = kwargs.pop("allow_redirects")
         if "follow_redirects" not in kwargs:
@@ -52,23 +66,107 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
         kwargs["ssl_verify"] = HTTP_REQUEST_NODE_SSL_VERIFY
 
     ssl_verify = kwargs.pop("ssl_verify")
+    return kwargs, ssl_verify
 
-    retries = 0
-    while retries <= max_retries:
-        try:
+
+def _get_pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=dify_config.SSRF_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=dify_config.SSRF_POOL_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=dify_config.SSRF_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def _new_cookie_jar() -> http.cookiejar.CookieJar:
+    # shared clients serve unrelated requests, so cookies set by a response are never stored or sent again
+    return http.cookiejar.CookieJar(policy=http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+
+def _get_client_key(ssl_verify: bool) -> tuple:
+    return (
+        dify_config.SSRF_PROXY_ALL_URL,
+        dify_config.SSRF_PROXY_HTTP_URL,
+        dify_config.SSRF_PROXY_HTTPS_URL,
+        ssl_verify,
+    )
+
+
+def _get_client(ssl_verify: bool) -> httpx.Client:
+    """
+    Return the shared client for the current proxy config and ``ssl_verify``.
+
+    Clients are kept for the lifetime of the process so connections are reused across requests;
+    a forked worker starts with its own clients. Cookies set by responses are not kept.
+    """
+    global _clients_pid
+
+    key = _get_client_key(ssl_verify)
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+        client = _clients.get(key)
+        if client is None:
+            limits = _get_pool_limits()
+            if dify_config.SSRF_PROXY_ALL_URL:
+                client = httpx.Client(
+                    proxy=dify_config.SSRF_PROXY_ALL_URL, verify=ssl_verify, limits=limits, cookies=_new_cookie_jar()
+                )
+            elif dify_config.SSRF_PROXY_HTTP_URL and dify_config.SSRF_PROXY_HTTPS_URL:
+                proxy_mounts = {
+                    "http://": httpx.HTTPTransport(
+                        proxy=dify_config.SSRF_PROXY_HTTP_URL, verify=ssl_verify, limits=limits
+                    ),
+                    "https://": httpx.HTTPTransport(
+                        proxy=dify_config.SSRF_PROXY_HTTPS_URL, verify=ssl_verify, limits=limits
+                    ),
+                }
+                client = httpx.Client(mounts=proxy_mounts, verify=ssl_verify, limits=limits, cookies=_new_cookie_jar())
+            else:
+                client = httpx.Client(verify=ssl_verify, limits=limits, cookies=_new_cookie_jar())
+            _clients[key] = client
+    return client
+
+
+def _get_async_client(ssl_verify: bool) -> httpx.AsyncClient:
+    """Return the shared async client of the running event loop for the current proxy config and ``ssl_verify``."""
+    key = _get_client_key(ssl_verify)
+    # async clients are bound to the event loop they were created in
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is None:
+            limits = _get_pool_limits()
             if dify_config.SSRF_PROXY_ALL_URL:
-                with httpx.Client(proxy=dify_config.SSRF_PROXY_ALL_URL, verify=ssl_verify) as client:
-                    response = client.request(method=method, url=url, **kwargs)
+                client = httpx.AsyncClient(
+                    proxy=dify_config.SSRF_PROXY_ALL_URL, verify=ssl_verify, limits=limits, cookies=_new_cookie_jar()
+                )
             elif dify_config.SSRF_PROXY_HTTP_URL and dify_config.SSRF_PROXY_HTTPS_URL:
                 proxy_mounts = {
-                    "http://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTP_URL, verify=ssl_verify),
-                    "https://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTPS_URL, verify=ssl_verify),
+                    "http://": httpx.AsyncHTTPTransport(
+                        proxy=dify_config.SSRF_PROXY_HTTP_URL, verify=ssl_verify, limits=limits
+                    ),
+                    "https://": httpx.AsyncHTTPTransport(
+                        proxy=dify_config.SSRF_PROXY_HTTPS_URL, verify=ssl_verify, limits=limits
+                    ),
                 }
-                with httpx.Client(mounts=proxy_mounts, verify=ssl_verify) as client:
-                    response = client.request(method=method, url=url, **kwargs)
+                client = httpx.AsyncClient(
+                    mounts=proxy_mounts, verify=ssl_verify, limits=limits, cookies=_new_cookie_jar()
+                )
             else:
-                with httpx.Client(verify=ssl_verify) as client:
-                    response = client.request(method=method, url=url, **kwargs)
+                client = httpx.AsyncClient(verify=ssl_verify, limits=limits, cookies=_new_cookie_jar())
+            loop_clients[key] = client
+    return client
+
+
+def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+    kwargs, ssl_verify = _prepare_request_kwargs(kwargs)
+
+    retries = 0
+    while retries <= max_retries:
+        try:
+            response = _get_client(ssl_verify).request(method=method, url=url, **kwargs)
 
             if response.status_code not in STATUS_FORCELIST:
                 return response
@@ -88,6 +186,33 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     raise MaxRetriesExceededError(f"Reached maximum retries ({max_retries}) for URL {url}")
 
 
+async def make_request_async(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+    """Async variant of :func:`make_request` with the same retry and backoff semantics."""
+    kwargs, ssl_verify = _prepare_request_kwargs(kwargs)
+
+    retries = 0
+    while retries <= max_retries:
+        try:
+            response = await _get_async_client(ssl_verify).request(method=method, url=url, **kwargs)
+
+            if response.status_code not in STATUS_FORCELIST:
+                return response
+            else:
+                logging.warning(
+                    "Received status code %s for URL %s which is in the force list", response.status_code, url
+                )
+
+        except httpx.RequestError as e:
+            logging.warning("Request to URL %s failed on attempt %s: %s", url, retries + 1, e)
+            if max_retries == 0:
+                raise
+
+        retries += 1
+        if retries <= max_retries:
+            await asyncio.sleep(BACKOFF_FACTOR * (2 ** (retries - 1)))
+    raise MaxRetriesExceededError(f"Reached maximum retries ({max_retries}) for URL {url}")
+
+
 def get(url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     return make_request("GET", url, max_retries=max_retries, **kwargs)
 
@@ -110,3 +235,11 @@ def delete(url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
 
 def head(url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     return make_request("HEAD", url, max_retries=max_retries, **kwargs)
+
+
+async def get_async(url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+    return await make_request_async("GET", url, max_retries=max_retries, **kwargs)
+
+
+async def post_async(url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+    return await make_request_async("POST", url, max_retries=max_retries, **kwargs)
@@ -4,7 +4,7 @@ from typing import Optional
 from sqlalchemy import select
 
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
-from core.file import file_manager
+from core.file import FileUploadConfig, file_manager
 from core.model_manager import ModelInstance
 from core.model_runtime.entities import (
     AssistantPromptMessage,
@@ -65,25 +65,16 @@ class TokenBufferMemory:
 
         messages = list(reversed(thread_messages))
 
+        message_files = self._get_message_files(messages)
+        file_extra_configs = self._get_file_extra_configs(messages, message_files)
+
         prompt_messages: list[PromptMessage] = []
+        # tokens already known for each prompt message, None when it has to be estimated
+        known_token_counts: list[Optional[int]] = []
         for message in messages:
-            files = db.session.query(MessageFile).where(MessageFile.message_id == message.id).all()
+            files = message_files.get(message.id)
             if files:
-                file_extra_config = None
-                if self.conversation.mode in {AppMode.AGENT_CHAT, AppMode.COMPLETION, AppMode.CHAT}:
-                    file_extra_config = FileUploadConfigManager.convert(self.conversation.model_config)
-                elif self.conversation.mode in {AppMode.ADVANCED_CHAT, AppMode.WORKFLOW}:
-                    workflow_run = db.session.scalar(
-                        select(WorkflowRun).where(WorkflowRun.id == message.workflow_run_id)
-                    )
-                    if not workflow_run:
-                        raise ValueError(f"Workflow run not found: {message.workflow_run_id}")
-                    workflow = db.session.scalar(select(Workflow).where(Workflow.id == workflow_run.workflow_id))
-                    if not workflow:
-                        raise ValueError(f"Workflow not found: {workflow_run.workflow_id}")
-                    file_extra_config = FileUploadConfigManager.convert(workflow.features_dict, is_vision=False)
-                else:
-                    raise AssertionError(f"Invalid app mode: {self.conversation.mode}")
+                file_extra_config = file_extra_configs.get(message.id)
 
                 detail = ImagePromptMessageContent.DETAIL.LOW
                 if file_extra_config and app_record:
@@ -111,21 +102,136 @@ class TokenBufferMemory:
 
             else:
                 prompt_messages.append(UserPromptMessage(content=message.query))
+            known_token_counts.append(None)
 
             prompt_messages.append(AssistantPromptMessage(content=message.answer))
+            known_token_counts.append(message.answer_tokens or None)
 
         if not prompt_messages:
             return []
 
-        # prune the chat message if it exceeds the max token limit
-        curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+        return self._prune_prompt_messages(prompt_messages, known_token_counts, max_token_limit)
+
+    def _get_message_files(self, messages: Sequence[Message]) -> dict[str, list[MessageFile]]:
+        """Load the files of all messages with one query."""
+        if not messages:
+            return {}
+
+        message_files: dict[str, list[MessageFile]] = {}
+        stmt = select(MessageFile).where(MessageFile.message_id.in_([message.id for message in messages]))
+        for message_file in db.session.scalars(stmt):
+            message_files.setdefault(message_file.message_id, []).append(message_file)
+        return message_files
+
+    def _get_file_extra_configs(
+        self, messages: Sequence[Message], message_files: dict[str, list[MessageFile]]
+    ) -> dict[str, Optional[FileUploadConfig]]:
+        """Resolve the file upload config of every message with files, loading each workflow once."""
+        messages_with_files = [message for message in messages if message.id in message_files]
+        if not messages_with_files:
+            return {}
+
+        if self.conversation.mode in {AppMode.AGENT_CHAT, AppMode.COMPLETION, AppMode.CHAT}:
+            file_extra_config = FileUploadConfigManager.convert(self.conversation.model_config)
+            return {message.id: file_extra_config for message in messages_with_files}
+        elif self.conversation.mode not in {AppMode.ADVANCED_CHAT, AppMode.WORKFLOW}:
+            raise AssertionError(f"Invalid app mode: {self.conversation.mode}")
+
+        workflow_run_ids = {message.workflow_run_id for message in messages_with_files if message.workflow_run_id}
+        workflow_ids_by_run_id: dict[str, str] = {}
+        if workflow_run_ids:
+            stmt = select(WorkflowRun.id, WorkflowRun.workflow_id).where(WorkflowRun.id.in_(workflow_run_ids))
+            workflow_ids_by_run_id = {row.id: row.workflow_id for row in db.session.execute(stmt)}
+        workflows: dict[str, Workflow] = {}
+        if workflow_ids_by_run_id:
+            stmt_workflows = select(Workflow).where(Workflow.id.in_(set(workflow_ids_by_run_id.values())))
+            workflows = {workflow.id: workflow for workflow in db.session.scalars(stmt_workflows)}
+
+        file_extra_configs_by_workflow_id: dict[str, Optional[FileUploadConfig]] = {}
+        file_extra_configs: dict[str, Optional[FileUploadConfig]] = {}
+        for message in messages_with_files:
+            workflow_id = workflow_ids_by_run_id.get(message.workflow_run_id or "")
+            if not workflow_id:
+                raise ValueError(f"Workflow run not found: {message.workflow_run_id}")
+            workflow = workflows.get(workflow_id)
+            if not workflow:
+                raise ValueError(f"Workflow not found: {workflow_id}")
+            if workflow_id not in file_extra_configs_by_workflow_id:
+                file_extra_configs_by_workflow_id[workflow_id] = FileUploadConfigManager.convert(
+                    workflow.features_dict, is_vision=False
+                )
+            file_extra_configs[message.id] = file_extra_configs_by_workflow_id[workflow_id]
+        return file_extra_configs
+
+    def _prune_prompt_messages(
+        self,
+        prompt_messages: list[PromptMessage],
+        known_token_counts: list[Optional[int]],
+        max_token_limit: int,
+    ) -> list[PromptMessage]:
+        """
+        Drop the oldest prompt messages until the rest fits in max_token_limit, keeping at least one.
+
+        Each prompt message gets a token estimate, from the stored answer tokens when known and from
+        its share of the text length otherwise, scaled so the estimates add up to the real total.
+        Suffix sums of the estimates give the likely cut, which is checked against the model's
+        token counter and corrected with a binary search. This takes a handful of token counts
+        instead of one per dropped message.
+        """
+        total_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+        if total_tokens <= max_token_limit or len(prompt_messages) == 1:
+            return prompt_messages
+
+        text_lengths = [len(self._get_prompt_message_text(prompt_message)) for prompt_message in prompt_messages]
+        unknown_tokens = max(total_tokens - sum(count or 0 for count in known_token_counts), 0)
+        unknown_length = sum(length for length, count in zip(text_lengths, known_token_counts) if count is None)
+        estimated_tokens = [
+            count if count is not None else (unknown_tokens * length / unknown_length if unknown_length else 0)
+            for length, count in zip(text_lengths, known_token_counts)
+        ]
+
+        # first start index whose estimated suffix fits
+        estimated_start = len(prompt_messages) - 1
+        suffix_tokens = 0.0
+        for i in range(len(prompt_messages) - 1, -1, -1):
+            suffix_tokens += estimated_tokens[i]
+            if suffix_tokens > max_token_limit:
+                break
+            estimated_start = i
+
+        def fits(start: int) -> bool:
+            return self.model_instance.get_llm_num_tokens(prompt_messages[start:]) <= max_token_limit
+
+        # the full history does not fit, and at most every message but the last one is dropped
+        lo, hi = 1, len(prompt_messages) - 1
+        probe = min(max(estimated_start, lo), hi)
+        neighbour_checked = False
+        while lo < hi:
+            if fits(probe):
+                hi = probe
+                neighbour = probe - 1
+            else:
+                # the last message is kept even when it does not fit
+                lo = min(probe + 1, hi)
+                neighbour = probe + 1
+            # the estimate is usually exact or off by one, so check its neighbour before bisecting
+            if not neighbour_checked and lo <= neighbour <= hi:
+                probe = neighbour
+                neighbour_checked = True
+            else:
+                probe = (lo + hi) // 2
 
-        if curr_message_tokens > max_token_limit:
-            while curr_message_tokens > max_token_limit and len(prompt_messages) > 1:
-                prompt_messages.pop(0)
-                curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+        return prompt_messages[lo:]
 
-        return prompt_messages
+    @staticmethod
+    def _get_prompt_message_text(prompt_message: PromptMessage) -> str:
+        if isinstance(prompt_message.content, str):
+            return prompt_message.content
+        if isinstance(prompt_message.content, list):
+            return "".join(
+                content.data for content in prompt_message.content if isinstance(content, TextPromptMessageContent)
+            )
+        return ""
 
     def get_history_prompt_text(
         self,
@@ -60,7 +60,8 @@ class ModelInstance:
         if credentials is None:
             raise ProviderTokenNotInitError(f"Model {model} credentials is not initialized.")
 
-        return credentials
+        # configurations are shared between requests, copy so they are not modified
+        return dict(credentials)
 
     @staticmethod
     def _get_load_balancing_manager(
@@ -8,6 +8,7 @@ from typing import Optional
 from pydantic import BaseModel
 
 import contexts
+from core.helper.plugin_model_cache import plugin_model_cache
 from core.helper.position_helper import get_provider_position_map, sort_to_dict_by_position_map
 from core.model_runtime.entities.model_entities import AIModelEntity, ModelType
 from core.model_runtime.entities.provider_entities import ProviderConfig, ProviderEntity, SimpleProviderEntity
@@ -71,9 +72,10 @@ class ModelProviderFactory:
 
         return [extension.plugin_model_provider_entity.declaration for extension in sorted_extensions.values()]
 
-    def get_plugin_model_providers(self) -> Sequence[PluginModelProviderEntity]:
+    def get_plugin_model_providers(self, refresh: bool = False) -> Sequence[PluginModelProviderEntity]:
         """
         Get all plugin model providers
+        :param refresh: fetch the providers from the plugin daemon even if they are cached
         :return: list of plugin model providers
         """
         # check if context is set
@@ -85,20 +87,27 @@ class ModelProviderFactory:
 
         with contexts.plugin_model_providers_lock.get():
             plugin_model_providers = contexts.plugin_model_providers.get()
-            if plugin_model_providers is not None:
+            if plugin_model_providers is not None and not refresh:
                 return plugin_model_providers
 
-            plugin_model_providers = []
+            plugin_model_providers = plugin_model_cache.get_model_providers(
+                self.tenant_id, self._fetch_plugin_model_providers, refresh=refresh
+            )
             contexts.plugin_model_providers.set(plugin_model_providers)
 
-            # Fetch plugin model providers
-            plugin_providers = self.plugin_model_manager.fetch_model_providers(self.tenant_id)
+            return plugin_model_providers
 
-            for provider in plugin_providers:
-                provider.declaration.provider = provider.plugin_id + "/" + provider.declaration.provider
-                plugin_model_providers.append(provider)
+    def _fetch_plugin_model_providers(self) -> list[PluginModelProviderEntity]:
+        plugin_model_providers = []
 
-            return plugin_model_providers
+        # Fetch plugin model providers
+        plugin_providers = self.plugin_model_manager.fetch_model_providers(self.tenant_id)
+
+        for provider in plugin_providers:
+            provider.declaration.provider = provider.plugin_id + "/" + provider.declaration.provider
+            plugin_model_providers.append(provider)
+
+        return plugin_model_providers
 
     def get_provider_schema(self, provider: str) -> ProviderEntity:
         """
@@ -127,6 +136,14 @@ class ModelProviderFactory:
             None,
         )
 
+        if not plugin_model_provider_entity:
+            # the providers may be cached from before the plugin was installed
+            plugin_model_provider_entities = self.get_plugin_model_providers(refresh=True)
+            plugin_model_provider_entity = next(
+                (p for p in plugin_model_provider_entities if p.declaration.provider == provider),
+                None,
+            )
+
         if not plugin_model_provider_entity:
             raise ValueError(f"Invalid provider: {provider}")
 
@@ -222,14 +239,21 @@ class ModelProviderFactory:
             if cache_key in contexts.plugin_model_schemas.get():
                 return contexts.plugin_model_schemas.get()[cache_key]
 
-            schema = self.plugin_model_manager.get_model_schema(
-                tenant_id=self.tenant_id,
-                user_id="unknown",
-                plugin_id=plugin_id,
-                provider=provider_name,
-                model_type=model_type.value,
-                model=model,
-                credentials=credentials or {},
+            schema = plugin_model_cache.get_model_schema(
+                self.tenant_id,
+                self.get_plugin_model_provider(provider),
+                model_type,
+                model,
+                credentials,
+                lambda: self.plugin_model_manager.get_model_schema(
+                    tenant_id=self.tenant_id,
+                    user_id="unknown",
+                    plugin_id=plugin_id,
+                    provider=provider_name,
+                    model_type=model_type.value,
+                    model=model,
+                    credentials=credentials or {},
+                ),
             )
 
             if schema:
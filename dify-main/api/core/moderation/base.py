@@ -27,6 +27,22 @@ class ModerationOutputsResult(BaseModel):
     text: str = ""
 
 
+class ModerationOutputScanner(ABC):
+    """
+    Moderates an output streamed in chunks, looking at each chunk once.
+    """
+
+    @abstractmethod
+    def scan(self, chunk: str) -> ModerationOutputsResult:
+        """
+        Moderate the next chunk of the output.
+
+        :param chunk: output content following the chunks scanned before
+        :return: moderation result of the output so far
+        """
+        raise NotImplementedError
+
+
 class Moderation(Extensible, ABC):
     """
     The base class of moderation.
@@ -75,6 +91,16 @@ class Moderation(Extensible, ABC):
         """
         raise NotImplementedError
 
+    def get_output_scanner(self) -> Optional[ModerationOutputScanner]:
+        """
+        Get a scanner moderating the output as it is streamed.
+        Returns None if the output can only be moderated as a whole, then `moderation_for_outputs`
+        is called with the output buffered so far.
+
+        :return:
+        """
+        return None
+
     @classmethod
     def _validate_inputs_and_outputs_config(cls, config: dict, is_preset_response_required: bool) -> None:
         # inputs_config
@@ -1,5 +1,7 @@
+from typing import Optional
+
 from core.extension.extensible import ExtensionModule
-from core.moderation.base import Moderation, ModerationInputsResult, ModerationOutputsResult
+from core.moderation.base import Moderation, ModerationInputsResult, ModerationOutputScanner, ModerationOutputsResult
 from extensions.ext_code_based_extension import code_based_extension
 
 
@@ -47,3 +49,11 @@ class ModerationFactory:
         :return:
         """
         return self.__extension_instance.moderation_for_outputs(text)
+
+    def get_output_scanner(self) -> Optional[ModerationOutputScanner]:
+        """
+        Get a scanner moderating the output as it is streamed, None if not supported by the extension.
+
+        :return:
+        """
+        return self.__extension_instance.get_output_scanner()
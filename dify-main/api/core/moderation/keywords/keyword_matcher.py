@@ -0,0 +1,113 @@
+import hashlib
+import threading
+from collections.abc import Iterable
+
+from cachetools import LRUCache
+
+
+def _normalize(text: str) -> str:
+    # the final sigma depends on the next character, which may not have been streamed yet
+    return text.lower().replace("ς", "σ")
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive Aho-Corasick matcher finding whether a text contains any of a set of keywords.
+
+    Matching takes time linear in the length of the text, however many keywords there are, and
+    texts can be scanned in chunks with a `KeywordScanner`.
+    """
+
+    _cache: LRUCache[str, "KeywordMatcher"] = LRUCache(maxsize=256)
+    _cache_lock = threading.Lock()
+
+    def __init__(self, keywords: Iterable[str]):
+        # state 0 is the root, each state has its transitions, failure state and whether a keyword ends there
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._matched: list[bool] = [False]
+
+        for keyword in keywords:
+            keyword = _normalize(keyword)
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._matched.append(False)
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._matched[state] = True
+
+        # breadth first, so failure states are complete before their successors are visited
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._matched[next_state] = self._matched[next_state] or self._matched[self._fail[next_state]]
+                queue.append(next_state)
+
+    @classmethod
+    def from_keywords_text(cls, keywords_text: str) -> "KeywordMatcher":
+        """
+        Get the matcher of newline separated keywords, built once per distinct keywords text.
+        """
+        key = hashlib.sha256(keywords_text.encode()).hexdigest()
+        with cls._cache_lock:
+            matcher = cls._cache.get(key)
+        if matcher is None:
+            matcher = cls(keywords_text.split("\n"))
+            with cls._cache_lock:
+                cls._cache[key] = matcher
+        return matcher
+
+    def search(self, text: str) -> bool:
+        """
+        Whether the text contains any of the keywords.
+        """
+        return self.scanner().feed(text)
+
+    def scanner(self) -> "KeywordScanner":
+        return KeywordScanner(self)
+
+    def _advance(self, state: int, text: str) -> tuple[int, bool]:
+        goto, fail, matched = self._goto, self._fail, self._matched
+        for char in _normalize(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if matched[state]:
+                return state, True
+        return state, False
+
+
+class KeywordScanner:
+    """
+    Scans a text streamed in chunks for keywords, looking at every character once.
+    """
+
+    def __init__(self, matcher: KeywordMatcher):
+        self._matcher = matcher
+        self._state = 0
+        self._matched = False
+
+    @property
+    def matched(self) -> bool:
+        return self._matched
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Scan the next chunk of the text.
+
+        :return: whether the text so far contains any of the keywords
+        """
+        if not self._matched:
+            self._state, self._matched = self._matcher._advance(self._state, chunk)
+        return self._matched
@@ -1,7 +1,13 @@
-from collections.abc import Sequence
-from typing import Any
+from typing import Optional
 
-from core.moderation.base import Moderation, ModerationAction, ModerationInputsResult, ModerationOutputsResult
+from core.moderation.base import (
+    Moderation,
+    ModerationAction,
+    ModerationInputsResult,
+    ModerationOutputScanner,
+    ModerationOutputsResult,
+)
+from core.moderation.keywords.keyword_matcher import KeywordMatcher, KeywordScanner
 
 
 class KeywordsModeration(Moderation):
@@ -40,10 +46,7 @@ class KeywordsModeration(Moderation):
             if query:
                 inputs["query__"] = query
 
-            # Filter out empty values
-            keywords_list = [keyword for keyword in self.config["keywords"].split("\n") if keyword]
-
-            flagged = self._is_violated(inputs, keywords_list)
+            flagged = self._is_violated(inputs)
 
         return ModerationInputsResult(
             flagged=flagged, action=ModerationAction.DIRECT_OUTPUT, preset_response=preset_response
@@ -56,18 +59,43 @@ class KeywordsModeration(Moderation):
             raise ValueError("The config is not set.")
 
         if self.config["outputs_config"]["enabled"]:
-            # Filter out empty values
-            keywords_list = [keyword for keyword in self.config["keywords"].split("\n") if keyword]
-
-            flagged = self._is_violated({"text": text}, keywords_list)
+            flagged = self._is_violated({"text": text})
             preset_response = self.config["outputs_config"]["preset_response"]
 
         return ModerationOutputsResult(
             flagged=flagged, action=ModerationAction.DIRECT_OUTPUT, preset_response=preset_response
         )
 
-    def _is_violated(self, inputs: dict, keywords_list: list) -> bool:
-        return any(self._check_keywords_in_value(keywords_list, value) for value in inputs.values())
+    def get_output_scanner(self) -> Optional[ModerationOutputScanner]:
+        if self.config is None:
+            raise ValueError("The config is not set.")
+
+        if not self.config["outputs_config"]["enabled"]:
+            return None
+
+        return KeywordsOutputScanner(
+            scanner=self._get_matcher().scanner(), preset_response=self.config["outputs_config"]["preset_response"]
+        )
+
+    def _is_violated(self, inputs: dict) -> bool:
+        matcher = self._get_matcher()
+        return any(matcher.search(str(value)) for value in inputs.values())
 
-    def _check_keywords_in_value(self, keywords_list: Sequence[str], value: Any) -> bool:
-        return any(keyword.lower() in str(value).lower() for keyword in keywords_list)
+    def _get_matcher(self) -> KeywordMatcher:
+        if self.config is None:
+            raise ValueError("The config is not set.")
+
+        return KeywordMatcher.from_keywords_text(self.config["keywords"])
+
+
+class KeywordsOutputScanner(ModerationOutputScanner):
+    def __init__(self, scanner: KeywordScanner, preset_response: str) -> None:
+        self._scanner = scanner
+        self._preset_response = preset_response
+
+    def scan(self, chunk: str) -> ModerationOutputsResult:
+        return ModerationOutputsResult(
+            flagged=self._scanner.feed(chunk),
+            action=ModerationAction.DIRECT_OUTPUT,
+            preset_response=self._preset_response,
+        )
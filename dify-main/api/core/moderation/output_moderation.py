@@ -9,7 +9,7 @@ from pydantic import BaseModel, ConfigDict
 from configs import dify_config
 from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
 from core.app.entities.queue_entities import QueueMessageReplaceEvent
-from core.moderation.base import ModerationAction, ModerationOutputsResult
+from core.moderation.base import ModerationAction, ModerationOutputScanner, ModerationOutputsResult
 from core.moderation.factory import ModerationFactory
 
 logger = logging.getLogger(__name__)
@@ -29,6 +29,7 @@ class OutputModeration(BaseModel):
 
     thread: Optional[threading.Thread] = None
     thread_running: bool = True
+    scanner: Optional[ModerationOutputScanner] = None
     buffer: str = ""
     is_final_chunk: bool = False
     final_output: Optional[str] = None
@@ -43,8 +44,40 @@ class OutputModeration(BaseModel):
     def append_new_token(self, token: str) -> None:
         self.buffer += token
 
-        if not self.thread:
-            self.thread = self.start_thread()
+        if not self.scanner and not self.thread:
+            # moderations able to scan the output as it is streamed do not need to poll the buffer
+            self.scanner = self.get_output_scanner(tenant_id=self.tenant_id, app_id=self.app_id)
+            if not self.scanner:
+                self.thread = self.start_thread()
+
+        if self.scanner:
+            self.scan_new_token(token)
+
+    def scan_new_token(self, token: str) -> None:
+        if not self.scanner or self.final_output is not None:
+            return
+
+        try:
+            result = self.scanner.scan(token)
+        except Exception:
+            logger.exception("Moderation Output error, app_id: %s", self.app_id)
+            return
+
+        if not result.flagged:
+            return
+
+        if result.action == ModerationAction.DIRECT_OUTPUT:
+            final_output = result.preset_response
+            self.final_output = final_output
+        else:
+            final_output = result.text
+
+        self.queue_manager.publish(
+            QueueMessageReplaceEvent(
+                text=final_output, reason=QueueMessageReplaceEvent.MessageReplaceReason.OUTPUT_MODERATION
+            ),
+            PublishFrom.TASK_PIPELINE,
+        )
 
     def moderation_completion(self, completion: str, public_event: bool = False) -> tuple[str, bool]:
         self.buffer = completion
@@ -127,6 +160,18 @@ class OutputModeration(BaseModel):
                 if result.action == ModerationAction.DIRECT_OUTPUT:
                     break
 
+    def get_output_scanner(self, tenant_id: str, app_id: str) -> Optional[ModerationOutputScanner]:
+        try:
+            moderation_factory = ModerationFactory(
+                name=self.rule.type, app_id=app_id, tenant_id=tenant_id, config=self.rule.config
+            )
+
+            return moderation_factory.get_output_scanner()
+        except Exception:
+            logger.exception("Moderation Output error, app_id: %s", app_id)
+
+        return None
+
     def moderation(self, tenant_id: str, app_id: str, moderation_buffer: str) -> Optional[ModerationOutputsResult]:
         try:
             moderation_factory = ModerationFactory(
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 from sqlalchemy.orm import Session
 
@@ -29,6 +30,15 @@ class BaseTraceInstance(ABC):
         """
         ...
 
+    def trace_batch(self, trace_infos: Sequence[BaseTraceInfo]):
+        """
+        Trace several activities of the same app at once.
+        Subclasses whose service has a bulk upload API can override this,
+        by default each activity is traced on its own.
+        """
+        for trace_info in trace_infos:
+            self.trace(trace_info)
+
     def get_service_account_with_tenant(self, app_id: str) -> Account:
         """
         Get service account for an app and set up its tenant.
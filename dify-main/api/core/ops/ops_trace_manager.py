@@ -35,7 +35,7 @@ from extensions.ext_database import db
 from extensions.ext_storage import storage
 from models.model import App, AppModelConfig, Conversation, Message, MessageFile, TraceAppConfig
 from models.workflow import WorkflowAppLog, WorkflowRun
-from tasks.ops_trace_task import process_trace_tasks
+from tasks.ops_trace_task import process_trace_tasks, process_trace_tasks_batch
 
 
 class OpsTraceProviderConfigMap(dict[str, dict[str, Any]]):
@@ -829,6 +829,10 @@ trace_manager_timer: Optional[threading.Timer] = None
 trace_manager_queue: queue.Queue = queue.Queue()
 trace_manager_interval = int(os.getenv("TRACE_QUEUE_MANAGER_INTERVAL", 5))
 trace_manager_batch_size = int(os.getenv("TRACE_QUEUE_MANAGER_BATCH_SIZE", 100))
+# In batch mode the traces collected in one run are sent to a single celery task, inline when their
+# serialized size is at most TRACE_QUEUE_MANAGER_INLINE_MAX_BYTES and as one storage file otherwise
+trace_manager_batch_mode = os.getenv("TRACE_QUEUE_MANAGER_BATCH_MODE", "false").lower() == "true"
+trace_manager_inline_max_bytes = int(os.getenv("TRACE_QUEUE_MANAGER_INLINE_MAX_BYTES", 64 * 1024))
 
 
 class TraceQueueManager:
@@ -879,6 +883,10 @@ class TraceQueueManager:
             trace_manager_timer.start()
 
     def send_to_celery(self, tasks: list[TraceTask]):
+        if trace_manager_batch_mode:
+            self.send_batch_to_celery(tasks)
+            return
+
         with self.flask_app.app_context():
             for task in tasks:
                 if task.app_id is None:
@@ -897,3 +905,27 @@ class TraceQueueManager:
                     "app_id": task.app_id,
                 }
                 process_trace_tasks.delay(file_info)
+
+    def send_batch_to_celery(self, tasks: list[TraceTask]):
+        with self.flask_app.app_context():
+            tasks_data: list[dict[str, Any]] = []
+            for task in tasks:
+                if task.app_id is None:
+                    continue
+                trace_info = task.execute()
+                task_data = TaskData(
+                    app_id=task.app_id,
+                    trace_info_type=type(trace_info).__name__,
+                    trace_info=trace_info.model_dump() if trace_info else None,
+                )
+                tasks_data.append(task_data.model_dump(mode="json"))
+            if not tasks_data:
+                return
+
+            payload = json.dumps(tasks_data).encode("utf-8")
+            if len(payload) <= trace_manager_inline_max_bytes:
+                process_trace_tasks_batch.delay({"traces": tasks_data})
+            else:
+                file_id = uuid4().hex
+                storage.save(f"{OPS_FILE_PATH}batch/{file_id}.json", payload)
+                process_trace_tasks_batch.delay({"file_id": file_id})
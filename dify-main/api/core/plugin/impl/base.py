@@ -1,12 +1,16 @@
 import inspect
 import json
 import logging
+import os
+import threading
 from collections.abc import Callable, Generator
-from typing import TypeVar
+from typing import Optional, TypeVar
 
 import requests
 from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
+from urllib3.util.retry import Retry
 from yarl import URL
 
 from configs import dify_config
@@ -37,6 +41,56 @@ T = TypeVar("T", bound=(BaseModel | dict | list | bool | str))
 
 logger = logging.getLogger(__name__)
 
+_plugin_daemon_session: Optional[requests.Session] = None
+_plugin_daemon_session_pid: Optional[int] = None
+_plugin_daemon_session_lock = threading.Lock()
+
+
+def get_plugin_daemon_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session for the plugin daemon.
+
+    Connections are pooled per process; a forked worker builds its own session instead of
+    reusing sockets inherited from its parent. Only connection failures are retried, a request
+    that reached the daemon is never sent twice.
+    """
+    global _plugin_daemon_session, _plugin_daemon_session_pid
+
+    pid = os.getpid()
+    if _plugin_daemon_session is not None and _plugin_daemon_session_pid == pid:
+        return _plugin_daemon_session
+
+    with _plugin_daemon_session_lock:
+        if _plugin_daemon_session is None or _plugin_daemon_session_pid != pid:
+            retries = Retry(
+                total=dify_config.PLUGIN_DAEMON_MAX_RETRIES,
+                connect=dify_config.PLUGIN_DAEMON_MAX_RETRIES,
+                read=0,
+                status=0,
+                other=0,
+                backoff_factor=0.1,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=dify_config.PLUGIN_DAEMON_POOL_CONNECTIONS,
+                pool_maxsize=dify_config.PLUGIN_DAEMON_POOL_MAXSIZE,
+                max_retries=retries,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _plugin_daemon_session = session
+            _plugin_daemon_session_pid = pid
+
+    return _plugin_daemon_session
+
+
+def _strip_stream_line(line: bytes) -> str:
+    line = line.strip()
+    if line.startswith(b"data:"):
+        line = line[5:].strip()
+    return line.decode("utf-8") if line else ""
+
 
 class BasePluginClient:
     def _request(
@@ -60,9 +114,21 @@ class BasePluginClient:
         if headers.get("Content-Type") == "application/json" and isinstance(data, dict):
             data = json.dumps(data)
 
+        timeout: tuple[float, float | None] = (
+            dify_config.PLUGIN_DAEMON_CONNECT_TIMEOUT,
+            dify_config.PLUGIN_DAEMON_READ_TIMEOUT,
+        )
         try:
-            response = requests.request(
-                method=method, url=str(url), headers=headers, data=data, params=params, stream=stream, files=files
+            response = get_plugin_daemon_session().request(
+                method=method,
+                url=str(url),
+                headers=headers,
+                data=data,
+                params=params,
+                stream=stream,
+                files=files,
+                # the stubs only accept the two tuple shapes separately
+                timeout=timeout,  # type: ignore[arg-type]
             )
         except requests.exceptions.ConnectionError:
             logger.exception("Request to Plugin Daemon Service failed")
@@ -78,17 +144,37 @@ class BasePluginClient:
         headers: dict | None = None,
         data: bytes | dict | None = None,
         files: dict | None = None,
-    ) -> Generator[bytes, None, None]:
+    ) -> Generator[str, None, None]:
         """
         Make a stream request to the plugin daemon inner API
         """
         response = self._request(method, path, headers, data, params, files, stream=True)
-        for line in response.iter_lines(chunk_size=1024 * 8):
-            line = line.decode("utf-8").strip()
-            if line.startswith("data:"):
-                line = line[5:].strip()
-            if line:
-                yield line
+        with response:
+            yield from self._iter_stream_lines(response)
+
+    @staticmethod
+    def _iter_stream_lines(response: requests.Response) -> Generator[str, None, None]:
+        """
+        Split a streamed response into event payloads.
+
+        Chunks are yielded as soon as they arrive and split on raw bytes, so each line is decoded
+        exactly once and the ``data:`` prefix is stripped without re-scanning decoded text.
+        """
+        pending: list[bytes] = []
+        for chunk in response.iter_content(chunk_size=None):
+            *lines, tail = chunk.split(b"\n")
+            if lines:
+                lines[0] = b"".join(pending) + lines[0]
+                pending.clear()
+                for line in lines:
+                    payload = _strip_stream_line(line)
+                    if payload:
+                        yield payload
+            if tail:
+                pending.append(tail)
+        payload = _strip_stream_line(b"".join(pending))
+        if payload:
+            yield payload
 
     def _stream_request_with_model(
         self,
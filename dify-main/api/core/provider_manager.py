@@ -24,6 +24,8 @@ from core.entities.provider_entities import (
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
 from core.helper.position_helper import is_filtered
+from core.helper.provider_configurations_cache import provider_configurations_cache
+from core.helper.provider_quota_accumulator import ProviderQuotaAccumulator
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
     ConfigurateMethod,
@@ -120,6 +122,9 @@ class ProviderManager:
                     provider_name_to_provider_model_records_dict[provider_name]
                 )
 
+        # Get quota deducted from hosted providers but not written yet
+        pending_quota = ProviderQuotaAccumulator.get_pending(tenant_id)
+
         # Get all provider entities
         model_provider_factory = ModelProviderFactory(tenant_id)
         provider_entities = model_provider_factory.get_providers()
@@ -172,7 +177,9 @@ class ProviderManager:
             )
 
             # Convert to system configuration
-            system_configuration = self._to_system_configuration(tenant_id, provider_entity, provider_records)
+            system_configuration = self._to_system_configuration(
+                tenant_id, provider_entity, provider_records, pending_quota
+            )
 
             # Get preferred provider type
             preferred_provider_type_record = provider_name_to_preferred_model_provider_records_dict.get(provider_name)
@@ -250,10 +257,16 @@ class ProviderManager:
         :param model_type: model type
         :return:
         """
-        provider_configurations = self.get_configurations(tenant_id)
+        provider_configurations = provider_configurations_cache.get(tenant_id, self.get_configurations)
 
         # get provider instance
         provider_configuration = provider_configurations.get(provider)
+        if not provider_configuration:
+            # the provider may have been installed after the configurations were cached
+            provider_configurations = provider_configurations_cache.get(
+                tenant_id, self.get_configurations, refresh=True
+            )
+            provider_configuration = provider_configurations.get(provider)
         if not provider_configuration:
             raise ValueError(f"Provider {provider} does not exist.")
 
@@ -697,7 +710,11 @@ class ProviderManager:
         return CustomConfiguration(provider=custom_provider_configuration, models=custom_model_configurations)
 
     def _to_system_configuration(
-        self, tenant_id: str, provider_entity: ProviderEntity, provider_records: list[Provider]
+        self,
+        tenant_id: str,
+        provider_entity: ProviderEntity,
+        provider_records: list[Provider],
+        pending_quota: Optional[dict[tuple[str, str], int]] = None,
     ) -> SystemConfiguration:
         """
         Convert to system configuration.
@@ -705,6 +722,7 @@ class ProviderManager:
         :param tenant_id: workspace id
         :param provider_entity: provider entity
         :param provider_records: provider records
+        :param pending_quota: quota deducted but not written yet, by provider name and quota type
         :return:
         """
         # Get hosting configuration
@@ -745,13 +763,19 @@ class ProviderManager:
                 if provider_record.quota_limit is None:
                     raise ValueError("quota_limit is None")
 
+                quota_used = provider_record.quota_used
+                if pending_quota:
+                    quota_used += pending_quota.get(
+                        (ModelProviderID(provider_record.provider_name).provider_name, provider_quota.quota_type.value),
+                        0,
+                    )
+
                 quota_configuration = QuotaConfiguration(
                     quota_type=provider_quota.quota_type,
                     quota_unit=provider_hosting_configuration.quota_unit or QuotaUnit.TOKENS,
-                    quota_used=provider_record.quota_used,
+                    quota_used=quota_used,
                     quota_limit=provider_record.quota_limit,
-                    is_valid=provider_record.quota_limit > provider_record.quota_used
-                    or provider_record.quota_limit == -1,
+                    is_valid=provider_record.quota_limit > quota_used or provider_record.quota_limit == -1,
                     restrict_models=provider_quota.restrict_models,
                 )
 
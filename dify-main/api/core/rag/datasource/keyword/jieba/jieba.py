@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from configs import dify_config
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
 from core.rag.datasource.keyword.keyword_base import BaseKeyword
+from core.rag.datasource.segment_loader import SegmentLoader
 from core.rag.models.document import Document
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
@@ -91,15 +92,18 @@ class Jieba(BaseKeyword):
         document_ids_filter = kwargs.get("document_ids_filter")
         sorted_chunk_indices = self._retrieve_ids_by_query(keyword_table or {}, query, k)
 
+        return self._get_documents_by_chunk_indices(sorted_chunk_indices, document_ids_filter)
+
+    def _get_documents_by_chunk_indices(
+        self, sorted_chunk_indices: list[str], document_ids_filter: Optional[list[str]] = None
+    ) -> list[Document]:
+        segments = SegmentLoader.load_segments_by_index_node_ids(
+            [self.dataset.id], sorted_chunk_indices, document_ids_filter
+        )
+
         documents = []
         for chunk_index in sorted_chunk_indices:
-            segment_query = db.session.query(DocumentSegment).where(
-                DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id == chunk_index
-            )
-            if document_ids_filter:
-                segment_query = segment_query.where(DocumentSegment.document_id.in_(document_ids_filter))
-            segment = segment_query.first()
-
+            segment = segments.get((self.dataset.id, chunk_index))
             if segment:
                 documents.append(
                     Document(
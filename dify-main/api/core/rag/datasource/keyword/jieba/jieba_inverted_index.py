@@ -0,0 +1,200 @@
+import logging
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from core.rag.datasource.keyword.jieba.jieba import Jieba
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_base import BaseKeyword
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from extensions.ext_storage import storage
+from models.dataset import Dataset, DatasetKeywordPosting, DocumentSegment
+
+logger = logging.getLogger(__name__)
+
+# Max rows per multi-row INSERT, keeps statements well below the bind parameter limit.
+_POSTINGS_INSERT_BATCH_SIZE = 1000
+
+
+class JiebaInvertedIndex(Jieba):
+    """
+    Jieba keyword store backed by an inverted index with one row per (keyword, index node).
+
+    The legacy Jieba store keeps the whole dataset keyword table in one JSON blob and rewrites it on
+    every change. Here writes only insert or delete the postings they touch and a search only reads
+    the postings of the query keywords, so neither depends on the size of the dataset.
+    """
+
+    def __init__(self, dataset: Dataset):
+        super().__init__(dataset)
+        self._legacy_keyword_table_checked = False
+
+    def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
+        self.add_texts(texts, **kwargs)
+        return self
+
+    def add_texts(self, texts: list[Document], **kwargs):
+        self._migrate_legacy_keyword_table()
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_list = kwargs.get("keywords_list")
+
+        keywords_by_node_id: dict[str, list[str]] = {}
+        for i, text in enumerate(texts):
+            if text.metadata is None:
+                continue
+            keywords = keywords_list[i] if keywords_list else None
+            if not keywords:
+                keywords = keyword_table_handler.extract_keywords(
+                    text.page_content, self._config.max_keywords_per_chunk
+                )
+            keywords_by_node_id[text.metadata["doc_id"]] = list(keywords)
+
+        if not keywords_by_node_id:
+            return
+
+        self._update_segments_keywords(keywords_by_node_id)
+        self._add_postings(keywords_by_node_id)
+
+    def text_exists(self, id: str) -> bool:
+        self._migrate_legacy_keyword_table()
+        stmt = select(DatasetKeywordPosting.id).where(
+            DatasetKeywordPosting.dataset_id == self.dataset.id,
+            DatasetKeywordPosting.index_node_id == id,
+        )
+        return db.session.scalar(stmt.limit(1)) is not None
+
+    def delete_by_ids(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        self._migrate_legacy_keyword_table()
+        db.session.query(DatasetKeywordPosting).where(
+            DatasetKeywordPosting.dataset_id == self.dataset.id,
+            DatasetKeywordPosting.index_node_id.in_(ids),
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+    def search(self, query: str, **kwargs: Any) -> list[Document]:
+        self._migrate_legacy_keyword_table()
+
+        k = kwargs.get("top_k", 4)
+        document_ids_filter = kwargs.get("document_ids_filter")
+        sorted_chunk_indices = self._retrieve_ids_by_postings(query, k)
+
+        return self._get_documents_by_chunk_indices(sorted_chunk_indices, document_ids_filter)
+
+    def delete(self) -> None:
+        db.session.query(DatasetKeywordPosting).where(DatasetKeywordPosting.dataset_id == self.dataset.id).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        # drop a legacy keyword table that was never migrated
+        super().delete()
+
+    def create_segment_keywords(self, node_id: str, keywords: list[str]):
+        self._migrate_legacy_keyword_table()
+        self._update_segment_keywords(self.dataset.id, node_id, keywords)
+        self._add_postings({node_id: keywords})
+
+    def multi_create_segment_keywords(self, pre_segment_data_list: list):
+        self._migrate_legacy_keyword_table()
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_by_node_id: dict[str, list[str]] = {}
+        for pre_segment_data in pre_segment_data_list:
+            segment = pre_segment_data["segment"]
+            if pre_segment_data["keywords"]:
+                segment.keywords = pre_segment_data["keywords"]
+            else:
+                keywords = keyword_table_handler.extract_keywords(segment.content, self._config.max_keywords_per_chunk)
+                segment.keywords = list(keywords)
+            keywords_by_node_id[segment.index_node_id] = segment.keywords
+        self._add_postings(keywords_by_node_id)
+
+    def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
+        self._migrate_legacy_keyword_table()
+        self._add_postings({node_id: keywords})
+
+    def _retrieve_ids_by_postings(self, query: str, k: int = 4) -> list[str]:
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords = keyword_table_handler.extract_keywords(query)
+        if not keywords:
+            return []
+
+        # rank index nodes by the number of query keywords they match
+        match_count = func.count(DatasetKeywordPosting.keyword).label("match_count")
+        stmt = (
+            select(DatasetKeywordPosting.index_node_id, match_count)
+            .where(
+                DatasetKeywordPosting.dataset_id == self.dataset.id,
+                DatasetKeywordPosting.keyword.in_(keywords),
+            )
+            .group_by(DatasetKeywordPosting.index_node_id)
+            .order_by(match_count.desc(), DatasetKeywordPosting.index_node_id)
+            .limit(k)
+        )
+        return [row.index_node_id for row in db.session.execute(stmt)]
+
+    def _add_postings(self, keywords_by_node_id: Mapping[str, Iterable[str]]):
+        rows = [
+            {"dataset_id": self.dataset.id, "keyword": keyword, "index_node_id": node_id}
+            for node_id, keywords in keywords_by_node_id.items()
+            for keyword in set(keywords)
+        ]
+        for i in range(0, len(rows), _POSTINGS_INSERT_BATCH_SIZE):
+            stmt = insert(DatasetKeywordPosting).values(rows[i : i + _POSTINGS_INSERT_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_nothing(index_elements=["dataset_id", "keyword", "index_node_id"])
+            db.session.execute(stmt)
+        db.session.commit()
+
+    def _update_segments_keywords(self, keywords_by_node_id: Mapping[str, list[str]]):
+        segments = (
+            db.session.query(DocumentSegment)
+            .where(
+                DocumentSegment.dataset_id == self.dataset.id,
+                DocumentSegment.index_node_id.in_(list(keywords_by_node_id.keys())),
+            )
+            .all()
+        )
+        for segment in segments:
+            segment.keywords = keywords_by_node_id[segment.index_node_id]
+        db.session.commit()
+
+    def _migrate_legacy_keyword_table(self):
+        """
+        Move a keyword table written by the legacy Jieba store into postings.
+
+        Runs once per dataset: the legacy table is dropped after the move, so later calls only cost
+        a lookup that finds nothing.
+        """
+        if self._legacy_keyword_table_checked:
+            return
+        if self.dataset.dataset_keyword_table is None:
+            self._legacy_keyword_table_checked = True
+            return
+
+        lock_name = f"keyword_indexing_lock_{self.dataset.id}"
+        with redis_client.lock(lock_name, timeout=600):
+            dataset_keyword_table = self.dataset.dataset_keyword_table
+            if dataset_keyword_table is not None:
+                keyword_table_dict = dataset_keyword_table.keyword_table_dict
+                keyword_table: Optional[dict] = keyword_table_dict["__data__"]["table"] if keyword_table_dict else None
+                keywords_by_node_id: dict[str, list[str]] = {}
+                for keyword, node_ids in (keyword_table or {}).items():
+                    for node_id in node_ids:
+                        keywords_by_node_id.setdefault(node_id, []).append(keyword)
+                self._add_postings(keywords_by_node_id)
+
+                db.session.delete(dataset_keyword_table)
+                db.session.commit()
+                if dataset_keyword_table.data_source_type != "database":
+                    file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
+                    storage.delete(file_key)
+                logger.info(
+                    "Migrated legacy keyword table of dataset %s into %d postings",
+                    self.dataset.id,
+                    sum(len(keywords) for keywords in keywords_by_node_id.values()),
+                )
+        self._legacy_keyword_table_checked = True
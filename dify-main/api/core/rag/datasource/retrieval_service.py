@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session, load_only
 from configs import dify_config
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor
 from core.rag.datasource.keyword.keyword_factory import Keyword
+from core.rag.datasource.segment_loader import SegmentLoader
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.embedding.retrieval import RetrievalSegments
 from core.rag.entities.metadata_entities import MetadataCondition
@@ -16,7 +17,7 @@ from core.rag.models.document import Document
 from core.rag.rerank.rerank_type import RerankMode
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from extensions.ext_database import db
-from models.dataset import ChildChunk, Dataset, DocumentSegment
+from models.dataset import Dataset
 from models.dataset import Document as DatasetDocument
 from services.external_knowledge_service import ExternalDatasetService
 
@@ -299,6 +300,25 @@ class RetrievalService:
                 .all()
             }
 
+            # Batch load child chunks and segments of all hits
+            child_index_node_ids = []
+            index_node_ids = []
+            for document in documents:
+                dataset_document = dataset_documents.get(document.metadata.get("document_id"))
+                if not dataset_document or not document.metadata.get("doc_id"):
+                    continue
+                if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+                    child_index_node_ids.append(document.metadata["doc_id"])
+                else:
+                    index_node_ids.append(document.metadata["doc_id"])
+            dataset_ids = {doc.dataset_id for doc in dataset_documents.values()}
+
+            child_chunks_by_index_node_id = SegmentLoader.load_child_chunks_by_index_node_ids(child_index_node_ids)
+            parent_segments = SegmentLoader.load_available_segments_by_ids(
+                dataset_ids, {child_chunk.segment_id for child_chunk in child_chunks_by_index_node_id.values()}
+            )
+            segments = SegmentLoader.load_segments_by_index_node_ids(dataset_ids, index_node_ids, only_available=True)
+
             records = []
             include_segment_ids = set()
             segment_child_map = {}
@@ -318,29 +338,13 @@ class RetrievalService:
                     child_index_node_id = document.metadata.get("doc_id")
 
                     child_chunk = (
-                        db.session.query(ChildChunk).where(ChildChunk.index_node_id == child_index_node_id).first()
+                        child_chunks_by_index_node_id.get(child_index_node_id) if child_index_node_id else None
                     )
 
                     if not child_chunk:
                         continue
 
-                    segment = (
-                        db.session.query(DocumentSegment)
-                        .where(
-                            DocumentSegment.dataset_id == dataset_document.dataset_id,
-                            DocumentSegment.enabled == True,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.id == child_chunk.segment_id,
-                        )
-                        .options(
-                            load_only(
-                                DocumentSegment.id,
-                                DocumentSegment.content,
-                                DocumentSegment.answer,
-                            )
-                        )
-                        .first()
-                    )
+                    segment = parent_segments.get((dataset_document.dataset_id, child_chunk.segment_id))
 
                     if not segment:
                         continue
@@ -379,16 +383,7 @@ class RetrievalService:
                     if not index_node_id:
                         continue
 
-                    segment = (
-                        db.session.query(DocumentSegment)
-                        .where(
-                            DocumentSegment.dataset_id == dataset_document.dataset_id,
-                            DocumentSegment.enabled == True,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.index_node_id == index_node_id,
-                        )
-                        .first()
-                    )
+                    segment = segments.get((dataset_document.dataset_id, index_node_id))
 
                     if not segment:
                         continue
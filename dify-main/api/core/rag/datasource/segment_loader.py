@@ -0,0 +1,115 @@
+from collections.abc import Collection
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+from extensions.ext_database import db
+from models.dataset import ChildChunk, DocumentSegment
+
+
+class SegmentLoader:
+    """
+    Batched lookups that hydrate retrieval hits into segments with one ``IN`` query per call,
+    instead of one query per hit.
+    """
+
+    @classmethod
+    def load_segments_by_index_node_ids(
+        cls,
+        dataset_ids: Collection[str],
+        index_node_ids: Collection[str],
+        document_ids_filter: Optional[Collection[str]] = None,
+        only_available: bool = False,
+    ) -> dict[tuple[str, str], DocumentSegment]:
+        """
+        Load the segments of the given index nodes.
+
+        :param dataset_ids: datasets the index nodes belong to
+        :param index_node_ids: index node ids of the segments
+        :param document_ids_filter: only keep segments of these documents
+        :param only_available: only keep enabled segments whose indexing is completed
+        :return: segments keyed by ``(dataset_id, index_node_id)``
+        """
+        if not dataset_ids or not index_node_ids:
+            return {}
+
+        stmt = select(DocumentSegment).where(
+            DocumentSegment.dataset_id.in_(set(dataset_ids)),
+            DocumentSegment.index_node_id.in_(set(index_node_ids)),
+        )
+        if document_ids_filter:
+            stmt = stmt.where(DocumentSegment.document_id.in_(set(document_ids_filter)))
+        if only_available:
+            stmt = stmt.where(DocumentSegment.enabled == True, DocumentSegment.status == "completed")
+
+        segments: dict[tuple[str, str], DocumentSegment] = {}
+        for segment in db.session.scalars(stmt):
+            # keep the first match, like ``.first()`` did for single lookups
+            segments.setdefault((segment.dataset_id, segment.index_node_id), segment)
+        return segments
+
+    @classmethod
+    def load_available_segments_by_ids(
+        cls, dataset_ids: Collection[str], segment_ids: Collection[str]
+    ) -> dict[tuple[str, str], DocumentSegment]:
+        """
+        Load enabled, completed segments by id with only the columns retrieval results need.
+
+        :return: segments keyed by ``(dataset_id, segment_id)``
+        """
+        if not dataset_ids or not segment_ids:
+            return {}
+
+        stmt = (
+            select(DocumentSegment)
+            .where(
+                DocumentSegment.dataset_id.in_(set(dataset_ids)),
+                DocumentSegment.enabled == True,
+                DocumentSegment.status == "completed",
+                DocumentSegment.id.in_(set(segment_ids)),
+            )
+            .options(
+                load_only(
+                    DocumentSegment.id,
+                    DocumentSegment.dataset_id,
+                    DocumentSegment.content,
+                    DocumentSegment.answer,
+                )
+            )
+        )
+        return {(segment.dataset_id, segment.id): segment for segment in db.session.scalars(stmt)}
+
+    @classmethod
+    def load_segment_keywords_by_index_node_ids(
+        cls, dataset_ids: Collection[str], index_node_ids: Collection[str]
+    ) -> dict[tuple[str, str], list[str]]:
+        """
+        Load the keywords stored on the segments of the given index nodes.
+
+        :return: non-empty keyword lists keyed by ``(dataset_id, index_node_id)``
+        """
+        if not dataset_ids or not index_node_ids:
+            return {}
+
+        stmt = select(DocumentSegment.dataset_id, DocumentSegment.index_node_id, DocumentSegment.keywords).where(
+            DocumentSegment.dataset_id.in_(set(dataset_ids)),
+            DocumentSegment.index_node_id.in_(set(index_node_ids)),
+        )
+        return {(row.dataset_id, row.index_node_id): row.keywords for row in db.session.execute(stmt) if row.keywords}
+
+    @classmethod
+    def load_child_chunks_by_index_node_ids(cls, index_node_ids: Collection[str]) -> dict[str, ChildChunk]:
+        """
+        Load child chunks of the given index nodes.
+
+        :return: child chunks keyed by ``index_node_id``
+        """
+        if not index_node_ids:
+            return {}
+
+        stmt = select(ChildChunk).where(ChildChunk.index_node_id.in_(set(index_node_ids)))
+        child_chunks: dict[str, ChildChunk] = {}
+        for child_chunk in db.session.scalars(stmt):
+            child_chunks.setdefault(child_chunk.index_node_id, child_chunk)
+        return child_chunks
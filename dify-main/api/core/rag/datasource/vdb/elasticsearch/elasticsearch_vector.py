@@ -1,6 +1,7 @@
 import json
 import logging
 import math
+import weakref
 from typing import Any, Optional, cast
 from urllib.parse import urlparse
 
@@ -12,6 +13,7 @@ from pydantic import BaseModel, model_validator
 
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -70,10 +72,26 @@ class ElasticSearchConfig(BaseModel):
         return values
 
 
+# Server version of each shared client, so the version check does not cost a request per instance.
+_client_versions: weakref.WeakKeyDictionary[Elasticsearch, str] = weakref.WeakKeyDictionary()
+
+
+def _check_elasticsearch_client(client: Elasticsearch):
+    if not client.ping():
+        raise ConnectionError("Failed to connect to Elasticsearch")
+
+
 class ElasticSearchVector(BaseVector):
     def __init__(self, index_name: str, config: ElasticSearchConfig, attributes: list):
         super().__init__(index_name.lower())
-        self._client = self._init_client(config)
+        self._client = vector_client_registry.get_client(
+            VectorType.ELASTICSEARCH,
+            config,
+            owner=self,
+            create=lambda: self._init_client(config),
+            health_check=_check_elasticsearch_client,
+            close=lambda client: client.close(),
+        )
         self._version = self._get_version()
         self._check_version()
         self._attributes = attributes
@@ -146,8 +164,12 @@ class ElasticSearchVector(BaseVector):
         return client
 
     def _get_version(self) -> str:
-        info = self._client.info()
-        return cast(str, info["version"]["number"])
+        version = _client_versions.get(self._client)
+        if version is None:
+            info = self._client.info()
+            version = cast(str, info["version"]["number"])
+            _client_versions[self._client] = version
+        return version
 
     def _check_version(self):
         if parse_version(self._version) < parse_version("8.0.0"):
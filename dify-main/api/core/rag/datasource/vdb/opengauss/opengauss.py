@@ -4,11 +4,15 @@ from contextlib import contextmanager
 from typing import Any
 
 import psycopg2.extras  # type: ignore
-import psycopg2.pool  # type: ignore
 from pydantic import BaseModel, model_validator
 
 from configs import dify_config
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import (
+    BlockingConnectionPool,
+    check_connection_pool,
+    vector_client_registry,
+)
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -80,14 +84,21 @@ class OpenGauss(BaseVector):
         return VectorType.OPENGAUSS
 
     def _create_connection_pool(self, config: OpenGaussConfig):
-        return psycopg2.pool.SimpleConnectionPool(
-            config.min_connection,
-            config.max_connection,
-            host=config.host,
-            port=config.port,
-            user=config.user,
-            password=config.password,
-            database=config.database,
+        return vector_client_registry.get_client(
+            VectorType.OPENGAUSS,
+            config,
+            owner=self,
+            create=lambda: BlockingConnectionPool(
+                config.min_connection,
+                config.max_connection,
+                host=config.host,
+                port=config.port,
+                user=config.user,
+                password=config.password,
+                database=config.database,
+            ),
+            health_check=check_connection_pool,
+            close=lambda pool: pool.closeall(),
         )
 
     @contextmanager
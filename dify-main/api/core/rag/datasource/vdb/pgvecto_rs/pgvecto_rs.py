@@ -9,11 +9,13 @@ from pydantic import BaseModel, model_validator
 from sqlalchemy import Float, create_engine, insert, select, text
 from sqlalchemy import text as sql_text
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from configs import dify_config
 from core.rag.datasource.vdb.pgvecto_rs.collection import CollectionORM
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import check_engine, vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -54,10 +56,14 @@ class PGVectoRS(BaseVector):
         self._url = (
             f"postgresql+psycopg2://{config.user}:{config.password}@{config.host}:{config.port}/{config.database}"
         )
-        self._client = create_engine(self._url)
-        with Session(self._client) as session:
-            session.execute(text("CREATE EXTENSION IF NOT EXISTS vectors"))
-            session.commit()
+        self._client = vector_client_registry.get_client(
+            VectorType.PGVECTO_RS,
+            config,
+            owner=self,
+            create=self._create_engine,
+            health_check=check_engine,
+            close=lambda engine: engine.dispose(),
+        )
         self._fields: list[str] = []
 
         class _Table(CollectionORM):
@@ -74,6 +80,13 @@ class PGVectoRS(BaseVector):
         self._table = _Table
         self._distance_op = "<=>"
 
+    def _create_engine(self) -> Engine:
+        engine = create_engine(self._url, pool_pre_ping=True)
+        with Session(engine) as session:
+            session.execute(text("CREATE EXTENSION IF NOT EXISTS vectors"))
+            session.commit()
+        return engine
+
     def get_type(self) -> str:
         return VectorType.PGVECTO_RS
 
@@ -22,6 +22,7 @@ from qdrant_client.local.qdrant_local import QdrantLocal
 from configs import dify_config
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -73,7 +74,14 @@ class QdrantVector(BaseVector):
     def __init__(self, collection_name: str, group_id: str, config: QdrantConfig, distance_func: str = "Cosine"):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = qdrant_client.QdrantClient(**self._client_config.to_qdrant_params())
+        self._client = vector_client_registry.get_client(
+            VectorType.QDRANT,
+            config,
+            owner=self,
+            create=lambda: qdrant_client.QdrantClient(**self._client_config.to_qdrant_params()),
+            health_check=lambda client: client.get_collections(),
+            close=lambda client: client.close(),
+        )
         self._distance_func = distance_func.upper()
         self._group_id = group_id
 
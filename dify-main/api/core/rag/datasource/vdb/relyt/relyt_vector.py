@@ -20,6 +20,7 @@ except ImportError:
 
 from configs import dify_config
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import check_engine, vector_client_registry
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 
@@ -57,7 +58,14 @@ class RelytVector(BaseVector):
         self._url = (
             f"postgresql+psycopg2://{config.user}:{config.password}@{config.host}:{config.port}/{config.database}"
         )
-        self.client = create_engine(self._url)
+        self.client = vector_client_registry.get_client(
+            VectorType.RELYT,
+            config,
+            owner=self,
+            create=lambda: create_engine(self._url, pool_pre_ping=True),
+            health_check=check_engine,
+            close=lambda engine: engine.dispose(),
+        )
         self._fields: list[str] = []
         self._group_id = group_id
 
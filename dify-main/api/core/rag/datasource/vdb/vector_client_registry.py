@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Optional, TypeVar, cast
+
+import psycopg2.pool  # type: ignore
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _RegistryEntry:
+    client: Any
+    health_check: Optional[Callable[[Any], object]]
+    close: Optional[Callable[[Any], None]]
+    last_used_at: float
+    last_checked_at: float
+    # number of live owners of the client
+    leases: int = 0
+    # removed from the registry, closed once the last lease is released
+    retired: bool = False
+
+
+class VectorClientRegistry:
+    """
+    Process-wide registry of long-lived vector store clients and connection pools.
+
+    ``Vector(dataset)`` is built on every retrieval, so vector stores fetch their clients from here
+    instead of opening new connections in their constructors. Clients are keyed by vector type and
+    connection config. The registry holds at most ``max_size`` clients, drops clients left unused
+    for ``idle_timeout`` seconds, and re-creates a client whose health check fails when it is fetched
+    more than ``health_check_interval`` seconds after the previous check.
+
+    Every fetch leases the client to its owner until the owner is garbage collected. A dropped
+    client is only closed once no owner holds it anymore, so a long indexing run keeps a working
+    client even if the registry replaces it meanwhile.
+    """
+
+    def __init__(self, max_size: int, idle_timeout: float, health_check_interval: float):
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._health_check_interval = health_check_interval
+        self._entries: OrderedDict[tuple[str, str], _RegistryEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_client(
+        self,
+        vector_type: str,
+        config: BaseModel,
+        owner: object,
+        create: Callable[[], T],
+        health_check: Optional[Callable[[T], object]] = None,
+        close: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        """
+        Return the shared client of a vector store, creating it on first use.
+
+        :param vector_type: vector store type, part of the registry key
+        :param config: connection config, part of the registry key
+        :param owner: object using the client, the client is not closed before the owner is garbage collected
+        :param create: builds a new client
+        :param health_check: raises if the client can no longer be used
+        :param close: releases the client's connections when it is dropped and no longer used
+        """
+        key = (vector_type, config.model_dump_json())
+        with self._lock:
+            unused = self._retire_idle_entries()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.last_used_at = time.monotonic()
+                entry.leases += 1
+        self._close_entries(unused)
+
+        if entry is not None:
+            if self._is_healthy(vector_type, entry):
+                self._lease(entry, owner)
+                return cast(T, entry.client)
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                entry.retired = True
+            self._release(entry)
+
+        # create outside the lock, connecting can be slow
+        client = create()
+        now = time.monotonic()
+        new_entry = _RegistryEntry(
+            client=client, health_check=health_check, close=close, last_used_at=now, last_checked_at=now, leases=1
+        )
+        unused = []
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                # another thread registered a client first, keep that one
+                new_entry.leases = 0
+                unused.append(new_entry)
+                new_entry = existing
+                new_entry.leases += 1
+            else:
+                self._entries[key] = new_entry
+                while len(self._entries) > self._max_size:
+                    _, lru_entry = self._entries.popitem(last=False)
+                    unused.extend(self._retire(lru_entry))
+        self._close_entries(unused)
+        self._lease(new_entry, owner)
+        return cast(T, new_entry.client)
+
+    def clear(self):
+        """Forget every registered client, closing those no owner holds."""
+        unused = []
+        with self._lock:
+            for entry in self._entries.values():
+                unused.extend(self._retire(entry))
+            self._entries.clear()
+        self._close_entries(unused)
+
+    def _lease(self, entry: _RegistryEntry, owner: object):
+        # the lease was taken under the lock, it is released when the owner is collected
+        weakref.finalize(owner, self._release, entry)
+
+    def _release(self, entry: _RegistryEntry):
+        with self._lock:
+            entry.leases -= 1
+            entry.last_used_at = time.monotonic()
+            unused = entry.retired and entry.leases == 0
+        if unused:
+            self._close_entries([entry])
+
+    def _retire_idle_entries(self) -> list[_RegistryEntry]:
+        # must hold the lock, entries in use are never idle
+        now = time.monotonic()
+        unused = []
+        for key, entry in list(self._entries.items()):
+            if entry.leases == 0 and now - entry.last_used_at > self._idle_timeout:
+                unused.extend(self._retire(self._entries.pop(key)))
+        return unused
+
+    @staticmethod
+    def _retire(entry: _RegistryEntry) -> list[_RegistryEntry]:
+        # must hold the lock, returns the entry if it can be closed right away
+        entry.retired = True
+        return [entry] if entry.leases == 0 else []
+
+    def _is_healthy(self, vector_type: str, entry: _RegistryEntry) -> bool:
+        if entry.health_check is None or time.monotonic() - entry.last_checked_at < self._health_check_interval:
+            return True
+        entry.last_checked_at = time.monotonic()
+        try:
+            entry.health_check(entry.client)
+            return True
+        except Exception:
+            logger.warning("Health check of %s client failed, reconnecting", vector_type, exc_info=True)
+            return False
+
+    @staticmethod
+    def _close_entries(entries: list[_RegistryEntry]):
+        for entry in entries:
+            if entry.close is None:
+                continue
+            try:
+                entry.close(entry.client)
+            except Exception:
+                logger.warning("Failed to close vector store client", exc_info=True)
+
+
+class BlockingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    Thread-safe psycopg2 pool for clients shared through the registry.
+
+    Waits up to ``timeout`` seconds for a free connection instead of raising ``PoolError`` as soon as
+    ``maxconn`` connections are in use, and replaces connections that were closed by the server.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, timeout: float = 30, **kwargs):
+        self._semaphore = threading.BoundedSemaphore(maxconn)
+        self._timeout = timeout
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._semaphore.acquire(timeout=self._timeout):
+            raise psycopg2.pool.PoolError("timed out waiting for a free connection")
+        try:
+            conn = super().getconn(key)
+            if conn.closed:
+                super().putconn(conn, key, close=True)
+                conn = super().getconn(key)
+            return conn
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close=close or bool(conn.closed))
+        finally:
+            self._semaphore.release()
+
+
+def check_connection_pool(pool: BlockingConnectionPool):
+    """Health check for registered psycopg2 pools."""
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+    finally:
+        pool.putconn(conn)
+
+
+def check_engine(engine: Engine):
+    """Health check for registered SQLAlchemy engines."""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+vector_client_registry = VectorClientRegistry(
+    max_size=dify_config.VECTOR_STORE_CLIENT_POOL_MAX_SIZE,
+    idle_timeout=dify_config.VECTOR_STORE_CLIENT_IDLE_TIMEOUT,
+    health_check_interval=dify_config.VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL,
+)
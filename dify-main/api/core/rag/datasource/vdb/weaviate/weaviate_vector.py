@@ -1,5 +1,6 @@
 import datetime
 import json
+import threading
 from typing import Any, Optional
 
 import requests
@@ -9,6 +10,7 @@ from pydantic import BaseModel, model_validator
 from configs import dify_config
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -30,10 +32,26 @@ class WeaviateConfig(BaseModel):
         return values
 
 
+# Weaviate clients are shared through the vector client registry, but their batch buffer is not
+# thread-safe, so batch imports through a shared client are serialized.
+_batch_lock = threading.Lock()
+
+
+def _check_weaviate_client(client: weaviate.Client):
+    if not client.is_ready():
+        raise ConnectionError("Weaviate is not ready")
+
+
 class WeaviateVector(BaseVector):
     def __init__(self, collection_name: str, config: WeaviateConfig, attributes: list):
         super().__init__(collection_name)
-        self._client = self._init_client(config)
+        self._client = vector_client_registry.get_client(
+            VectorType.WEAVIATE,
+            config,
+            owner=self,
+            create=lambda: self._init_client(config),
+            health_check=_check_weaviate_client,
+        )
         self._attributes = attributes
 
     def _init_client(self, config: WeaviateConfig) -> weaviate.Client:
@@ -110,7 +128,7 @@ class WeaviateVector(BaseVector):
 
         ids = []
 
-        with self._client.batch as batch:
+        with _batch_lock, self._client.batch as batch:
             for i, text in enumerate(texts):
                 data_properties = {Field.TEXT_KEY.value: text}
                 if metadatas is not None:
@@ -3,7 +3,9 @@ import logging
 from typing import Any, Optional, cast
 
 import numpy as np
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from configs import dify_config
 from core.entities.embedding_type import EmbeddingInputType
@@ -18,6 +20,9 @@ from models.dataset import Embedding
 
 logger = logging.getLogger(__name__)
 
+# Max hashes per embedding cache lookup, keeps the IN list well below the bind parameter limit.
+EMBEDDING_CACHE_LOOKUP_BATCH_SIZE = 1000
+
 
 class CacheEmbedding(Embeddings):
     def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
@@ -29,17 +34,11 @@ class CacheEmbedding(Embeddings):
         # use doc embedding cache or store if not exists
         text_embeddings: list[Any] = [None for _ in range(len(texts))]
         embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = (
-                db.session.query(Embedding)
-                .filter_by(
-                    model_name=self._model_instance.model, hash=hash, provider_name=self._model_instance.provider
-                )
-                .first()
-            )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = self._get_cached_embeddings(text_hashes)
+        for i, hash in enumerate(text_hashes):
+            if hash in cached_embeddings:
+                text_embeddings[i] = cached_embeddings[hash]
             else:
                 embedding_queue_indices.append(i)
         if embedding_queue_indices:
@@ -100,6 +99,40 @@ class CacheEmbedding(Embeddings):
 
         return text_embeddings
 
+    def _get_cached_embeddings(self, text_hashes: list[str]) -> dict[str, list[float]]:
+        """
+        Load cached document embeddings with one query per batch of hashes.
+
+        Rows still stored in the legacy pickle format are rewritten as float32 on the way.
+        """
+        cached_embeddings: dict[str, list[float]] = {}
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        for i in range(0, len(unique_hashes), EMBEDDING_CACHE_LOOKUP_BATCH_SIZE):
+            batch_hashes = unique_hashes[i : i + EMBEDDING_CACHE_LOOKUP_BATCH_SIZE]
+            embeddings = db.session.scalars(
+                select(Embedding).where(
+                    Embedding.model_name == self._model_instance.model,
+                    Embedding.provider_name == self._model_instance.provider,
+                    Embedding.hash.in_(batch_hashes),
+                )
+            ).all()
+            migrated_embeddings = []
+            for embedding in embeddings:
+                vector = embedding.get_embedding()
+                cached_embeddings[embedding.hash] = vector
+                if embedding.is_pickled:
+                    migrated_embeddings.append({"id": embedding.id, "embedding": Embedding.encode_embedding(vector)})
+            if migrated_embeddings:
+                # written in a session of its own so the scoped session of the caller is left untouched
+                try:
+                    with Session(db.engine) as session:
+                        session.execute(update(Embedding), migrated_embeddings)
+                        session.commit()
+                except Exception:
+                    logger.exception("Failed to migrate pickled embeddings to float32")
+
+        return cached_embeddings
+
     def embed_query(self, text: str) -> list[float]:
         """Embed query text."""
         # use doc embedding cache or store if not exists
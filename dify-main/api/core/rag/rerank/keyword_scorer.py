@@ -0,0 +1,88 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.segment_loader import SegmentLoader
+from core.rag.models.document import Document
+
+
+class KeywordScorer:
+    """
+    TF-IDF cosine similarity between a query and candidate documents, computed over the candidates.
+
+    Keywords stored on the candidates' segments are reused, jieba extraction only runs for the
+    candidates without stored keywords. Every candidate is scored in one matrix-vector product.
+    """
+
+    def __init__(self) -> None:
+        self._keyword_table_handler = JiebaKeywordTableHandler()
+
+    def score(self, query: str, documents: Sequence[Document]) -> list[float]:
+        """
+        Score documents against the query and record each document's keywords in its metadata.
+
+        :param query: search query
+        :param documents: candidate documents
+        :return: cosine similarity of each document, in input order
+        """
+        if not documents:
+            return []
+
+        query_keywords = self._keyword_table_handler.extract_keywords(query, None)
+        documents_keywords = self._get_documents_keywords(documents)
+        for document, document_keywords in zip(documents, documents_keywords):
+            if document.metadata is not None:
+                document.metadata["keywords"] = document_keywords
+
+        # keyword -> column of the term matrix
+        vocabulary: dict[str, int] = {}
+        for document_keywords in documents_keywords:
+            for keyword in document_keywords:
+                vocabulary.setdefault(keyword, len(vocabulary))
+        if not vocabulary:
+            return [0.0] * len(documents)
+
+        # keywords are sets, so each term frequency is 0 or 1
+        term_matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float64)
+        for row, document_keywords in enumerate(documents_keywords):
+            term_matrix[row, [vocabulary[keyword] for keyword in document_keywords]] = 1.0
+
+        document_frequency = term_matrix.sum(axis=0)
+        idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+
+        # query keywords missing from every candidate have an IDF of 0 and never contribute
+        query_vector = np.zeros(len(vocabulary), dtype=np.float64)
+        query_vector[[vocabulary[keyword] for keyword in query_keywords if keyword in vocabulary]] = 1.0
+        query_vector *= idf
+
+        documents_tfidf = term_matrix * idf
+        denominators = np.linalg.norm(documents_tfidf, axis=1) * np.linalg.norm(query_vector)
+        numerators = documents_tfidf @ query_vector
+        similarities = np.divide(numerators, denominators, out=np.zeros_like(numerators), where=denominators != 0)
+        return [float(similarity) for similarity in similarities]
+
+    def _get_documents_keywords(self, documents: Sequence[Document]) -> list[set[str]]:
+        index_nodes = [
+            (document.metadata.get("dataset_id"), document.metadata.get("doc_id"))
+            for document in documents
+            if document.metadata
+        ]
+        stored_keywords = SegmentLoader.load_segment_keywords_by_index_node_ids(
+            {dataset_id for dataset_id, _ in index_nodes if dataset_id},
+            {index_node_id for _, index_node_id in index_nodes if index_node_id},
+        )
+
+        documents_keywords = []
+        for document in documents:
+            keywords = None
+            if document.metadata:
+                dataset_id = document.metadata.get("dataset_id")
+                index_node_id = document.metadata.get("doc_id")
+                if dataset_id and index_node_id:
+                    keywords = stored_keywords.get((dataset_id, index_node_id))
+            if keywords:
+                documents_keywords.append(set(keywords))
+            else:
+                documents_keywords.append(self._keyword_table_handler.extract_keywords(document.page_content, None))
+        return documents_keywords
@@ -22,6 +22,10 @@ from models.workflow import WorkflowNodeExecutionTriggeredFrom
 
 logger = logging.getLogger(__name__)
 
+WRITE_BEHIND_WORKFLOW_NODE_EXECUTION_REPOSITORY = (
+    "core.repositories.write_behind_workflow_node_execution_repository.WriteBehindWorkflowNodeExecutionRepository"
+)
+
 
 class RepositoryImportError(Exception):
     """Raised when a repository implementation cannot be imported or instantiated."""
@@ -199,6 +203,8 @@ class DifyCoreRepositoryFactory:
             RepositoryImportError: If the configured repository cannot be created
         """
         class_path = dify_config.CORE_WORKFLOW_NODE_EXECUTION_REPOSITORY
+        if dify_config.WORKFLOW_NODE_EXECUTION_STORAGE == "write_behind":
+            class_path = WRITE_BEHIND_WORKFLOW_NODE_EXECUTION_REPOSITORY
         logger.debug("Creating WorkflowNodeExecutionRepository from: %s", class_path)
 
         try:
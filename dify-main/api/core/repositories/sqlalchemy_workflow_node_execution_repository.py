@@ -218,6 +218,11 @@ class SQLAlchemyWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository)
                 logger.debug("Updating cache for node_execution_id: %s", db_model.node_execution_id)
                 self._node_execution_cache[db_model.node_execution_id] = db_model
 
+    def flush(self) -> None:
+        """
+        Every save is committed immediately, so there is nothing to flush.
+        """
+
     def get_db_models_by_workflow_run(
         self,
         workflow_run_id: str,
@@ -0,0 +1,142 @@
+"""
+Write-behind implementation of the WorkflowNodeExecutionRepository.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from typing import Any, Optional, Union
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from configs import dify_config
+from core.repositories.sqlalchemy_workflow_node_execution_repository import SQLAlchemyWorkflowNodeExecutionRepository
+from core.workflow.entities.workflow_node_execution import WorkflowNodeExecution
+from core.workflow.repositories.workflow_node_execution_repository import OrderConfig
+from models import Account, EndUser, WorkflowNodeExecutionModel, WorkflowNodeExecutionTriggeredFrom
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindWorkflowNodeExecutionRepository(SQLAlchemyWorkflowNodeExecutionRepository):
+    """
+    SQLAlchemy WorkflowNodeExecutionRepository that buffers saves and writes them in batches.
+
+    Saves are converted to database models right away and kept in memory, so the start and
+    finish updates of a node execution collapse into a single row write. Buffered rows are
+    bulk-upserted when the buffer reaches the batch size, when the flush interval has passed,
+    when `flush` is called at the end of a run, and before every read, so reads through the
+    repository always see the latest state.
+
+    Selected with WORKFLOW_NODE_EXECUTION_STORAGE=write_behind.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker | Engine,
+        user: Union[Account, EndUser],
+        app_id: Optional[str],
+        triggered_from: Optional[WorkflowNodeExecutionTriggeredFrom],
+    ):
+        super().__init__(
+            session_factory=session_factory,
+            user=user,
+            app_id=app_id,
+            triggered_from=triggered_from,
+        )
+        self._batch_size = dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_BATCH_SIZE
+        self._flush_interval = dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_FLUSH_INTERVAL
+
+        # Key: execution id (the primary key), Value: latest column values of the execution.
+        # Retries reuse the node_execution_id with a new id, so rows are keyed by id.
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        # Held while writing, so an older batch never commits after a newer one
+        self._flush_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._last_flush_at = time.monotonic()
+
+    def save(self, execution: WorkflowNodeExecution) -> None:
+        """
+        Buffer a NodeExecution domain entity for writing.
+
+        The entity is converted to its database representation immediately, later changes to
+        the entity are only written if it is saved again.
+
+        Args:
+            execution: The NodeExecution domain entity to persist
+        """
+        db_model = self.to_db_model(execution)
+        row = {column.key: getattr(db_model, column.key) for column in inspect(WorkflowNodeExecutionModel).column_attrs}
+
+        with self._pending_lock:
+            self._pending[db_model.id] = row
+            should_flush = (
+                len(self._pending) >= self._batch_size or time.monotonic() - self._last_flush_at >= self._flush_interval
+            )
+            if not should_flush and (self._flush_timer is None or not self._flush_timer.is_alive()):
+                self._flush_timer = threading.Timer(self._flush_interval, self._flush_in_background)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+        if db_model.node_execution_id:
+            self._node_execution_cache[db_model.node_execution_id] = db_model
+
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Bulk-upsert every buffered node execution.
+
+        Rows that fail to write stay buffered for the next flush, unless a newer version of the
+        row was saved meanwhile.
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                rows = list(self._pending.values())
+                self._pending.clear()
+                self._last_flush_at = time.monotonic()
+            if not rows:
+                return
+
+            try:
+                with self._session_factory() as session:
+                    stmt = insert(WorkflowNodeExecutionModel).values(rows)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[WorkflowNodeExecutionModel.id],
+                        set_={
+                            column: stmt.excluded[column]
+                            for column in rows[0]
+                            if column not in {"id", "tenant_id", "created_at", "created_by_role", "created_by"}
+                        },
+                    )
+                    session.execute(stmt)
+                    session.commit()
+            except Exception:
+                with self._pending_lock:
+                    for row in rows:
+                        self._pending.setdefault(row["id"], row)
+                raise
+
+    def get_db_models_by_workflow_run(
+        self,
+        workflow_run_id: str,
+        order_config: Optional[OrderConfig] = None,
+    ) -> Sequence[WorkflowNodeExecutionModel]:
+        """
+        Retrieve all WorkflowNodeExecution database models for a specific workflow run,
+        writing buffered node executions first.
+        """
+        self.flush()
+        return super().get_db_models_by_workflow_run(workflow_run_id, order_config)
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush buffered workflow node executions")
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import threading
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Optional
+
+from cachetools import LRUCache
+
+from configs import dify_config
+from core.workflow.graph_engine.entities.graph import Graph
+from core.workflow.nodes.base.entities import BaseNodeData
+
+if TYPE_CHECKING:
+    from core.workflow.nodes.base.node import BaseNode
+    from models.workflow import Workflow
+
+
+class CompiledWorkflow:
+    """
+    Everything about a workflow graph that does not change between runs.
+
+    Holds the parsed graph config, the graphs built from it (one per root node, so iterations and
+    loops get theirs too) and the validated data of its nodes. Instances are shared by concurrent
+    runs, so they must not be modified; stream processors copy the route state they update.
+    """
+
+    def __init__(self, graph_config: Mapping[str, Any]):
+        self._graph_config = graph_config
+        # Key: root node id, None for the start node
+        self._graphs: dict[Optional[str], Graph] = {}
+        # Key: node id, Value: node class and its validated node data
+        self._node_data: dict[str, tuple[type[BaseNode], BaseNodeData]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def graph_config(self) -> Mapping[str, Any]:
+        return self._graph_config
+
+    def get_graph(self, root_node_id: Optional[str] = None) -> Graph:
+        """
+        Get the graph starting at the root node, built on first use.
+
+        :param root_node_id: root node id, the start node if not given
+        """
+        graph = self._graphs.get(root_node_id)
+        if graph is None:
+            graph = Graph.init(graph_config=self._graph_config, root_node_id=root_node_id)
+            with self._lock:
+                graph = self._graphs.setdefault(root_node_id, graph)
+        return graph
+
+    def init_node_data(self, node: "BaseNode", node_config: Mapping[str, Any]) -> None:
+        """
+        Init the node data of a node, validating it only the first time the node is created.
+        """
+        cached = self._node_data.get(node.node_id)
+        if cached is not None and cached[0] is type(node):
+            node.use_node_data(cached[1])
+            return
+
+        node.init_node_data(node_config.get("data", {}))
+        with self._lock:
+            self._node_data[node.node_id] = (type(node), node.get_base_node_data())
+
+
+class CompiledWorkflowCache:
+    """
+    Process-wide LRU cache of compiled workflows.
+
+    Workflows are keyed by id and a hash of their graph, so editing a draft workflow compiles it
+    again while published versions are compiled once per process.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._cache: LRUCache[tuple[str, str], CompiledWorkflow] = LRUCache(maxsize=max(max_size, 1))
+        self._lock = threading.Lock()
+
+    def get(self, workflow: "Workflow") -> CompiledWorkflow:
+        if self._max_size <= 0:
+            return CompiledWorkflow(graph_config=workflow.graph_dict)
+
+        key = (workflow.id, hashlib.sha256((workflow.graph or "").encode()).hexdigest())
+        with self._lock:
+            compiled_workflow = self._cache.get(key)
+        if compiled_workflow is not None:
+            return compiled_workflow
+
+        compiled_workflow = CompiledWorkflow(graph_config=json.loads(workflow.graph) if workflow.graph else {})
+        with self._lock:
+            return self._cache.setdefault(key, compiled_workflow)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+compiled_workflow_cache = CompiledWorkflowCache(max_size=dify_config.WORKFLOW_COMPILED_CACHE_MAX_SIZE)
@@ -3,7 +3,7 @@ from collections import defaultdict
 from collections.abc import Mapping, Sequence
 from typing import Annotated, Any, Union, cast
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from core.file import File, FileAttribute, file_manager
 from core.variables import Segment, SegmentGroup, Variable
@@ -46,6 +46,10 @@ class VariablePool(BaseModel):
         default_factory=list,
     )
 
+    # Node ids whose second-level dictionary may be shared with a forked pool. Such a dictionary is
+    # copied before this pool writes to it, see `fork`.
+    _shared_node_ids: set[str] = PrivateAttr(default_factory=set)
+
     def model_post_init(self, context: Any, /) -> None:
         # Create a mapping from field names to SystemVariableKey enum values
         self._add_system_variables(self.system_variables)
@@ -87,7 +91,7 @@ class VariablePool(BaseModel):
         key, hash_key = self._selector_to_keys(selector)
         # Based on the definition of `VariableUnion`,
         # `list[Variable]` can be safely used as `list[VariableUnion]` since they are compatible.
-        self.variable_dictionary[key][hash_key] = cast(VariableUnion, variable)
+        self._get_writable_variables(key)[hash_key] = cast(VariableUnion, variable)
 
     @classmethod
     def _selector_to_keys(cls, selector: Sequence[str]) -> tuple[str, int]:
@@ -150,9 +154,34 @@ class VariablePool(BaseModel):
             return
         if len(selector) == 1:
             self.variable_dictionary[selector[0]] = {}
+            self._shared_node_ids.discard(selector[0])
             return
         key, hash_key = self._selector_to_keys(selector)
-        self.variable_dictionary[key].pop(hash_key, None)
+        self._get_writable_variables(key).pop(hash_key, None)
+
+    def fork(self) -> "VariablePool":
+        """
+        Create a copy-on-write copy of the variable pool.
+
+        The copy shares the variables of this pool instead of copying them. Both pools copy a node's
+        variable dictionary the first time they write to it after the fork, so writes stay local to
+        the pool that made them and a fork costs memory proportional to what it writes.
+
+        Returns:
+            VariablePool: The forked variable pool.
+        """
+        forked = self.model_copy()
+        forked.variable_dictionary = defaultdict(dict, self.variable_dictionary)
+        shared_node_ids = set(self.variable_dictionary)
+        self._shared_node_ids.update(shared_node_ids)
+        forked._shared_node_ids = shared_node_ids
+        return forked
+
+    def _get_writable_variables(self, node_id: str) -> dict[int, VariableUnion]:
+        if node_id in self._shared_node_ids:
+            self.variable_dictionary[node_id] = dict(self.variable_dictionary[node_id])
+            self._shared_node_ids.discard(node_id)
+        return self.variable_dictionary[node_id]
 
     def convert_template(self, template: str, /):
         parts = VARIABLE_PATTERN.split(template)
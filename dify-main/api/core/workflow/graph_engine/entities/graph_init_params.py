@@ -1,5 +1,5 @@
 from collections.abc import Mapping
-from typing import Any
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
@@ -19,3 +19,6 @@ class GraphInitParams(BaseModel):
     user_from: UserFrom = Field(..., description="user from, account or end-user")
     invoke_from: InvokeFrom = Field(..., description="invoke from, service-api, web-app, explore or debugger")
     call_depth: int = Field(..., description="call depth")
+    compiled_workflow: Optional[Any] = Field(
+        default=None, exclude=True, description="compiled workflow shared between runs of the workflow"
+    )
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -29,3 +30,6 @@ class GraphRuntimeState(BaseModel):
 
     node_run_state: RuntimeRouteState = RuntimeRouteState()
     """node run state"""
+
+    code_execution_results: dict[str, Mapping[str, Any]] = Field(default_factory=dict, exclude=True)
+    """results of code node runs executed ahead in a batch, by code node batch key"""
@@ -5,9 +5,9 @@ import time
 import uuid
 from collections.abc import Generator, Mapping
 from concurrent.futures import ThreadPoolExecutor, wait
-from copy import copy, deepcopy
+from copy import copy
 from datetime import UTC, datetime
-from typing import Any, Optional, cast
+from typing import TYPE_CHECKING, Any, Optional, cast
 
 from flask import Flask, current_app
 
@@ -56,6 +56,9 @@ from libs.flask_utils import preserve_flask_contexts
 from models.enums import UserFrom
 from models.workflow import WorkflowType
 
+if TYPE_CHECKING:
+    from core.workflow.compiled_workflow import CompiledWorkflow
+
 logger = logging.getLogger(__name__)
 
 
@@ -105,6 +108,7 @@ class GraphEngine:
         max_execution_steps: int,
         max_execution_time: int,
         thread_pool_id: Optional[str] = None,
+        compiled_workflow: Optional["CompiledWorkflow"] = None,
     ) -> None:
         thread_pool_max_submit_count = dify_config.MAX_SUBMIT_COUNT
         thread_pool_max_workers = 10
@@ -136,7 +140,9 @@ class GraphEngine:
             user_from=user_from,
             invoke_from=invoke_from,
             call_depth=call_depth,
+            compiled_workflow=compiled_workflow,
         )
+        self.compiled_workflow = compiled_workflow
 
         self.graph_runtime_state = graph_runtime_state
 
@@ -276,7 +282,10 @@ class GraphEngine:
                 previous_node_id=previous_node_id,
                 thread_pool_id=self.thread_pool_id,
             )
-            node.init_node_data(node_config.get("data", {}))
+            if self.compiled_workflow:
+                self.compiled_workflow.init_node_data(node, node_config)
+            else:
+                node.init_node_data(node_config.get("data", {}))
             try:
                 # run node
                 generator = self._run_node(
@@ -878,11 +887,11 @@ class GraphEngine:
     def create_copy(self):
         """
         create a graph engine copy
-        :return: graph engine with a new variable pool and initialized total tokens
+        :return: graph engine with a forked variable pool and initialized total tokens
         """
         new_instance = copy(self)
         new_instance.graph_runtime_state = copy(self.graph_runtime_state)
-        new_instance.graph_runtime_state.variable_pool = deepcopy(self.graph_runtime_state.variable_pool)
+        new_instance.graph_runtime_state.variable_pool = self.graph_runtime_state.variable_pool.fork()
         new_instance.graph_runtime_state.total_tokens = 0
         return new_instance
 
@@ -39,6 +39,7 @@ class BaseNode:
         self.user_from = graph_init_params.user_from
         self.invoke_from = graph_init_params.invoke_from
         self.workflow_call_depth = graph_init_params.call_depth
+        self.compiled_workflow = graph_init_params.compiled_workflow
         self.graph = graph
         self.graph_runtime_state = graph_runtime_state
         self.previous_node_id = previous_node_id
@@ -53,6 +54,13 @@ class BaseNode:
     @abstractmethod
     def init_node_data(self, data: Mapping[str, Any]) -> None: ...
 
+    def use_node_data(self, node_data: BaseNodeData) -> None:
+        """
+        Use node data validated by `init_node_data` of another instance of this node.
+        Node data is shared between runs and must not be modified while running.
+        """
+        self._node_data = node_data
+
     @abstractmethod
     def _run(self) -> NodeRunResult | Generator[Union[NodeEvent, "InNodeEvent"], None, None]:
         """
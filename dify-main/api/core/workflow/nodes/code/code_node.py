@@ -1,3 +1,6 @@
+import hashlib
+import json
+import logging
 from collections.abc import Mapping, Sequence
 from decimal import Decimal
 from typing import Any, Optional
@@ -8,7 +11,9 @@ from core.helper.code_executor.code_node_provider import CodeNodeProvider
 from core.helper.code_executor.javascript.javascript_code_provider import JavascriptCodeProvider
 from core.helper.code_executor.python3.python3_code_provider import Python3CodeProvider
 from core.variables.segments import ArrayFileSegment
+from core.variables.utils import SegmentJSONEncoder
 from core.workflow.entities.node_entities import NodeRunResult
+from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.entities.workflow_node_execution import WorkflowNodeExecutionStatus
 from core.workflow.nodes.base import BaseNode
 from core.workflow.nodes.base.entities import BaseNodeData, RetryConfig
@@ -21,6 +26,8 @@ from .exc import (
     OutputValidationError,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class CodeNode(BaseNode):
     _node_type = NodeType.CODE
@@ -74,21 +81,18 @@ class CodeNode(BaseNode):
         code = self._node_data.code
 
         # Get variables
-        variables = {}
-        for variable_selector in self._node_data.variables:
-            variable_name = variable_selector.variable
-            variable = self.graph_runtime_state.variable_pool.get(variable_selector.value_selector)
-            if isinstance(variable, ArrayFileSegment):
-                variables[variable_name] = [v.to_dict() for v in variable.value] if variable.value else None
-            else:
-                variables[variable_name] = variable.to_object() if variable else None
-        # Run code
+        variables = self.get_inputs(self._node_data, self.graph_runtime_state.variable_pool)
+        # Run code, unless it was already executed in a batch
         try:
-            result = CodeExecutor.execute_workflow_code_template(
-                language=code_language,
-                code=code,
-                inputs=variables,
-            )
+            result = None
+            if self.graph_runtime_state.code_execution_results:
+                result = self.graph_runtime_state.code_execution_results.get(self._batch_key(self.node_id, variables))
+            if result is None:
+                result = CodeExecutor.execute_workflow_code_template(
+                    language=code_language,
+                    code=code,
+                    inputs=variables,
+                )
 
             # Transform result
             result = self._transform_result(result=result, output_schema=self._node_data.outputs)
@@ -99,6 +103,63 @@ class CodeNode(BaseNode):
 
         return NodeRunResult(status=WorkflowNodeExecutionStatus.SUCCEEDED, inputs=variables, outputs=result)
 
+    @classmethod
+    def get_inputs(cls, node_data: CodeNodeData, variable_pool: VariablePool) -> dict[str, Any]:
+        """
+        Get the inputs of the code from the variable pool
+        :param node_data: node data
+        :param variable_pool: variable pool
+        :return: inputs
+        """
+        variables: dict[str, Any] = {}
+        for variable_selector in node_data.variables:
+            variable_name = variable_selector.variable
+            variable = variable_pool.get(variable_selector.value_selector)
+            if isinstance(variable, ArrayFileSegment):
+                variables[variable_name] = [v.to_dict() for v in variable.value] if variable.value else None
+            else:
+                variables[variable_name] = variable.to_object() if variable else None
+        return variables
+
+    @classmethod
+    def batch_execute(
+        cls, node_id: str, node_data: CodeNodeData, inputs_list: Sequence[Mapping[str, Any]]
+    ) -> dict[str, Mapping[str, Any]]:
+        """
+        Execute the code of the node ahead for each of the inputs, in as few requests as possible.
+
+        Runs of the node use these results instead of executing the code when added to
+        `GraphRuntimeState.code_execution_results`. Inputs the code failed for are left out, runs with
+        those inputs execute the code themselves.
+        :param node_id: node id
+        :param node_data: node data
+        :param inputs_list: inputs of each run
+        :return: results by batch key
+        """
+        if not dify_config.CODE_EXECUTION_BATCH_SIZE or node_data.code_language not in (
+            CodeExecutor.supported_batch_languages
+        ):
+            return {}
+
+        try:
+            results = CodeExecutor.execute_workflow_code_template_batch(
+                language=node_data.code_language, code=node_data.code, inputs_list=inputs_list
+            )
+        except (CodeExecutionError, ValueError):
+            logger.warning("Batch execution of code node %s failed, running it for each input", node_id, exc_info=True)
+            return {}
+
+        return {
+            cls._batch_key(node_id, inputs): result
+            for inputs, result in zip(inputs_list, results)
+            if result is not None
+        }
+
+    @staticmethod
+    def _batch_key(node_id: str, inputs: Mapping[str, Any]) -> str:
+        inputs_json = json.dumps(inputs, ensure_ascii=False, sort_keys=True, cls=SegmentJSONEncoder)
+        return f"{node_id}:{hashlib.sha256(inputs_json.encode()).hexdigest()}"
+
     def _check_string(self, value: str | None, variable: str) -> str | None:
         """
         Check string
@@ -79,16 +79,22 @@ class Executor:
         max_retries: int = dify_config.SSRF_DEFAULT_MAX_RETRIES,
     ):
         # If authorization API key is present, convert the API key using the variable pool
-        if node_data.authorization.type == "api-key":
-            if node_data.authorization.config is None:
+        authorization = node_data.authorization
+        if authorization.type == "api-key":
+            if authorization.config is None:
                 raise AuthorizationConfigError("authorization config is required")
-            node_data.authorization.config.api_key = variable_pool.convert_template(
-                node_data.authorization.config.api_key
-            ).text
+            # node data is shared between runs, the converted key goes into a copy
+            authorization = authorization.model_copy(
+                update={
+                    "config": authorization.config.model_copy(
+                        update={"api_key": variable_pool.convert_template(authorization.config.api_key).text}
+                    )
+                }
+            )
 
         self.url: str = node_data.url
         self.method = node_data.method
-        self.auth = node_data.authorization
+        self.auth = authorization
         self.timeout = timeout
         self.ssl_verify = node_data.ssl_verify
         self.params = None
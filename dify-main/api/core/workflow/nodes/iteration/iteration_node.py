@@ -37,6 +37,8 @@ from core.workflow.graph_engine.entities.event import (
 from core.workflow.graph_engine.entities.graph import Graph
 from core.workflow.nodes.base import BaseNode
 from core.workflow.nodes.base.entities import BaseNodeData, RetryConfig
+from core.workflow.nodes.code.code_node import CodeNode
+from core.workflow.nodes.code.entities import CodeNodeData
 from core.workflow.nodes.enums import ErrorStrategy, NodeType
 from core.workflow.nodes.event import NodeEvent, RunCompletedEvent
 from core.workflow.nodes.iteration.entities import ErrorHandleMode, IterationNodeData
@@ -145,13 +147,20 @@ class IterationNode(BaseNode):
         root_node_id = self._node_data.start_node_id
 
         # init graph
-        iteration_graph = Graph.init(graph_config=graph_config, root_node_id=root_node_id)
+        if self.compiled_workflow:
+            iteration_graph = self.compiled_workflow.get_graph(root_node_id=root_node_id)
+        else:
+            iteration_graph = Graph.init(graph_config=graph_config, root_node_id=root_node_id)
 
         if not iteration_graph:
             raise IterationGraphNotFoundError("iteration graph not found")
 
         variable_pool = self.graph_runtime_state.variable_pool
 
+        code_execution_results = self._batch_execute_code_node(
+            iteration_graph=iteration_graph, iterator_list_value=iterator_list_value
+        )
+
         # append iteration variable (item, index) to variable pool
         variable_pool.add([self.node_id, "index"], 0)
         variable_pool.add([self.node_id, "item"], iterator_list_value[0])
@@ -160,7 +169,11 @@ class IterationNode(BaseNode):
         from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
         from core.workflow.graph_engine.graph_engine import GraphEngine, GraphEngineThreadPool
 
-        graph_runtime_state = GraphRuntimeState(variable_pool=variable_pool, start_at=time.perf_counter())
+        graph_runtime_state = GraphRuntimeState(
+            variable_pool=variable_pool,
+            start_at=time.perf_counter(),
+            code_execution_results=code_execution_results,
+        )
 
         graph_engine = GraphEngine(
             tenant_id=self.tenant_id,
@@ -177,6 +190,7 @@ class IterationNode(BaseNode):
             max_execution_steps=dify_config.WORKFLOW_MAX_EXECUTION_STEPS,
             max_execution_time=dify_config.WORKFLOW_MAX_EXECUTION_TIME,
             thread_pool_id=self.thread_pool_id,
+            compiled_workflow=self.compiled_workflow,
         )
 
         start_at = datetime.now(UTC).replace(tzinfo=None)
@@ -322,6 +336,36 @@ class IterationNode(BaseNode):
             variable_pool.remove([self.node_id, "index"])
             variable_pool.remove([self.node_id, "item"])
 
+    def _batch_execute_code_node(
+        self, iteration_graph: Graph, iterator_list_value: Sequence[Any]
+    ) -> dict[str, Mapping[str, Any]]:
+        """
+        Execute the code of every iteration ahead in batches, if an iteration only runs a single code node.
+
+        Code nodes of the iterations then use these results instead of each sending a request to the
+        code execution service.
+        """
+        if len(iterator_list_value) < 2:
+            return {}
+
+        node_configs = [
+            node_config
+            for node_config in iteration_graph.node_id_config_mapping.values()
+            if node_config.get("data", {}).get("type") != NodeType.ITERATION_START
+        ]
+        if len(node_configs) != 1 or node_configs[0].get("data", {}).get("type") != NodeType.CODE:
+            return {}
+
+        node_data = CodeNodeData.model_validate(node_configs[0]["data"])
+        variable_pool = self.graph_runtime_state.variable_pool
+        inputs_list = []
+        for index, item in enumerate(iterator_list_value):
+            variable_pool.add([self.node_id, "index"], index)
+            variable_pool.add([self.node_id, "item"], item)
+            inputs_list.append(CodeNode.get_inputs(node_data, variable_pool))
+
+        return CodeNode.batch_execute(node_id=node_configs[0]["id"], node_data=node_data, inputs_list=inputs_list)
+
     @classmethod
     def _extract_variable_selector_to_variable_mapping(
         cls,
@@ -695,12 +695,9 @@ class KnowledgeRetrievalNode(BaseNode):
         elif provider_model.status == ModelStatus.QUOTA_EXCEEDED:
             raise ModelQuotaExceededError(f"Model provider {provider_name} quota exceeded.")
 
-        # model config
+        # model config, node data is shared by the runs of a compiled workflow so it is not modified
         completion_params = model.completion_params
-        stop = []
-        if "stop" in completion_params:
-            stop = completion_params["stop"]
-            del completion_params["stop"]
+        stop = completion_params.get("stop", [])
 
         # get model mode
         model_mode = model.mode
@@ -719,7 +716,7 @@ class KnowledgeRetrievalNode(BaseNode):
             mode=model_mode,
             provider_model_bundle=provider_model_bundle,
             credentials=model_credentials,
-            parameters=completion_params,
+            parameters={key: value for key, value in completion_params.items() if key != "stop"},
             stop=stop,
         )
 
@@ -331,11 +331,11 @@ def _ge(value: int | float) -> Callable[[int | float], bool]:
 
 
 def _order_number(*, order: Literal["asc", "desc"], array: Sequence[int | float]):
-    return sorted(array, key=lambda x: x, reverse=order == "desc")
+    return sorted(array, reverse=order == "desc")
 
 
 def _order_string(*, order: Literal["asc", "desc"], array: Sequence[str]):
-    return sorted(array, key=lambda x: x, reverse=order == "desc")
+    return sorted(array, reverse=order == "desc")
 
 
 def _order_file(*, order: Literal["asc", "desc"], order_by: str = "", array: Sequence[File]):
@@ -1,20 +1,19 @@
 from collections.abc import Sequence
-from datetime import UTC, datetime
 from typing import Optional, cast
 
-from sqlalchemy import select, update
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from configs import dify_config
 from core.app.entities.app_invoke_entities import ModelConfigWithCredentialsEntity
 from core.entities.provider_entities import QuotaUnit
 from core.file.models import File
+from core.helper.provider_quota_accumulator import ProviderQuotaAccumulator
 from core.memory.token_buffer_memory import TokenBufferMemory
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.llm_entities import LLMUsage
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
-from core.plugin.entities.plugin import ModelProviderID
 from core.prompt.entities.advanced_prompt_entities import MemoryConfig
 from core.variables.segments import ArrayAnySegment, ArrayFileSegment, FileSegment, NoneSegment, StringSegment
 from core.workflow.entities.variable_pool import VariablePool
@@ -22,7 +21,7 @@ from core.workflow.enums import SystemVariableKey
 from core.workflow.nodes.llm.entities import ModelConfig
 from models import db
 from models.model import Conversation
-from models.provider import Provider, ProviderType
+from models.provider import ProviderType
 
 from .exc import InvalidVariableTypeError, LLMModeRequiredError, ModelNotExistError
 
@@ -51,10 +50,9 @@ def fetch_model_config(
         raise ModelNotExistError(f"Model {node_data_model.name} not exist.")
     provider_model.raise_for_status()
 
-    # model config
-    stop: list[str] = []
-    if "stop" in node_data_model.completion_params:
-        stop = node_data_model.completion_params.pop("stop")
+    # model config, node data is shared by the runs of a compiled workflow so it is not modified
+    completion_params = node_data_model.completion_params
+    stop: list[str] = completion_params.get("stop", [])
 
     model_schema = model.model_type_instance.get_model_schema(node_data_model.name, model.credentials)
     if not model_schema:
@@ -67,7 +65,7 @@ def fetch_model_config(
         mode=node_data_model.mode,
         provider_model_bundle=model.provider_model_bundle,
         credentials=model.credentials,
-        parameters=node_data_model.completion_params,
+        parameters={key: value for key, value in completion_params.items() if key != "stop"},
         stop=stop,
     )
 
@@ -136,21 +134,9 @@ def deduct_llm_quota(tenant_id: str, model_instance: ModelInstance, usage: LLMUs
             used_quota = 1
 
     if used_quota is not None and system_configuration.current_quota_type is not None:
-        with Session(db.engine) as session:
-            stmt = (
-                update(Provider)
-                .where(
-                    Provider.tenant_id == tenant_id,
-                    # TODO: Use provider name with prefix after the data migration.
-                    Provider.provider_name == ModelProviderID(model_instance.provider).provider_name,
-                    Provider.provider_type == ProviderType.SYSTEM.value,
-                    Provider.quota_type == system_configuration.current_quota_type.value,
-                    Provider.quota_limit > Provider.quota_used,
-                )
-                .values(
-                    quota_used=Provider.quota_used + used_quota,
-                    last_used=datetime.now(tz=UTC).replace(tzinfo=None),
-                )
-            )
-            session.execute(stmt)
-            session.commit()
+        ProviderQuotaAccumulator.deduct(
+            tenant_id=tenant_id,
+            provider_name=model_instance.provider,
+            quota_type=system_configuration.current_quota_type.value,
+            quota=used_quota,
+        )
@@ -171,7 +171,9 @@ class LLMNode(BaseNode):
 
         try:
             # init messages template
-            self._node_data.prompt_template = self._transform_chat_messages(self._node_data.prompt_template)
+            self._node_data = self._node_data.model_copy(
+                update={"prompt_template": self._transform_chat_messages(self._node_data.prompt_template)}
+            )
 
             # fetch variables and fetch values from variable pool
             inputs = self._fetch_inputs(node_data=self._node_data)
@@ -345,6 +347,9 @@ class LLMNode(BaseNode):
         if not model_schema:
             raise ValueError(f"Model schema not found for {node_data_model.name}")
 
+        # stop sequences are passed separately, node data is shared between runs so it is not modified
+        model_parameters = {key: value for key, value in node_data_model.completion_params.items() if key != "stop"}
+
         if structured_output_enabled:
             output_schema = LLMNode.fetch_structured_output_schema(
                 structured_output=structured_output or {},
@@ -355,7 +360,7 @@ class LLMNode(BaseNode):
                 model_instance=model_instance,
                 prompt_messages=prompt_messages,
                 json_schema=output_schema,
-                model_parameters=node_data_model.completion_params,
+                model_parameters=model_parameters,
                 stop=list(stop or []),
                 stream=True,
                 user=user_id,
@@ -363,7 +368,7 @@ class LLMNode(BaseNode):
         else:
             invoke_result = model_instance.invoke_llm(
                 prompt_messages=list(prompt_messages),
-                model_parameters=node_data_model.completion_params,
+                model_parameters=model_parameters,
                 stop=list(stop or []),
                 stream=True,
                 user=user_id,
@@ -440,17 +445,19 @@ class LLMNode(BaseNode):
     def _transform_chat_messages(
         self, messages: Sequence[LLMNodeChatModelMessage] | LLMNodeCompletionModelPromptTemplate, /
     ) -> Sequence[LLMNodeChatModelMessage] | LLMNodeCompletionModelPromptTemplate:
+        # node data is shared between runs, so templates are copied instead of modified
         if isinstance(messages, LLMNodeCompletionModelPromptTemplate):
             if messages.edition_type == "jinja2" and messages.jinja2_text:
-                messages.text = messages.jinja2_text
+                return messages.model_copy(update={"text": messages.jinja2_text})
 
             return messages
 
-        for message in messages:
-            if message.edition_type == "jinja2" and message.jinja2_text:
-                message.text = message.jinja2_text
-
-        return messages
+        return [
+            message.model_copy(update={"text": message.jinja2_text})
+            if message.edition_type == "jinja2" and message.jinja2_text
+            else message
+            for message in messages
+        ]
 
     def _fetch_jinja_inputs(self, node_data: LLMNodeData) -> dict[str, str]:
         variables: dict[str, Any] = {}
@@ -610,8 +617,6 @@ class LLMNode(BaseNode):
             raise ModelNotExistError(f"Model {node_data_model.name} not exist.")
 
         model_config_with_cred.parameters = completion_params
-        # NOTE(-LAN-): This line modify the `self.node_data.model`, which is used in `_invoke_llm()`.
-        node_data_model.completion_params = completion_params
         return model, model_config_with_cred
 
     @staticmethod
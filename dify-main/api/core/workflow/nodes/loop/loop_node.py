@@ -91,7 +91,10 @@ class LoopNode(BaseNode):
             raise ValueError(f"field start_node_id in loop {self.node_id} not found")
 
         # Initialize graph
-        loop_graph = Graph.init(graph_config=self.graph_config, root_node_id=self._node_data.start_node_id)
+        if self.compiled_workflow:
+            loop_graph = self.compiled_workflow.get_graph(root_node_id=self._node_data.start_node_id)
+        else:
+            loop_graph = Graph.init(graph_config=self.graph_config, root_node_id=self._node_data.start_node_id)
         if not loop_graph:
             raise ValueError("loop graph not found")
 
@@ -141,6 +144,7 @@ class LoopNode(BaseNode):
             max_execution_steps=dify_config.WORKFLOW_MAX_EXECUTION_STEPS,
             max_execution_time=dify_config.WORKFLOW_MAX_EXECUTION_TIME,
             thread_pool_id=self.thread_pool_id,
+            compiled_workflow=self.compiled_workflow,
         )
 
         start_at = datetime.now(UTC).replace(tzinfo=None)
@@ -411,7 +415,7 @@ class LoopNode(BaseNode):
                 _outputs[loop_variable_key] = None
 
         _outputs["loop_round"] = current_index + 1
-        self._node_data.outputs = _outputs
+        self._node_data = self._node_data.model_copy(update={"outputs": _outputs})
 
         if check_break_result:
             return {"check_break_result": True}
@@ -299,7 +299,8 @@ class ParameterExtractorNode(BaseNode):
     ) -> tuple[str, LLMUsage, Optional[AssistantPromptMessage.ToolCall]]:
         invoke_result = model_instance.invoke_llm(
             prompt_messages=prompt_messages,
-            model_parameters=node_data_model.completion_params,
+            # stop sequences are passed separately
+            model_parameters={key: value for key, value in node_data_model.completion_params.items() if key != "stop"},
             tools=tools,
             stop=stop,
             stream=False,
@@ -129,8 +129,9 @@ class QuestionClassifierNode(BaseNode):
             model_instance=model_instance,
         )
         # fetch instruction
-        node_data.instruction = node_data.instruction or ""
-        node_data.instruction = variable_pool.convert_template(node_data.instruction).text
+        node_data = node_data.model_copy(
+            update={"instruction": variable_pool.convert_template(node_data.instruction or "").text}
+        )
 
         files = (
             llm_utils.fetch_files(
@@ -57,3 +57,12 @@ class WorkflowNodeExecutionRepository(Protocol):
             A list of NodeExecution instances
         """
         ...
+
+    def flush(self) -> None:
+        """
+        Persist NodeExecution instances that were saved but not written yet.
+
+        Implementations that write on every save have nothing to do here. Write-behind
+        implementations must have written every saved instance when this returns.
+        """
+        ...
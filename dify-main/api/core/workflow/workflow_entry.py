@@ -9,6 +9,7 @@ from core.app.apps.exc import GenerateTaskStoppedError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.file.models import File
 from core.workflow.callbacks import WorkflowCallback
+from core.workflow.compiled_workflow import CompiledWorkflow
 from core.workflow.constants import ENVIRONMENT_VARIABLE_NODE_ID
 from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.errors import WorkflowNodeRunFailedError
@@ -48,6 +49,7 @@ class WorkflowEntry:
         call_depth: int,
         variable_pool: VariablePool,
         thread_pool_id: Optional[str] = None,
+        compiled_workflow: Optional[CompiledWorkflow] = None,
     ) -> None:
         """
         Init workflow entry
@@ -63,6 +65,7 @@ class WorkflowEntry:
         :param call_depth: call depth
         :param variable_pool: variable pool
         :param thread_pool_id: thread pool id
+        :param compiled_workflow: compiled workflow to reuse the graph and node data of
         """
         # check call depth
         workflow_call_max_depth = dify_config.WORKFLOW_CALL_MAX_DEPTH
@@ -86,6 +89,7 @@ class WorkflowEntry:
             max_execution_steps=dify_config.WORKFLOW_MAX_EXECUTION_STEPS,
             max_execution_time=dify_config.WORKFLOW_MAX_EXECUTION_TIME,
             thread_pool_id=thread_pool_id,
+            compiled_workflow=compiled_workflow,
         )
 
     def run(
@@ -10,7 +10,7 @@ from sqlalchemy.orm import Session
 from configs import dify_config
 from core.app.entities.app_invoke_entities import AgentChatAppGenerateEntity, ChatAppGenerateEntity
 from core.entities.provider_entities import QuotaUnit, SystemConfiguration
-from core.plugin.entities.plugin import ModelProviderID
+from core.helper.provider_quota_accumulator import ProviderQuotaAccumulator
 from events.message_event import message_was_created
 from extensions.ext_database import db
 from libs import datetime_utils
@@ -60,8 +60,8 @@ def handle(sender: Message, **kwargs):
     - update_provider_last_used_at_when_message_created
     - deduct_quota_when_message_created
 
-    By performing all Provider updates in a single transaction, we ensure
-    consistency and efficiency when updating Provider records.
+    The last used time is updated directly, while quota deductions go through
+    ProviderQuotaAccumulator so that they are written in batches.
     """
     message = sender
     application_generate_entity = kwargs.get("application_generate_entity")
@@ -106,21 +106,14 @@ def handle(sender: Message, **kwargs):
             model_name=model_config.model,
         )
 
-        if used_quota is not None:
-            quota_update = _ProviderUpdateOperation(
-                filters=_ProviderUpdateFilters(
-                    tenant_id=tenant_id,
-                    provider_name=ModelProviderID(model_config.provider).provider_name,
-                    provider_type=ProviderType.SYSTEM.value,
-                    quota_type=provider_configuration.system_configuration.current_quota_type.value,
-                ),
-                values=_ProviderUpdateValues(quota_used=Provider.quota_used + used_quota, last_used=current_time),
-                additional_filters=_ProviderUpdateAdditionalFilters(
-                    quota_limit_check=True  # Provider.quota_limit > Provider.quota_used
-                ),
-                description="quota_deduction_update",
+        if used_quota is not None and system_configuration.current_quota_type is not None:
+            # coalesced with the other deductions of the workspace instead of updating the provider row per message
+            ProviderQuotaAccumulator.deduct(
+                tenant_id=tenant_id,
+                provider_name=model_config.provider,
+                quota_type=system_configuration.current_quota_type.value,
+                quota=used_quota,
             )
-            updates_to_perform.append(quota_update)
 
     # Execute all updates
     start_time = time_module.perf_counter()
@@ -120,6 +120,13 @@ def init_app(app: DifyApp) -> Celery:
             "schedule": crontab(minute="*/15"),
         }
 
+    if dify_config.ENABLE_APP_STATISTIC_ROLLUP_TASK:
+        imports.append("schedule.rollup_app_statistics_task")
+        beat_schedule["rollup_app_statistics_task"] = {
+            "task": "schedule.rollup_app_statistics_task.rollup_app_statistics_task",
+            "schedule": crontab(minute="5"),
+        }
+
     celery_app.conf.update(beat_schedule=beat_schedule, imports=imports)
 
     return celery_app
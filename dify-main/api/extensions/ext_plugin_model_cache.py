@@ -0,0 +1,21 @@
+import logging
+
+from configs import dify_config
+from core.helper.plugin_model_cache import plugin_model_cache
+from dify_app import DifyApp
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled() -> bool:
+    return dify_config.PLUGIN_MODEL_CACHE_WARM_UP_SIZE > 0 and dify_config.PLUGIN_MODEL_SCHEMA_CACHE_TTL > 0
+
+
+def init_app(app: DifyApp):
+    # runs in every worker, as gunicorn does not preload the app
+    try:
+        loaded = plugin_model_cache.warm_up()
+    except Exception:
+        logger.warning("Failed to warm up the plugin model cache", exc_info=True)
+        return
+    logger.info("Loaded %s model schemas into the plugin model cache", loaded)
@@ -10,7 +10,6 @@ from core.variables.segments import (
     ArrayFileSegment,
     ArrayNumberSegment,
     ArrayObjectSegment,
-    ArraySegment,
     ArrayStringSegment,
     FileSegment,
     FloatSegment,
@@ -122,6 +121,70 @@ def infer_segment_type_from_value(value: Any, /) -> SegmentType:
     return build_segment(value).value_type
 
 
+# segment type of list items by their exact python type, other types fall back to `isinstance` checks
+_ARRAY_ITEM_TYPES: Mapping[type, SegmentType] = {
+    str: SegmentType.STRING,
+    int: SegmentType.NUMBER,
+    float: SegmentType.NUMBER,
+    bool: SegmentType.NUMBER,
+    dict: SegmentType.OBJECT,
+    type(None): SegmentType.NONE,
+}
+
+_ArraySegmentClass = (
+    type[ArrayAnySegment]
+    | type[ArrayStringSegment]
+    | type[ArrayNumberSegment]
+    | type[ArrayObjectSegment]
+    | type[ArrayFileSegment]
+)
+
+_ARRAY_SEGMENT_CLASSES: Mapping[SegmentType, _ArraySegmentClass] = {
+    SegmentType.STRING: ArrayStringSegment,
+    SegmentType.NUMBER: ArrayNumberSegment,
+    SegmentType.OBJECT: ArrayObjectSegment,
+    SegmentType.FILE: ArrayFileSegment,
+}
+
+
+def _infer_array_item_type(item: Any) -> SegmentType:
+    if item is None:
+        return SegmentType.NONE
+    if isinstance(item, str):
+        return SegmentType.STRING
+    if isinstance(item, int | float):
+        return SegmentType.NUMBER
+    if isinstance(item, dict):
+        return SegmentType.OBJECT
+    if isinstance(item, File):
+        return SegmentType.FILE
+    if isinstance(item, list):
+        # nested items are only checked to be supported, any list of lists is an array[any]
+        _infer_array_segment_class(item)
+        return SegmentType.ARRAY_ANY
+    raise ValueError(f"not supported value {item}")
+
+
+def _infer_array_segment_class(value: list, /) -> _ArraySegmentClass:
+    """
+    Infer the segment class of a list in a single pass over its items, without building a segment
+    for each of them.
+    """
+    item_types = _ARRAY_ITEM_TYPES
+    value_type: SegmentType | None = None
+    mixed = False
+    for item in value:
+        item_type = item_types.get(type(item)) or _infer_array_item_type(item)
+        if value_type is None:
+            value_type = item_type
+        elif item_type != value_type:
+            # keep checking the remaining items, which may not be supported
+            mixed = True
+    if mixed or value_type is None:
+        return ArrayAnySegment
+    return _ARRAY_SEGMENT_CLASSES.get(value_type, ArrayAnySegment)
+
+
 def build_segment(value: Any, /) -> Segment:
     # NOTE: If you have runtime type information available, consider using the `build_segment_with_type`
     # below
@@ -138,29 +201,7 @@ def build_segment(value: Any, /) -> Segment:
     if isinstance(value, File):
         return FileSegment(value=value)
     if isinstance(value, list):
-        items = [build_segment(item) for item in value]
-        types = {item.value_type for item in items}
-        if all(isinstance(item, ArraySegment) for item in items):
-            return ArrayAnySegment(value=value)
-        elif len(types) != 1:
-            if types.issubset({SegmentType.NUMBER, SegmentType.INTEGER, SegmentType.FLOAT}):
-                return ArrayNumberSegment(value=value)
-            return ArrayAnySegment(value=value)
-
-        match types.pop():
-            case SegmentType.STRING:
-                return ArrayStringSegment(value=value)
-            case SegmentType.NUMBER | SegmentType.INTEGER | SegmentType.FLOAT:
-                return ArrayNumberSegment(value=value)
-            case SegmentType.OBJECT:
-                return ArrayObjectSegment(value=value)
-            case SegmentType.FILE:
-                return ArrayFileSegment(value=value)
-            case SegmentType.NONE:
-                return ArrayAnySegment(value=value)
-            case _:
-                # This should be unreachable.
-                raise ValueError(f"not supported value {value}")
+        return _infer_array_segment_class(value)(value=value)
     raise ValueError(f"not supported value {value}")
 
 
@@ -1,9 +1,12 @@
+import json
 import time
 import traceback
+from collections.abc import Iterable, Iterator
 from flask import Flask, request, g
 from functools import wraps
 from typing import Optional, Callable, Any
 
+from services.chat_log_writer import chat_log_writer
 from services.logging_service import logging_service
 from models.account import Account
 
@@ -15,6 +18,7 @@ class ChatLoggingMiddleware:
             self.init_app(app)
     
     def init_app(self, app: Flask):
+        chat_log_writer.init_app(app)
         app.before_request(self.before_request)
         app.after_request(self.after_request)
         app.teardown_appcontext(self.teardown_appcontext)
@@ -70,11 +74,28 @@ class ChatLoggingMiddleware:
         try:
             # Lấy input từ request
             input_text = ""
+            conversation_id = g.conversation_id
             if request.is_json and request.json:
                 input_text = str(request.json.get('query', '') or 
                                request.json.get('inputs', '') or
                                request.json.get('question', ''))
-            
+                if not conversation_id:
+                    conversation_id = request.json.get('conversation_id')
+
+            log_kwargs = {
+                'app_id': g.app_id or 'unknown',
+                'user_id': g.user_id or 'anonymous',
+                'input_text': input_text[:4000],  # Giới hạn độ dài
+                'status_code': response.status_code,
+            }
+
+            # Response SSE chưa có nội dung ở đây, ghi log khi stream kết thúc
+            if response.is_streamed and response.mimetype == 'text/event-stream':
+                response.response = self._log_streamed_chat_interaction(
+                    response.response, g.start_time, conversation_id, log_kwargs
+                )
+                return
+
             # Lấy output từ response (nếu có thể)
             output_text = ""
             if response.is_json:
@@ -84,35 +105,53 @@ class ChatLoggingMiddleware:
                         output_text = str(data.get('answer', '') or
                                         data.get('data', {}).get('outputs', '') or
                                         data.get('text', ''))
+                        if not conversation_id:
+                            conversation_id = data.get('conversation_id')
                 except:
                     pass
             
-            # Lấy conversation_id từ request hoặc response
-            conversation_id = g.conversation_id
-            if not conversation_id and request.is_json:
-                conversation_id = request.json.get('conversation_id')
-            
-            if not conversation_id and response.is_json:
-                try:
-                    data = response.get_json()
-                    conversation_id = data.get('conversation_id')
-                except:
-                    pass
-            
-            # Log vào database
+            # Đưa vào hàng đợi ghi log
             logging_service.log_chat_interaction(
-                app_id=g.app_id or 'unknown',
                 conversation_id=conversation_id or 'unknown',
-                user_id=g.user_id or 'anonymous',
-                input_text=input_text[:4000],  # Giới hạn độ dài
                 output_text=output_text[:4000],
                 latency_ms=latency_ms,
-                status_code=response.status_code,
-                status='success' if response.status_code < 400 else 'error'
+                status='success' if response.status_code < 400 else 'error',
+                **log_kwargs
             )
             
         except Exception as e:
             print(f"Error in _log_chat_interaction: {e}")
+
+    def _log_streamed_chat_interaction(self, stream: Iterable, start_time: float,
+                                       conversation_id: Optional[str], log_kwargs: dict) -> Iterator:
+        """Chuyển tiếp stream SSE và ghi log câu trả lời cuối cùng khi stream kết thúc"""
+        collector = StreamedAnswerCollector()
+        try:
+            for chunk in stream:
+                try:
+                    collector.feed(chunk)
+                except Exception as e:
+                    print(f"Error collecting streamed answer: {e}")
+                yield chunk
+        finally:
+            # Client ngắt kết nối thì chỉ generator này bị đóng, đóng luôn stream gốc để dừng pipeline
+            close = getattr(stream, 'close', None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Error closing streamed response: {e}")
+            try:
+                logging_service.log_chat_interaction(
+                    conversation_id=collector.conversation_id or conversation_id or 'unknown',
+                    output_text=collector.output_text[:4000],
+                    latency_ms=int((time.time() - start_time) * 1000),
+                    work_run_id=collector.workflow_run_id,
+                    status='error' if collector.failed or log_kwargs['status_code'] >= 400 else 'success',
+                    **log_kwargs
+                )
+            except Exception as e:
+                print(f"Error in _log_streamed_chat_interaction: {e}")
     
     def _log_error(self, error):
         """Ghi log lỗi"""
@@ -136,6 +175,59 @@ class ChatLoggingMiddleware:
             print(f"Error in _log_error: {e}")
 
 
+class StreamedAnswerCollector:
+    """
+    Gom câu trả lời cuối cùng từ các event SSE của task pipeline
+    (message / agent_message / message_replace / workflow_finished)
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._answer: list[str] = []
+        self._workflow_outputs: Any = None
+        self.conversation_id: Optional[str] = None
+        self.workflow_run_id: Optional[str] = None
+        self.failed = False
+
+    @property
+    def output_text(self) -> str:
+        if self._answer:
+            return "".join(self._answer)
+        if self._workflow_outputs:
+            return str(self._workflow_outputs)
+        return ""
+
+    def feed(self, chunk: Any):
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('utf-8', errors='ignore')
+        self._buffer += chunk
+        # Mỗi event SSE kết thúc bằng một dòng trống
+        *events, self._buffer = self._buffer.split("\n\n")
+        for event in events:
+            for line in event.splitlines():
+                if line.startswith("data: "):
+                    self._handle_event(json.loads(line[len("data: "):]))
+
+    def _handle_event(self, data: Any):
+        if not isinstance(data, dict):
+            return
+        self.conversation_id = data.get('conversation_id') or self.conversation_id
+        self.workflow_run_id = data.get('workflow_run_id') or self.workflow_run_id
+
+        event = data.get('event')
+        if event in ('message', 'agent_message'):
+            self._answer.append(data.get('answer') or '')
+        elif event == 'message_replace':
+            self._answer = [data.get('answer') or '']
+        elif event == 'workflow_finished':
+            workflow_data = data.get('data') or {}
+            self._workflow_outputs = workflow_data.get('outputs')
+            if workflow_data.get('status') == 'failed':
+                self.failed = True
+        elif event == 'error':
+            self.failed = True
+
+
 def log_chat_decorator(func: Callable) -> Callable:
     """
     Decorator để log các function chat cụ thể
@@ -13,6 +13,7 @@ from .dataset import (
     AppDatasetJoin,
     Dataset,
     DatasetCollectionBinding,
+    DatasetKeywordPosting,
     DatasetKeywordTable,
     DatasetPermission,
     DatasetPermissionEnum,
@@ -37,6 +38,7 @@ from .model import (
     AppMCPServer,
     AppMode,
     AppModelConfig,
+    AppStatisticHourlyRollup,
     Conversation,
     DatasetRetrieverResource,
     DifySetup,
@@ -52,6 +54,7 @@ from .model import (
     OperationLog,
     RecommendedApp,
     Site,
+    StatisticRollupWatermark,
     Tag,
     TagBinding,
     TraceAppConfig,
@@ -107,6 +110,7 @@ __all__ = [
     "AppMCPServer",  # Added
     "AppMode",
     "AppModelConfig",
+    "AppStatisticHourlyRollup",
     "BuiltinToolProvider",
     "CeleryTask",
     "CeleryTaskSet",
@@ -117,6 +121,7 @@ __all__ = [
     "DataSourceOauthBinding",
     "Dataset",
     "DatasetCollectionBinding",
+    "DatasetKeywordPosting",
     "DatasetKeywordTable",
     "DatasetPermission",
     "DatasetPermissionEnum",
@@ -151,6 +156,7 @@ __all__ = [
     "RecommendedApp",
     "SavedMessage",
     "Site",
+    "StatisticRollupWatermark",
     "Tag",
     "TagBinding",
     "Tenant",
@@ -12,6 +12,7 @@ from datetime import datetime
 from json import JSONDecodeError
 from typing import Any, Optional, cast
 
+import numpy as np
 import sqlalchemy as sa
 from sqlalchemy import DateTime, String, func, select
 from sqlalchemy.dialects.postgresql import JSONB
@@ -918,6 +919,25 @@ class DatasetKeywordTable(Base):
                 return None
 
 
+class DatasetKeywordPosting(Base):
+    """One row per (keyword, index node) pair of a dataset's inverted keyword index."""
+
+    __tablename__ = "dataset_keyword_postings"
+    __table_args__ = (
+        sa.PrimaryKeyConstraint("id", name="dataset_keyword_posting_pkey"),
+        sa.UniqueConstraint(
+            "dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_dataset_keyword_node_key"
+        ),
+        sa.Index("dataset_keyword_posting_dataset_node_idx", "dataset_id", "index_node_id"),
+    )
+
+    id = mapped_column(StringUUID, primary_key=True, server_default=sa.text("uuid_generate_v4()"))
+    dataset_id = mapped_column(StringUUID, nullable=False)
+    keyword: Mapped[str] = mapped_column(sa.Text, nullable=False)
+    index_node_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.current_timestamp())
+
+
 class Embedding(Base):
     __tablename__ = "embeddings"
     __table_args__ = (
@@ -935,11 +955,25 @@ class Embedding(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.current_timestamp())
     provider_name = mapped_column(String(255), nullable=False, server_default=sa.text("''::character varying"))
 
+    # Header of embeddings stored as raw little-endian float32, older rows are pickled lists of floats.
+    FLOAT32_HEADER = b"F32\x00"
+
+    @classmethod
+    def encode_embedding(cls, embedding_data: list[float]) -> bytes:
+        return cls.FLOAT32_HEADER + np.asarray(embedding_data, dtype="<f4").tobytes()
+
     def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.embedding = self.encode_embedding(embedding_data)
 
     def get_embedding(self) -> list[float]:
-        return cast(list[float], pickle.loads(self.embedding))  # noqa: S301
+        if self.is_pickled:
+            return cast(list[float], pickle.loads(self.embedding))  # noqa: S301
+        return cast(list[float], np.frombuffer(self.embedding, dtype="<f4", offset=len(self.FLOAT32_HEADER)).tolist())
+
+    @property
+    def is_pickled(self) -> bool:
+        """Whether the embedding is still stored in the legacy pickle format."""
+        return not bytes(self.embedding).startswith(self.FLOAT32_HEADER)
 
 
 class DatasetCollectionBinding(Base):
@@ -1862,3 +1862,32 @@ class TraceAppConfig(Base):
             "created_at": str(self.created_at) if self.created_at else None,
             "updated_at": str(self.updated_at) if self.updated_at else None,
         }
+
+
+class AppStatisticHourlyRollup(Base):
+    """Hourly per-app totals of messages, maintained by the app statistic rollup task."""
+
+    __tablename__ = "app_statistic_hourly_rollups"
+    __table_args__ = (sa.PrimaryKeyConstraint("app_id", "hour", name="app_statistic_hourly_rollup_pkey"),)
+
+    app_id = mapped_column(StringUUID, nullable=False)
+    # start of the hour in UTC
+    hour: Mapped[datetime] = mapped_column(sa.DateTime, nullable=False)
+    message_count: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=sa.text("0"))
+    message_tokens: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+    answer_tokens: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+    total_price = mapped_column(sa.Numeric(20, 7), nullable=True)
+    # sum of the provider response latency of the messages, in seconds
+    provider_response_latency: Mapped[float] = mapped_column(sa.Float, nullable=False, server_default=sa.text("0"))
+    updated_at: Mapped[datetime] = mapped_column(sa.DateTime, nullable=False, server_default=func.current_timestamp())
+
+
+class StatisticRollupWatermark(Base):
+    """Point in time up to which a rollup table is complete."""
+
+    __tablename__ = "statistic_rollup_watermarks"
+    __table_args__ = (sa.PrimaryKeyConstraint("name", name="statistic_rollup_watermark_pkey"),)
+
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    rolled_up_to: Mapped[datetime] = mapped_column(sa.DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(sa.DateTime, nullable=False, server_default=func.current_timestamp())
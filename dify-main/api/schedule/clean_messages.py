@@ -1,24 +1,18 @@
 import datetime
 import logging
 import time
+from collections.abc import Sequence
+from typing import Any
 
 import click
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Row
 
 import app
 from configs import dify_config
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
-from models.model import (
-    App,
-    Message,
-    MessageAgentThought,
-    MessageAnnotation,
-    MessageChain,
-    MessageFeedback,
-    MessageFile,
-)
-from models.web import SavedMessage
+from models.model import App, Message
+from services.bulk_purge_service import MESSAGE_PURGE_CASCADES, BulkPurgeService
 from services.feature_service import FeatureService
 
 _logger = logging.getLogger(__name__)
@@ -31,60 +25,54 @@ def clean_messages():
     plan_sandbox_clean_message_day = datetime.datetime.now() - datetime.timedelta(
         days=dify_config.PLAN_SANDBOX_CLEAN_MESSAGE_DAY_SETTING
     )
-    while True:
-        try:
-            # Main query with join and filter
-            messages = (
-                db.session.query(Message)
-                .where(Message.created_at < plan_sandbox_clean_message_day)
-                .order_by(Message.created_at.desc())
-                .limit(100)
-                .all()
+    stats = BulkPurgeService(batch_size=1000).purge(
+        Message,
+        Message.created_at < plan_sandbox_clean_message_day,
+        columns=(Message.app_id,),
+        select_ids=_select_sandbox_message_ids,
+        cascades=MESSAGE_PURGE_CASCADES,
+        name="sandbox message",
+    )
+    end_at = time.perf_counter()
+    click.echo(
+        click.style(
+            f"Cleaned {stats.deleted.get('messages', 0)} messages from db success latency: {end_at - start_at}",
+            fg="green",
+        )
+    )
+
+
+def _select_sandbox_message_ids(rows: Sequence[Row[Any]]) -> list[str]:
+    """Pick the messages of apps whose workspace is on the sandbox plan."""
+    app_ids = {row.app_id for row in rows}
+    tenant_ids: dict[str, str] = {
+        row.id: row.tenant_id for row in db.session.query(App.id, App.tenant_id).where(App.id.in_(app_ids)).all()
+    }
+    db.session.close()
+
+    plans: dict[str, str] = {}
+    message_ids = []
+    for row in rows:
+        tenant_id = tenant_ids.get(row.app_id)
+        if not tenant_id:
+            _logger.warning(
+                "Expected App record to exist, but none was found, app_id=%s, message_id=%s",
+                row.app_id,
+                row.id,
             )
+            continue
+        if tenant_id not in plans:
+            plans[tenant_id] = _get_plan(tenant_id)
+        if plans[tenant_id] == "sandbox":
+            message_ids.append(row.id)
+    return message_ids
 
-        except SQLAlchemyError:
-            raise
-        if not messages:
-            break
-        for message in messages:
-            plan_sandbox_clean_message_day = message.created_at
-            app = db.session.query(App).filter_by(id=message.app_id).first()
-            if not app:
-                _logger.warning(
-                    "Expected App record to exist, but none was found, app_id=%s, message_id=%s",
-                    message.app_id,
-                    message.id,
-                )
-                continue
-            features_cache_key = f"features:{app.tenant_id}"
-            plan_cache = redis_client.get(features_cache_key)
-            if plan_cache is None:
-                features = FeatureService.get_features(app.tenant_id)
-                redis_client.setex(features_cache_key, 600, features.billing.subscription.plan)
-                plan = features.billing.subscription.plan
-            else:
-                plan = plan_cache.decode()
-            if plan == "sandbox":
-                # clean related message
-                db.session.query(MessageFeedback).where(MessageFeedback.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageAnnotation).where(MessageAnnotation.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageChain).where(MessageChain.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageAgentThought).where(MessageAgentThought.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageFile).where(MessageFile.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(SavedMessage).where(SavedMessage.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(Message).where(Message.id == message.id).delete()
-                db.session.commit()
-    end_at = time.perf_counter()
-    click.echo(click.style(f"Cleaned messages from db success latency: {end_at - start_at}", fg="green"))
+
+def _get_plan(tenant_id: str) -> str:
+    features_cache_key = f"features:{tenant_id}"
+    plan_cache: bytes | None = redis_client.get(features_cache_key)
+    if plan_cache is not None:
+        return plan_cache.decode()
+    features = FeatureService.get_features(tenant_id)
+    redis_client.setex(features_cache_key, 600, features.billing.subscription.plan)
+    return features.billing.subscription.plan
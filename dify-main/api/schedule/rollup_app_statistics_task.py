@@ -0,0 +1,17 @@
+import time
+
+import click
+
+import app
+from services.app_statistic_service import AppStatisticService
+
+
+@app.celery.task(queue="dataset")
+def rollup_app_statistics_task():
+    click.echo(click.style("Start rollup app statistics.", fg="green"))
+    start_at = time.perf_counter()
+
+    rolled_up_to = AppStatisticService.rollup()
+
+    end_at = time.perf_counter()
+    click.echo(click.style(f"Rolled up app statistics to {rolled_up_to} latency: {end_at - start_at}", fg="green"))
@@ -33,6 +33,7 @@ from models.account import (
     TenantStatus,
 )
 from models.model import DifySetup
+from services.api_token_service import ApiTokenAuthCache
 from services.billing_service import BillingService
 from services.errors.account import (
     AccountAlreadyInTenantError,
@@ -1113,6 +1114,9 @@ class TenantService:
         target_member_join.role = new_role
         db.session.commit()
 
+        if new_role == "owner":
+            ApiTokenAuthCache.invalidate_tenant(tenant.id)
+
     @staticmethod
     def get_custom_config(tenant_id: str) -> dict:
         tenant = db.get_or_404(Tenant, tenant_id)
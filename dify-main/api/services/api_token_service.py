@@ -0,0 +1,250 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional, TypeVar
+
+import sqlalchemy as sa
+from cachetools import TTLCache
+from flask import Flask, current_app
+from sqlalchemy import update
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from configs import dify_config
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from libs.datetime_utils import naive_utc_now
+from models.account import Account, Tenant, TenantAccountRole
+from models.model import ApiToken, EndUser
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ApiTokenAuthCache:
+    """
+    Short-lived cache of what service API authentication loads on every request.
+
+    Entries are the API token keyed by a hash of its value, the owner of a workspace, and end users.
+    Lookups go to an in-process cache first and redis second. Callers invalidate entries when tokens
+    are deleted or workspace owners change, and entries expire after API_TOKEN_AUTH_CACHE_TTL seconds.
+    """
+
+    # Account columns that are never cached, they are loaded from the database if accessed
+    _ACCOUNT_EXCLUDED_COLUMNS = {"password", "password_salt"}
+
+    _local_cache: Optional[TTLCache[str, dict[str, Any]]] = (
+        TTLCache(maxsize=10000, ttl=dify_config.API_TOKEN_AUTH_LOCAL_CACHE_TTL)
+        if dify_config.API_TOKEN_AUTH_LOCAL_CACHE_TTL > 0
+        else None
+    )
+    _local_cache_lock = threading.Lock()
+
+    @classmethod
+    def get_api_token(cls, token: str, scope: Optional[str]) -> Optional[ApiToken]:
+        data = cls._get(cls._api_token_key(token, scope))
+        if data is None:
+            return None
+        return cls._load_model(ApiToken, data)
+
+    @classmethod
+    def set_api_token(cls, token: str, scope: Optional[str], api_token: ApiToken) -> None:
+        cls._set(cls._api_token_key(token, scope), cls._dump_model(api_token))
+
+    @classmethod
+    def invalidate_api_token(cls, token: str, scope: Optional[str]) -> None:
+        cls._delete(cls._api_token_key(token, scope))
+
+    @classmethod
+    def get_tenant_owner(cls, tenant_id: str) -> Optional[tuple[Tenant, Account]]:
+        """
+        Get the normal-status workspace and its owner, attached to the current session and with the
+        owner's current tenant set.
+        """
+        data = cls._get(cls._tenant_owner_key(tenant_id))
+        if data is None:
+            return None
+        tenant = db.session.merge(cls._load_model(Tenant, data["tenant"]), load=False)
+        account = db.session.merge(cls._load_model(Account, data["account"]), load=False)
+        # Same as `account.current_tenant = tenant`, the cached account is known to be the owner
+        account.role = TenantAccountRole.OWNER
+        account._current_tenant = tenant
+        return tenant, account
+
+    @classmethod
+    def set_tenant_owner(cls, tenant: Tenant, account: Account) -> None:
+        cls._set(
+            cls._tenant_owner_key(tenant.id),
+            {
+                "tenant": cls._dump_model(tenant),
+                "account": cls._dump_model(account, exclude=cls._ACCOUNT_EXCLUDED_COLUMNS),
+            },
+        )
+
+    @classmethod
+    def invalidate_tenant(cls, tenant_id: str) -> None:
+        cls._delete(cls._tenant_owner_key(tenant_id))
+
+    @classmethod
+    def get_end_user(cls, app_id: str, session_id: str) -> Optional[EndUser]:
+        data = cls._get(cls._end_user_key(app_id, session_id))
+        if data is None:
+            return None
+        return db.session.merge(cls._load_model(EndUser, data), load=False)
+
+    @classmethod
+    def set_end_user(cls, end_user: EndUser) -> None:
+        cls._set(cls._end_user_key(end_user.app_id, end_user.session_id), cls._dump_model(end_user))
+
+    @staticmethod
+    def _api_token_key(token: str, scope: Optional[str]) -> str:
+        return f"api_token_auth:token:{scope}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+    @staticmethod
+    def _tenant_owner_key(tenant_id: str) -> str:
+        return f"api_token_auth:tenant_owner:{tenant_id}"
+
+    @staticmethod
+    def _end_user_key(app_id: str, session_id: str) -> str:
+        return f"api_token_auth:end_user:{app_id}:{hashlib.sha256(session_id.encode()).hexdigest()}"
+
+    @classmethod
+    def _get(cls, key: str) -> Optional[dict[str, Any]]:
+        if dify_config.API_TOKEN_AUTH_CACHE_TTL <= 0:
+            return None
+        if cls._local_cache is not None:
+            with cls._local_cache_lock:
+                data = cls._local_cache.get(key)
+            if data is not None:
+                return data
+
+        try:
+            cached = redis_client.get(key)
+        except Exception:
+            logger.warning("Failed to read API token auth cache", exc_info=True)
+            return None
+        if not cached:
+            return None
+        data = json.loads(cached)
+        if not isinstance(data, dict):
+            return None
+        if cls._local_cache is not None:
+            with cls._local_cache_lock:
+                cls._local_cache[key] = data
+        return data
+
+    @classmethod
+    def _set(cls, key: str, data: dict[str, Any]) -> None:
+        if dify_config.API_TOKEN_AUTH_CACHE_TTL <= 0:
+            return
+        if cls._local_cache is not None:
+            with cls._local_cache_lock:
+                cls._local_cache[key] = data
+        try:
+            redis_client.setex(key, dify_config.API_TOKEN_AUTH_CACHE_TTL, json.dumps(data))
+        except Exception:
+            logger.warning("Failed to write API token auth cache", exc_info=True)
+
+    @classmethod
+    def _delete(cls, key: str) -> None:
+        if cls._local_cache is not None:
+            with cls._local_cache_lock:
+                cls._local_cache.pop(key, None)
+        try:
+            redis_client.delete(key)
+        except Exception:
+            logger.warning("Failed to invalidate API token auth cache", exc_info=True)
+
+    @staticmethod
+    def _dump_model(model: Any, exclude: frozenset[str] | set[str] = frozenset()) -> dict[str, Any]:
+        data = {}
+        for attr in sa.inspect(type(model)).column_attrs:
+            if attr.key in exclude:
+                continue
+            value = getattr(model, attr.key)
+            data[attr.key] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+    @staticmethod
+    def _load_model(model_class: type[T], data: dict[str, Any]) -> T:
+        """
+        Rebuild a detached model instance from cached column values without querying the database.
+        Columns missing from the cached values are loaded on access once the instance is merged.
+        """
+        model = model_class()
+        for attr in sa.inspect(model_class, raiseerr=True).column_attrs:
+            if attr.key not in data:
+                continue
+            value = data[attr.key]
+            if isinstance(value, str) and isinstance(attr.expression.type, sa.DateTime):
+                value = datetime.fromisoformat(value)
+            setattr(model, attr.key, value)
+        make_transient_to_detached(model)
+        return model
+
+
+class ApiTokenUsageRecorder:
+    """
+    Records when service API tokens were last used without writing on the request path.
+
+    A token is recorded at most once a minute across all processes, recorded tokens are written
+    by a background timer with one UPDATE every API_TOKEN_LAST_USED_FLUSH_INTERVAL seconds.
+    """
+
+    _lock = threading.Lock()
+    _pending: set[str] = set()
+    # Key: api token id, Value: monotonic time the token was last recorded by this process
+    _recorded_at: dict[str, float] = {}
+    _timer: Optional[threading.Timer] = None
+
+    @classmethod
+    def record(cls, api_token: ApiToken) -> None:
+        now = time.monotonic()
+        with cls._lock:
+            recorded_at = cls._recorded_at.get(api_token.id)
+            if recorded_at is not None and now - recorded_at < 60:
+                return
+            cls._recorded_at[api_token.id] = now
+
+        try:
+            # another process already recorded the token within the last minute
+            if not redis_client.set(f"api_token_last_used:{api_token.id}", 1, ex=60, nx=True):
+                return
+        except Exception:
+            logger.warning("Failed to coalesce API token usage", exc_info=True)
+
+        with cls._lock:
+            cls._pending.add(api_token.id)
+            if cls._timer is None or not cls._timer.is_alive():
+                flask_app = current_app._get_current_object()  # type: ignore
+                cls._timer = threading.Timer(
+                    dify_config.API_TOKEN_LAST_USED_FLUSH_INTERVAL, cls.flush, kwargs={"flask_app": flask_app}
+                )
+                cls._timer.daemon = True
+                cls._timer.start()
+
+    @classmethod
+    def flush(cls, flask_app: Flask) -> None:
+        with cls._lock:
+            api_token_ids = list(cls._pending)
+            cls._pending.clear()
+            expired_before = time.monotonic() - 60
+            cls._recorded_at = {
+                api_token_id: recorded_at
+                for api_token_id, recorded_at in cls._recorded_at.items()
+                if recorded_at > expired_before
+            }
+        if not api_token_ids:
+            return
+
+        try:
+            with flask_app.app_context(), Session(db.engine) as session:
+                session.execute(
+                    update(ApiToken).where(ApiToken.id.in_(api_token_ids)).values(last_used_at=naive_utc_now())
+                )
+                session.commit()
+        except Exception:
+            logger.exception("Failed to update last used time of %s API tokens", len(api_token_ids))
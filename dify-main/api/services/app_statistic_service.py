@@ -0,0 +1,225 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import pytz
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+
+from configs import dify_config
+from extensions.ext_database import db
+from libs.datetime_utils import naive_utc_now
+from models.model import AppStatisticHourlyRollup, Message, StatisticRollupWatermark
+
+logger = logging.getLogger(__name__)
+
+
+class AppStatisticService:
+    """
+    Hourly per-app message rollups backing the app statistics endpoints.
+
+    The rollup task aggregates messages into ``app_statistic_hourly_rollups`` one complete hour at
+    a time and records how far it got in a watermark. Statistics queries read the rollups for the
+    hours below the watermark and only scan ``messages`` for the rest of the requested range.
+    """
+
+    WATERMARK_NAME = "app_statistic_hourly_rollups"
+
+    # Hours rolled up in one transaction
+    _ROLLUP_CHUNK_HOURS = 24
+
+    @classmethod
+    def rollup(cls, max_hours: Optional[int] = None) -> Optional[datetime]:
+        """
+        Roll up complete hours after the watermark, at most ``max_hours`` of them.
+
+        Each chunk is aggregated and the watermark is moved in the same transaction, the watermark
+        row is locked so concurrent runs do not roll up the same hours.
+
+        :return: the new watermark, None if there are no messages yet
+        """
+        max_hours = max_hours or dify_config.APP_STATISTIC_ROLLUP_MAX_HOURS_PER_RUN
+        rollup_until = cls._floor_hour(naive_utc_now() - timedelta(minutes=dify_config.APP_STATISTIC_ROLLUP_DELAY))
+
+        rolled_up_to = cls._get_or_create_watermark()
+        if rolled_up_to is None:
+            return None
+        rollup_until = min(rollup_until, rolled_up_to + timedelta(hours=max_hours))
+
+        while rolled_up_to < rollup_until:
+            chunk_end = min(rolled_up_to + timedelta(hours=cls._ROLLUP_CHUNK_HOURS), rollup_until)
+            with db.engine.begin() as conn:
+                locked_to = conn.execute(
+                    sa.select(StatisticRollupWatermark.rolled_up_to)
+                    .where(StatisticRollupWatermark.name == cls.WATERMARK_NAME)
+                    .with_for_update()
+                ).scalar_one()
+                if locked_to != rolled_up_to:
+                    # another run moved the watermark meanwhile
+                    rolled_up_to = locked_to
+                    continue
+                conn.execute(cls._rollup_statement(rolled_up_to, chunk_end))
+                conn.execute(
+                    sa.update(StatisticRollupWatermark)
+                    .where(StatisticRollupWatermark.name == cls.WATERMARK_NAME)
+                    .values(rolled_up_to=chunk_end, updated_at=naive_utc_now())
+                )
+            logger.info("Rolled up app statistics from %s to %s", rolled_up_to, chunk_end)
+            rolled_up_to = chunk_end
+
+        return rolled_up_to
+
+    @classmethod
+    def get_rolled_up_to(cls) -> Optional[datetime]:
+        return db.session.scalar(
+            sa.select(StatisticRollupWatermark.rolled_up_to).where(StatisticRollupWatermark.name == cls.WATERMARK_NAME)
+        )
+
+    @classmethod
+    def message_facts_query(
+        cls,
+        app_id: str,
+        timezone: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        Build a query of the app's messages between ``start`` and ``end`` for daily statistics.
+
+        Rows have the columns created_at, message_count, message_tokens, answer_tokens, total_price
+        and provider_response_latency. Rolled up hours are one row per hour with the hour's totals,
+        every other message is one row of its own, so statistics sum the columns grouped by day.
+
+        :param app_id: app id
+        :param timezone: timezone the statistics are grouped by day in
+        :param start: start of the range in UTC, inclusive
+        :param end: end of the range in UTC, exclusive
+        :return: the SQL query and its parameters
+        """
+        messages_sql = """SELECT
+            created_at,
+            1 AS message_count,
+            message_tokens,
+            answer_tokens,
+            total_price,
+            provider_response_latency
+        FROM
+            messages
+        WHERE
+            app_id = :app_id"""
+        args: dict[str, Any] = {"app_id": app_id}
+        if start:
+            messages_sql += " AND created_at >= :start"
+            args["start"] = start
+        if end:
+            messages_sql += " AND created_at < :end"
+            args["end"] = end
+
+        rollup_range = cls._get_rollup_range(timezone, start, end)
+        if rollup_range is None:
+            return messages_sql, args
+
+        args["rollup_from"], args["rollup_to"] = rollup_range
+        rollups_sql = """SELECT
+            hour AS created_at,
+            message_count,
+            message_tokens,
+            answer_tokens,
+            total_price,
+            provider_response_latency
+        FROM
+            app_statistic_hourly_rollups
+        WHERE
+            app_id = :app_id AND hour >= :rollup_from AND hour < :rollup_to"""
+        messages_sql += " AND (created_at < :rollup_from OR created_at >= :rollup_to)"
+        return f"{rollups_sql}\n        UNION ALL\n        {messages_sql}", args
+
+    @classmethod
+    def _get_rollup_range(
+        cls, timezone: str, start: Optional[datetime], end: Optional[datetime]
+    ) -> Optional[tuple[datetime, datetime]]:
+        """Whole UTC hours of the range that can be read from the rollups."""
+        # days of timezones with a partial hour offset do not start at a UTC hour
+        utc_offset = pytz.timezone(timezone).utcoffset(datetime.now())
+        if utc_offset is None or utc_offset.total_seconds() % 3600:
+            return None
+
+        rolled_up_to = cls.get_rolled_up_to()
+        if rolled_up_to is None:
+            return None
+
+        rollup_from = datetime.min
+        if start:
+            start = cls._to_naive_utc(start)
+            rollup_from = cls._floor_hour(start)
+            if rollup_from < start:
+                rollup_from += timedelta(hours=1)
+        rollup_to = rolled_up_to
+        if end:
+            rollup_to = min(rollup_to, cls._floor_hour(cls._to_naive_utc(end)))
+        if rollup_from >= rollup_to:
+            return None
+        return rollup_from, rollup_to
+
+    @classmethod
+    def _get_or_create_watermark(cls) -> Optional[datetime]:
+        rolled_up_to = cls.get_rolled_up_to()
+        if rolled_up_to is not None:
+            return rolled_up_to
+
+        # start from the hour of the first message
+        first_message_at = db.session.scalar(sa.select(sa.func.min(Message.created_at)))
+        if first_message_at is None:
+            return None
+        stmt = (
+            insert(StatisticRollupWatermark)
+            .values(name=cls.WATERMARK_NAME, rolled_up_to=cls._floor_hour(first_message_at))
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+        return cls.get_rolled_up_to()
+
+    @staticmethod
+    def _rollup_statement(rollup_from: datetime, rollup_to: datetime):
+        hour = sa.func.date_trunc("hour", Message.created_at)
+        select_stmt = (
+            sa.select(
+                Message.app_id,
+                hour,
+                sa.func.count(),
+                sa.func.coalesce(sa.func.sum(Message.message_tokens), 0),
+                sa.func.coalesce(sa.func.sum(Message.answer_tokens), 0),
+                sa.func.sum(Message.total_price),
+                sa.func.coalesce(sa.func.sum(Message.provider_response_latency), 0),
+                sa.func.current_timestamp(),
+            )
+            .where(Message.created_at >= rollup_from, Message.created_at < rollup_to)
+            .group_by(Message.app_id, hour)
+        )
+        columns = [
+            "app_id",
+            "hour",
+            "message_count",
+            "message_tokens",
+            "answer_tokens",
+            "total_price",
+            "provider_response_latency",
+            "updated_at",
+        ]
+        stmt = insert(AppStatisticHourlyRollup).from_select(columns, select_stmt)
+        # hours are rolled up again when a run is retried after the watermark was moved back
+        return stmt.on_conflict_do_update(
+            index_elements=["app_id", "hour"],
+            set_={column: stmt.excluded[column] for column in columns if column not in {"app_id", "hour"}},
+        )
+
+    @staticmethod
+    def _floor_hour(value: datetime) -> datetime:
+        return value.replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _to_naive_utc(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(pytz.utc).replace(tzinfo=None)
@@ -0,0 +1,177 @@
+import logging
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import sqlalchemy as sa
+from sqlalchemy import Row
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import InstrumentedAttribute
+
+from extensions.ext_database import db
+from models.model import (
+    MessageAgentThought,
+    MessageAnnotation,
+    MessageChain,
+    MessageFeedback,
+    MessageFile,
+)
+from models.web import SavedMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PurgeCascade:
+    """
+    A table whose rows reference the purged rows and are deleted with them.
+
+    ``column`` is the column of ``model`` that holds the id of the parent row, ``children`` are
+    tables that reference ``model`` in turn and are deleted before it.
+    """
+
+    model: Any
+    column: str
+    children: tuple["PurgeCascade", ...] = ()
+
+
+@dataclass
+class PurgeStats:
+    name: str
+    batches: int = 0
+    # Key: table name, Value: number of deleted rows
+    deleted: dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def total_deleted(self) -> int:
+        return sum(self.deleted.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total_deleted / self.elapsed if self.elapsed > 0 else 0.0
+
+
+# Tables that reference messages, deleted together with the messages
+MESSAGE_PURGE_CASCADES = (
+    PurgeCascade(MessageFeedback, "message_id"),
+    PurgeCascade(MessageAnnotation, "message_id"),
+    PurgeCascade(MessageChain, "message_id"),
+    PurgeCascade(MessageAgentThought, "message_id"),
+    PurgeCascade(MessageFile, "message_id"),
+    PurgeCascade(SavedMessage, "message_id"),
+)
+
+
+class BulkPurgeService:
+    """
+    Deletes large numbers of rows in set-wise batches.
+
+    Ids of the rows to delete are read with keyset pagination on the primary key, and every batch
+    is deleted in its own short transaction with one ``DELETE ... WHERE id = ANY(:ids)`` per table,
+    dependent tables first. Locks are only held for the duration of one batch, and progress and
+    throughput are logged after every batch.
+    """
+
+    def __init__(self, batch_size: int = 1000, engine: Optional[Engine] = None):
+        self._batch_size = batch_size
+        self._engine = engine
+
+    def purge(
+        self,
+        model: Any,
+        *where: sa.ColumnElement[bool],
+        cascades: Sequence[PurgeCascade] = (),
+        columns: Sequence[sa.ColumnElement[Any] | InstrumentedAttribute[Any]] = (),
+        select_ids: Optional[Callable[[Sequence[Row[Any]]], list[str]]] = None,
+        name: Optional[str] = None,
+    ) -> PurgeStats:
+        """
+        Delete every row of ``model`` matching ``where`` together with its dependent rows.
+
+        :param model: model of the purged table, its primary key must be ``id``
+        :param where: conditions selecting the rows to purge
+        :param cascades: dependent tables deleted with the purged rows
+        :param columns: extra columns read with the ids and passed to ``select_ids``
+        :param select_ids: picks the ids to delete from a batch of rows, every row is deleted if not given
+        :param name: name used in logs, defaults to the table name
+        """
+        table = model.__table__
+        stats = PurgeStats(name=name or table.name)
+        start_at = time.perf_counter()
+        last_id = None
+        while True:
+            stmt = sa.select(table.c.id, *columns).where(*where).order_by(table.c.id).limit(self._batch_size)
+            if last_id is not None:
+                stmt = stmt.where(table.c.id > last_id)
+            with self._get_engine().connect() as conn:
+                rows = conn.execute(stmt).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            ids = select_ids(rows) if select_ids is not None else [row.id for row in rows]
+            if ids:
+                for table_name, count in self.purge_ids(model, ids, cascades).items():
+                    stats.deleted[table_name] = stats.deleted.get(table_name, 0) + count
+            stats.batches += 1
+            stats.elapsed = time.perf_counter() - start_at
+            logger.info(
+                "Purging %s: %s rows deleted in %s batches, %.0f rows/s",
+                stats.name,
+                stats.total_deleted,
+                stats.batches,
+                stats.rows_per_second,
+            )
+
+        stats.elapsed = time.perf_counter() - start_at
+        return stats
+
+    def purge_ids(self, model: Any, ids: Sequence[str], cascades: Sequence[PurgeCascade] = ()) -> dict[str, int]:
+        """
+        Delete the rows of ``model`` with the given ids and their dependent rows in one transaction.
+
+        :return: number of deleted rows per table
+        """
+        deleted: dict[str, int] = {}
+        with self._get_engine().begin() as conn:
+            self._delete_cascades(conn, cascades, ids, deleted)
+            self._delete(conn, model, "id", ids, deleted)
+        return deleted
+
+    def _delete_cascades(
+        self, conn: Connection, cascades: Sequence[PurgeCascade], parent_ids: Sequence[str], deleted: dict[str, int]
+    ):
+        for cascade in cascades:
+            if not cascade.children:
+                self._delete(conn, cascade.model, cascade.column, parent_ids, deleted)
+                continue
+
+            table = cascade.model.__table__
+            child_ids = [
+                row.id
+                for row in conn.execute(
+                    sa.select(table.c.id).where(self._any(table.c[cascade.column], parent_ids))
+                ).all()
+            ]
+            for i in range(0, len(child_ids), self._batch_size):
+                batch_ids = child_ids[i : i + self._batch_size]
+                self._delete_cascades(conn, cascade.children, batch_ids, deleted)
+                self._delete(conn, cascade.model, "id", batch_ids, deleted)
+
+    def _delete(self, conn: Connection, model: Any, column: str, ids: Sequence[str], deleted: dict[str, int]):
+        table = model.__table__
+        result = conn.execute(sa.delete(table).where(self._any(table.c[column], ids)))
+        deleted[table.name] = deleted.get(table.name, 0) + result.rowcount
+
+    @staticmethod
+    def _any(column: sa.Column, ids: Sequence[str]) -> sa.ColumnElement[bool]:
+        # a single array parameter keeps the statement the same for every batch size
+        return column == sa.any_(
+            sa.cast(sa.bindparam("ids", list(ids), type_=postgresql.ARRAY(sa.String)), postgresql.ARRAY(column.type))
+        )
+
+    def _get_engine(self) -> Engine:
+        return self._engine or db.engine
@@ -0,0 +1,135 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from datetime import UTC, datetime
+from typing import Any, Optional
+
+from flask import Flask, current_app
+from sqlalchemy import insert
+
+from configs import dify_config
+from extensions.ext_database import db
+from models.custom_logs import DifyLogs
+
+logger = logging.getLogger(__name__)
+
+
+class ChatLogWriter:
+    """
+    Writes chat interaction logs from a background thread in batches.
+
+    Requests put rows into a bounded in-process queue instead of committing them on the request
+    thread. When the queue is full a request waits at most ``enqueue_timeout`` seconds for room,
+    then drops the row and counts it in ``dropped_count``. Queued rows are flushed on shutdown.
+    """
+
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval: float, enqueue_timeout: float):
+        self._max_queue_size = max_queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._enqueue_timeout = enqueue_timeout
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopped = threading.Event()
+        self._flask_app: Optional[Flask] = None
+        self._dropped_count = 0
+        atexit.register(self.shutdown)
+
+    @property
+    def dropped_count(self) -> int:
+        """Number of rows dropped because the queue was full or the insert failed."""
+        return self._dropped_count
+
+    def init_app(self, app: Flask):
+        self._flask_app = app
+
+    def enqueue(self, row: dict[str, Any]) -> bool:
+        """
+        Queue a ``DifyLogs`` row for writing.
+
+        :param row: column values of the row
+        :return: False if the row was dropped
+        """
+        # stamp the row now, it may be written seconds later
+        row = {"created_at": datetime.now(UTC), **row}
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=self._enqueue_timeout)
+        except queue.Full:
+            self._record_dropped(1, "chat log queue is full")
+            return False
+        return True
+
+    def shutdown(self, timeout: float = 10.0):
+        """Stop the writer thread after it has written every queued row."""
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout=timeout)
+
+    def _ensure_started(self):
+        if self._flask_app is None:
+            self._flask_app = current_app._get_current_object()  # type: ignore
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # rows queued before a fork belong to the parent process, which writes them itself
+                self._queue = queue.Queue(maxsize=self._max_queue_size)
+            self._stopped.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="chat_log_writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            rows = self._collect_batch()
+            if rows:
+                self._write(rows)
+            elif self._stopped.is_set():
+                return
+
+    def _collect_batch(self) -> list[dict[str, Any]]:
+        try:
+            rows = [self._queue.get(timeout=self._flush_interval)]
+        except queue.Empty:
+            return []
+        while len(rows) < self._batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write(self, rows: list[dict[str, Any]]):
+        assert self._flask_app is not None
+        with self._flask_app.app_context():
+            try:
+                db.session.execute(insert(DifyLogs), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Failed to write %s chat logs", len(rows))
+                self._record_dropped(len(rows), "chat log insert failed")
+
+    def _record_dropped(self, count: int, reason: str):
+        with self._lock:
+            previous = self._dropped_count
+            self._dropped_count += count
+        # warn on the first drop and then once per thousand, a full queue drops on every request
+        if previous == 0 or previous // 1000 != self._dropped_count // 1000:
+            logger.warning("Dropped chat logs (%s), %s dropped so far", reason, self._dropped_count)
+
+
+chat_log_writer = ChatLogWriter(
+    max_queue_size=dify_config.CHAT_LOG_QUEUE_MAX_SIZE,
+    batch_size=dify_config.CHAT_LOG_BATCH_SIZE,
+    flush_interval=dify_config.CHAT_LOG_FLUSH_INTERVAL,
+    enqueue_timeout=dify_config.CHAT_LOG_ENQUEUE_TIMEOUT,
+)
@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any
 
 from models.custom_logs import DifyLogs, ErrorLog
 from extensions.ext_database import db
+from services.chat_log_writer import chat_log_writer
 
 
 class LoggingService:
@@ -23,37 +24,27 @@ class LoggingService:
                            latency_ms: int = None,
                            status_code: int = 200,
                            dialog_count: int = None,
-                           work_run_id: str = None,
+                           work_run_id: Optional[str] = None,
                            status: str = "success",
                            template: str = None,
                            bot_name: str = None) -> bool:
         """
-        Ghi lịch sử chat vào database
+        Đưa lịch sử chat vào hàng đợi, ChatLogWriter ghi vào database theo lô
         """
-        try:
-            log_entry = DifyLogs(
-                app_id=app_id,
-                conversation_id=conversation_id,
-                user_id=user_id,
-                input_text=input_text,
-                output_text=output_text,
-                latency_ms=latency_ms,
-                status_code=status_code,
-                dialog_count=dialog_count,
-                work_run_id=work_run_id,
-                status=status,
-                template=template,
-                Bot=bot_name
-            )
-            
-            db.session.add(log_entry)
-            db.session.commit()
-            return True
-            
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error logging chat interaction: {e}")
-            return False
+        return chat_log_writer.enqueue({
+            'app_id': app_id,
+            'conversation_id': conversation_id,
+            'user_id': user_id,
+            'input_text': input_text,
+            'output_text': output_text,
+            'latency_ms': latency_ms,
+            'status_code': status_code,
+            'dialog_count': dialog_count,
+            'work_run_id': work_run_id,
+            'status': status,
+            'template': template,
+            'Bot': bot_name,
+        })
     
     def log_error(self, 
                   type_error: str,
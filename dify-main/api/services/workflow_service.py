@@ -421,6 +421,8 @@ class WorkflowService:
             triggered_from=WorkflowNodeExecutionTriggeredFrom.SINGLE_STEP,
         )
         repository.save(node_execution)
+        # the execution is read back below, a buffering repository must write it first
+        repository.flush()
 
         workflow_node_execution = self._node_execution_service_repo.get_execution_by_id(node_execution.id)
         if workflow_node_execution is None:
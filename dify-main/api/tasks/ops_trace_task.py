@@ -1,11 +1,13 @@
 import json
 import logging
+from collections import defaultdict
+from typing import Any
 
 from celery import shared_task  # type: ignore
 from flask import current_app
 
 from core.ops.entities.config_entity import OPS_FILE_PATH, OPS_TRACE_FAILED_KEY
-from core.ops.entities.trace_entity import trace_info_info_map
+from core.ops.entities.trace_entity import BaseTraceInfo, trace_info_info_map
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
@@ -13,6 +15,20 @@ from models.model import Message
 from models.workflow import WorkflowRun
 
 
+def _build_trace_info(trace_info_type: str, trace_info: dict[str, Any]) -> Any:
+    if trace_info.get("message_data"):
+        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
+    if trace_info.get("workflow_data"):
+        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
+    if trace_info.get("documents"):
+        trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
+
+    trace_type = trace_info_info_map.get(trace_info_type)
+    if trace_type:
+        return trace_type(**trace_info)
+    return trace_info
+
+
 @shared_task(queue="ops_trace")
 def process_trace_tasks(file_info):
     """
@@ -29,20 +45,10 @@ def process_trace_tasks(file_info):
     trace_info_type = file_data.get("trace_info_type")
     trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
 
-    if trace_info.get("message_data"):
-        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
-    if trace_info.get("workflow_data"):
-        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
-    if trace_info.get("documents"):
-        trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
-
     try:
         if trace_instance:
             with current_app.app_context():
-                trace_type = trace_info_info_map.get(trace_info_type)
-                if trace_type:
-                    trace_info = trace_type(**trace_info)
-                trace_instance.trace(trace_info)
+                trace_instance.trace(_build_trace_info(trace_info_type, trace_info))
         logging.info("Processing trace tasks success, app_id: %s", app_id)
     except Exception as e:
         logging.info("error:\n\n\n%s\n\n\n\n", e)
@@ -51,3 +57,44 @@ def process_trace_tasks(file_info):
         logging.info("Processing trace tasks failed, app_id: %s", app_id)
     finally:
         storage.delete(file_path)
+
+
+@shared_task(queue="ops_trace")
+def process_trace_tasks_batch(batch_info):
+    """
+    Async process a batch of trace tasks, sent inline or stored as one file
+    Usage: process_trace_tasks_batch.delay({"traces": [...]}) or process_trace_tasks_batch.delay({"file_id": ...})
+
+    Traces are grouped per app, each app has its own tracing provider instance and traces its group
+    with one trace_batch call.
+    """
+    from core.ops.ops_trace_manager import OpsTraceManager
+
+    file_path = None
+    if batch_info.get("file_id"):
+        file_path = f"{OPS_FILE_PATH}batch/{batch_info['file_id']}.json"
+        traces = json.loads(storage.load(file_path))
+    else:
+        traces = batch_info.get("traces") or []
+
+    try:
+        traces_by_app: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for trace in traces:
+            traces_by_app[trace["app_id"]].append(trace)
+
+        for app_id, app_traces in traces_by_app.items():
+            try:
+                trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
+                if trace_instance:
+                    with current_app.app_context():
+                        trace_infos: list[BaseTraceInfo] = [
+                            _build_trace_info(trace["trace_info_type"], trace["trace_info"]) for trace in app_traces
+                        ]
+                        trace_instance.trace_batch(trace_infos)
+                logging.info("Processing %s trace tasks success, app_id: %s", len(app_traces), app_id)
+            except Exception:
+                logging.exception("Processing %s trace tasks failed, app_id: %s", len(app_traces), app_id)
+                redis_client.incr(f"{OPS_TRACE_FAILED_KEY}_{app_id}")
+    finally:
+        if file_path:
+            storage.delete(file_path)
@@ -56,6 +56,9 @@ MOCK_SWITCH = os.getenv("MOCK_SWITCH", "false").lower() == "true"
 def setup_http_mock(request, monkeypatch: MonkeyPatch):
     if MOCK_SWITCH:
         monkeypatch.setattr(requests, "request", MockedHttp.requests_request)
+        monkeypatch.setattr(
+            requests.Session, "request", lambda _, method, url, **kwargs: MockedHttp.requests_request(method, url)
+        )
 
         def unpatch():
             monkeypatch.undo()
@@ -0,0 +1,123 @@
+import time
+from threading import Thread
+from unittest.mock import patch
+
+import pytest
+
+from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom, _stop_signal_subscriber
+from core.app.apps.exc import GenerateTaskStoppedError
+from core.app.apps.workflow.app_queue_manager import WorkflowAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueueLLMChunkEvent, QueuePingEvent, QueueStopEvent, QueueTextChunkEvent
+from core.model_runtime.entities.llm_entities import LLMResultChunk, LLMResultChunkDelta, LLMUsage
+from core.model_runtime.entities.message_entities import AssistantPromptMessage
+from extensions.ext_redis import redis_client
+
+
+@pytest.fixture
+def queue_manager():
+    # the subscriber thread is not started, stop signals are delivered by calling the subscriber directly
+    with patch("core.app.apps.base_app_queue_manager.threading.Thread"):
+        yield WorkflowAppQueueManager(
+            task_id="task-id", user_id="user-id", invoke_from=InvokeFrom.WEB_APP, app_mode="workflow"
+        )
+
+
+def test_stop_signal_ends_listening(queue_manager):
+    queue_manager.publish(QueuePingEvent(), PublishFrom.APPLICATION_MANAGER)
+
+    _stop_signal_subscriber._stop("task-id")
+
+    events = [message.event for message in queue_manager.listen()]
+    assert isinstance(events[0], QueuePingEvent)
+    assert isinstance(events[1], QueueStopEvent)
+    with pytest.raises(GenerateTaskStoppedError):
+        queue_manager.publish(QueuePingEvent(), PublishFrom.APPLICATION_MANAGER)
+    redis_client.get.assert_not_called()
+
+
+def test_stop_flags_are_checked_when_subscribing(queue_manager):
+    with patch.object(redis_client, "mget", return_value=[b"1"]) as mget:
+        _stop_signal_subscriber._check_stop_flags()
+
+    assert queue_manager._is_stopped()
+    mget.assert_called_once_with([AppQueueManager._generate_stopped_cache_key("task-id")])
+
+
+def test_set_stop_flag_publishes_stop_signal():
+    with patch.object(redis_client, "get", return_value=b"end-user-user-id"):
+        AppQueueManager.set_stop_flag("task-id", InvokeFrom.WEB_APP, "user-id")
+
+    redis_client.setex.assert_called_with(AppQueueManager._generate_stopped_cache_key("task-id"), 600, 1)
+    redis_client.publish.assert_called_once_with("generate_task_stopped", "task-id")
+
+
+def _listen_events(queue_manager):
+    queue_manager.stop_listen()
+    return [message.event for message in queue_manager.listen()]
+
+
+def test_consecutive_text_chunks_are_merged(queue_manager):
+    for text in ["Hello", ", ", "world"]:
+        queue_manager.publish(QueueTextChunkEvent(text=text), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(QueuePingEvent(), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(QueueTextChunkEvent(text="!"), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(
+        QueueTextChunkEvent(text="?", from_variable_selector=["llm", "text"]), PublishFrom.APPLICATION_MANAGER
+    )
+
+    events = _listen_events(queue_manager)
+
+    assert [type(event) for event in events] == [
+        QueueTextChunkEvent,
+        QueuePingEvent,
+        QueueTextChunkEvent,
+        QueueTextChunkEvent,
+    ]
+    assert [events[0].text, events[2].text, events[3].text] == ["Hello, world", "!", "?"]
+
+
+def test_text_chunks_are_merged_up_to_max_length(queue_manager):
+    for text in ["ab", "cd", "ef"]:
+        queue_manager.publish(QueueTextChunkEvent(text=text), PublishFrom.APPLICATION_MANAGER)
+
+    with patch("core.app.apps.base_app_queue_manager.dify_config.APP_STREAM_CHUNK_COALESCE_MAX_LENGTH", 3):
+        events = _listen_events(queue_manager)
+
+    assert [event.text for event in events] == ["abcd", "ef"]
+
+
+def test_text_chunks_are_merged_within_window_of_steady_producer(queue_manager):
+    texts = [str(i % 10) for i in range(30)]
+
+    def produce():
+        for text in texts:
+            queue_manager.publish(QueueTextChunkEvent(text=text), PublishFrom.APPLICATION_MANAGER)
+            time.sleep(0.005)
+        queue_manager.stop_listen()
+
+    # the thread class is imported before the fixture patches it
+    producer = Thread(target=produce)
+    with patch("core.app.apps.base_app_queue_manager.dify_config.APP_STREAM_CHUNK_COALESCE_WINDOW", 0.02):
+        producer.start()
+        events = [message.event for message in queue_manager.listen()]
+    producer.join()
+
+    # chunks arriving faster than the window are still sent once the window since the merge started has passed
+    assert len(events) > 2
+    assert "".join(event.text for event in events) == "".join(texts)
+
+
+def test_llm_chunks_are_merged_until_last_chunk(queue_manager):
+    def llm_chunk(content, usage=None):
+        delta = LLMResultChunkDelta(index=0, message=AssistantPromptMessage(content=content), usage=usage)
+        return QueueLLMChunkEvent(chunk=LLMResultChunk(model="gpt-4o", delta=delta))
+
+    queue_manager.publish(llm_chunk("Hello"), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(llm_chunk(" world", usage=LLMUsage.empty_usage()), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(llm_chunk("!"), PublishFrom.APPLICATION_MANAGER)
+
+    events = _listen_events(queue_manager)
+
+    assert [event.chunk.delta.message.content for event in events] == ["Hello world", "!"]
+    assert events[0].chunk.delta.usage is not None
@@ -0,0 +1,67 @@
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+
+CODE = """
+def main(a: int, b: int) -> dict:
+    return {"result": a / b}
+"""
+
+
+def local_sandbox(language: CodeLanguage, preload: str, code: str) -> str:
+    """Stand-in for the code execution service running Python scripts in a subprocess."""
+    assert language == CodeLanguage.PYTHON3
+    completed = subprocess.run([sys.executable, "-c", f"{preload}\n{code}"], capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise CodeExecutionError(completed.stderr)
+    return completed.stdout
+
+
+def test_batch_executes_code_for_each_input_in_one_request():
+    inputs_list = [{"a": 1, "b": 2}, {"a": 1, "b": 0}, {"a": 9, "b": 3}]
+
+    with patch.object(CodeExecutor, "execute_code", side_effect=local_sandbox) as execute_code:
+        results = CodeExecutor.execute_workflow_code_template_batch(CodeLanguage.PYTHON3, CODE, inputs_list)
+
+    assert results == [{"result": 0.5}, None, {"result": 3.0}]
+    assert execute_code.call_count == 1
+
+
+def test_batch_results_match_single_executions():
+    inputs_list = [{"a": 1, "b": 4}, {"a": 3, "b": 4}]
+
+    with patch.object(CodeExecutor, "execute_code", side_effect=local_sandbox):
+        batch_results = CodeExecutor.execute_workflow_code_template_batch(CodeLanguage.PYTHON3, CODE, inputs_list)
+        single_results = [
+            CodeExecutor.execute_workflow_code_template(CodeLanguage.PYTHON3, CODE, inputs) for inputs in inputs_list
+        ]
+
+    assert batch_results == single_results
+
+
+def test_batch_is_split_by_batch_size():
+    inputs_list = [{"a": i, "b": 1} for i in range(5)]
+
+    with (
+        patch("core.helper.code_executor.code_executor.dify_config.CODE_EXECUTION_BATCH_SIZE", 2),
+        patch.object(CodeExecutor, "execute_code", side_effect=local_sandbox) as execute_code,
+    ):
+        results = CodeExecutor.execute_workflow_code_template_batch(CodeLanguage.PYTHON3, CODE, inputs_list)
+
+    assert [result["result"] for result in results] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert execute_code.call_count == 3
+
+
+def test_batch_raises_when_code_does_not_run():
+    with patch.object(CodeExecutor, "execute_code", side_effect=local_sandbox):
+        with pytest.raises(CodeExecutionError):
+            CodeExecutor.execute_workflow_code_template_batch(CodeLanguage.PYTHON3, "def main(:", [{}])
+
+
+def test_batch_rejects_unsupported_language():
+    with pytest.raises(CodeExecutionError):
+        CodeExecutor.execute_workflow_code_template_batch(CodeLanguage.JINJA2, "{{ a }}", [{"a": 1}])
@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+import pytest
+from jinja2.sandbox import SecurityError
+
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+from core.helper.code_executor.jinja2.jinja2_renderer import Jinja2Renderer, Jinja2RenderError
+
+
+def test_render():
+    template = "Hello {{ name }}!{% for item in items %} {{ item.id }}{% endfor %}"
+
+    result = Jinja2Renderer.render(template, {"name": "Dify", "items": [{"id": 1}, {"id": 2}]})
+
+    assert result == "Hello Dify! 1 2"
+
+
+def test_compiled_template_is_cached():
+    Jinja2Renderer.render("{{ a }}", {"a": 1})
+
+    with patch.object(Jinja2Renderer._environment, "from_string") as from_string:
+        assert Jinja2Renderer.render("{{ a }}", {"a": 2}) == "2"
+
+    from_string.assert_not_called()
+
+
+def test_unsafe_template_raises_security_error():
+    with pytest.raises(SecurityError):
+        Jinja2Renderer.render("{% set _ = items.append(3) %}{{ items }}", {"items": [1, 2]})
+
+
+def test_recursion_is_limited():
+    template = "{% macro f(n) %}{{ f(n + 1) }}{% endmacro %}{{ f(0) }}"
+
+    with pytest.raises(Jinja2RenderError, match="call depth"):
+        Jinja2Renderer.render(template, {})
+
+
+def test_output_length_is_limited():
+    with patch("core.helper.code_executor.jinja2.jinja2_renderer.dify_config.JINJA2_RENDER_MAX_OUTPUT_LENGTH", 100):
+        with pytest.raises(Jinja2RenderError, match="Output length"):
+            Jinja2Renderer.render("{% for i in range(1000) %}{{ i }}{% endfor %}", {})
+        with pytest.raises(Jinja2RenderError, match="Repeated sequence"):
+            Jinja2Renderer.render("{{ 'a' * 1000 }}", {})
+
+
+def test_operations_are_limited():
+    with patch("core.helper.code_executor.jinja2.jinja2_renderer.dify_config.JINJA2_RENDER_MAX_OPERATIONS", 100):
+        assert Jinja2Renderer.render("{% for i in items %}{{ i }}{% endfor %}", {"items": list(range(50))})
+        with pytest.raises(Jinja2RenderError, match="operations"):
+            Jinja2Renderer.render(
+                "{% for i in items %}{% for j in items %}{% endfor %}{% endfor %}", {"items": list(range(50))}
+            )
+        with pytest.raises(Jinja2RenderError, match="operations"):
+            Jinja2Renderer.render(
+                "{% macro f() %}{% endmacro %}{{ f() * 0 }}{% for _ in range(10) %}{{ f() }}{% endfor %}" * 10, {}
+            )
+
+
+def test_operations_are_counted_per_render():
+    with patch("core.helper.code_executor.jinja2.jinja2_renderer.dify_config.JINJA2_RENDER_MAX_OPERATIONS", 100):
+        for _ in range(3):
+            assert Jinja2Renderer.render("{% for i in range(90) %}{% endfor %}done", {}) == "done"
+
+
+def test_code_executor_renders_in_process():
+    with patch.object(CodeExecutor, "execute_code") as execute_code:
+        result = CodeExecutor.execute_workflow_code_template(CodeLanguage.JINJA2, "{{ a + b }}", {"a": 1, "b": 2})
+
+    assert result == {"result": "3"}
+    execute_code.assert_not_called()
+
+
+def test_code_executor_falls_back_to_code_execution_service():
+    with patch.object(CodeExecutor, "execute_code", return_value="<<RESULT>>[1, 2, 3]<<RESULT>>\n") as execute_code:
+        result = CodeExecutor.execute_workflow_code_template(
+            CodeLanguage.JINJA2, "{% set _ = items.append(3) %}{{ items }}", {"items": [1, 2]}
+        )
+        assert CodeExecutor.execute_workflow_code_template(CodeLanguage.JINJA2, "{{ '\\n' }}", {})
+
+    assert result == {"result": "[1, 2, 3]"}
+    assert execute_code.call_count == 2
+
+
+def test_code_executor_raises_render_errors():
+    with patch.object(CodeExecutor, "execute_code") as execute_code:
+        with pytest.raises(CodeExecutionError):
+            CodeExecutor.execute_workflow_code_template(CodeLanguage.JINJA2, "{{ a ", {})
+
+    execute_code.assert_not_called()
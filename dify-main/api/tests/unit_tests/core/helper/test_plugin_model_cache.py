@@ -0,0 +1,171 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper.plugin_model_cache import PluginModelCache
+from core.model_runtime.entities.common_entities import I18nObject
+from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom, ModelFeature, ModelType
+from core.model_runtime.entities.provider_entities import ConfigurateMethod, ProviderEntity
+from core.plugin.entities.plugin_daemon import PluginModelProviderEntity
+
+
+class FakeRedis:
+    """In-memory stand-in for the string and sorted set commands the cache uses."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.recent: dict[str, float] = {}
+
+    def get(self, name):
+        return self.values.get(name)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def setex(self, name, time, value):
+        self.values[name] = value.encode() if isinstance(value, str) else value
+
+    def ttl(self, name):
+        return 60
+
+    def incr(self, name):
+        self.values[name] = str(int(self.values.get(name, 0)) + 1).encode()
+
+    def zrevrange(self, name, start, end):
+        keys = sorted(self.recent, key=self.recent.get, reverse=True)
+        return [key.encode() for key in keys[start : end + 1]]
+
+    def pipeline(self, transaction=True):
+        pipeline = MagicMock()
+        pipeline.zadd.side_effect = lambda name, mapping: self.recent.update(mapping)
+        return pipeline
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch("core.helper.plugin_model_cache.redis_client", redis):
+        yield redis
+
+
+def _schema(model: str) -> AIModelEntity:
+    return AIModelEntity(
+        model=model,
+        label=I18nObject(en_US=model),
+        model_type=ModelType.LLM,
+        fetch_from=FetchFrom.PREDEFINED_MODEL,
+        model_properties={},
+    )
+
+
+def _provider(plugin_unique_identifier: str = "langgenius/openai:0.0.1@hash") -> PluginModelProviderEntity:
+    now = datetime.now()
+    return PluginModelProviderEntity(
+        id="id",
+        created_at=now,
+        updated_at=now,
+        provider="openai",
+        tenant_id="tenant",
+        plugin_unique_identifier=plugin_unique_identifier,
+        plugin_id="langgenius/openai",
+        declaration=ProviderEntity(
+            provider="langgenius/openai/openai",
+            label=I18nObject(en_US="OpenAI"),
+            supported_model_types=[ModelType.LLM],
+            configurate_methods=[ConfigurateMethod.PREDEFINED_MODEL, ConfigurateMethod.CUSTOMIZABLE_MODEL],
+            models=[_schema("gpt-4o")],
+        ),
+    )
+
+
+def test_model_schemas_are_shared_between_processes(fake_redis):
+    fetch = MagicMock(return_value=_schema("gpt-4o"))
+
+    first = PluginModelCache(max_size=8).get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {}, fetch)
+    second = PluginModelCache(max_size=8).get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {}, fetch)
+
+    assert second == first
+    assert fetch.call_count == 1
+
+
+def test_modified_model_schemas_do_not_change_cached_ones(fake_redis):
+    cache = PluginModelCache(max_size=8)
+    schema = _schema("gpt-4o")
+    schema.features = [ModelFeature.VISION, ModelFeature.TOOL_CALL]
+    fetch = MagicMock(return_value=schema)
+
+    for _ in range(2):
+        fetched = cache.get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {}, fetch)
+        assert fetched is not None
+        assert fetched.features == [ModelFeature.VISION, ModelFeature.TOOL_CALL]
+        fetched.features.remove(ModelFeature.TOOL_CALL)
+
+    assert fetch.call_count == 1
+
+
+def test_model_schema_keys(fake_redis):
+    cache = PluginModelCache(max_size=8)
+    fetch = MagicMock(side_effect=lambda: _schema("model"))
+
+    # predefined models do not depend on the credentials
+    cache.get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {"api_key": "a"}, fetch)
+    cache.get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {"api_key": "b"}, fetch)
+    assert fetch.call_count == 1
+
+    cache.get_model_schema("tenant", _provider(), ModelType.LLM, "custom", {"api_key": "a"}, fetch)
+    cache.get_model_schema("tenant", _provider(), ModelType.LLM, "custom", {"api_key": "b"}, fetch)
+    assert fetch.call_count == 3
+
+    cache.get_model_schema("tenant", _provider("langgenius/openai:0.0.2@hash"), ModelType.LLM, "gpt-4o", {}, fetch)
+    assert fetch.call_count == 4
+    assert not any("api_key" in key for key in fake_redis.values)
+
+
+def test_missing_model_schemas_are_not_cached(fake_redis):
+    cache = PluginModelCache(max_size=8)
+    fetch = MagicMock(return_value=None)
+
+    assert cache.get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {}, fetch) is None
+    assert cache.get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {}, fetch) is None
+    assert fetch.call_count == 2
+
+
+def test_warm_up_loads_recent_model_schemas(fake_redis):
+    fetch = MagicMock(side_effect=lambda: _schema("model"))
+    PluginModelCache(max_size=8).get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {}, fetch)
+
+    cache = PluginModelCache(max_size=8)
+    assert cache.warm_up() == 1
+    fake_redis.values.clear()
+
+    cache.get_model_schema("tenant", _provider(), ModelType.LLM, "gpt-4o", {}, fetch)
+    assert fetch.call_count == 1
+
+
+def test_model_providers_are_cached_until_invalidated(fake_redis):
+    fetch = MagicMock(side_effect=lambda: [_provider()])
+
+    first = PluginModelCache(max_size=8).get_model_providers("tenant", fetch)
+    second = PluginModelCache(max_size=8).get_model_providers("tenant", fetch)
+    assert second == first
+    assert fetch.call_count == 1
+
+    PluginModelCache.invalidate_model_providers("tenant")
+    PluginModelCache(max_size=8).get_model_providers("tenant", fetch)
+    assert fetch.call_count == 2
+
+    PluginModelCache(max_size=8).get_model_providers("tenant", fetch, refresh=True)
+    assert fetch.call_count == 3
+
+
+def test_cache_is_bypassed_when_redis_fails():
+    cache = PluginModelCache(max_size=8)
+    fetch = MagicMock(side_effect=lambda: [_provider()])
+
+    with patch("core.helper.plugin_model_cache.redis_client") as redis_client:
+        redis_client.get.side_effect = ConnectionError
+        cache.get_model_providers("tenant", fetch)
+        cache.get_model_providers("tenant", fetch)
+
+    assert fetch.call_count == 2
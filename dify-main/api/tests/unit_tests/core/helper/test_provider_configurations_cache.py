@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
+
+
+@pytest.fixture
+def redis_client():
+    versions: dict[str, int] = {}
+    with patch("core.helper.provider_configurations_cache.redis_client") as redis_client:
+        redis_client.get.side_effect = lambda key: str(versions[key]).encode() if key in versions else None
+        redis_client.incr.side_effect = lambda key: versions.update({key: versions.get(key, 0) + 1})
+        yield redis_client
+
+
+def test_configurations_are_built_once_per_version(redis_client):
+    cache = ProviderConfigurationsCache(max_size=8)
+    build = MagicMock(side_effect=lambda tenant_id: object())
+
+    first = cache.get("tenant", build)
+    assert cache.get("tenant", build) is first
+    assert build.call_count == 1
+
+    ProviderConfigurationsCache.invalidate("tenant")
+
+    assert cache.get("tenant", build) is not first
+    assert build.call_count == 2
+    cache.get("other", build)
+    assert build.call_count == 3
+
+
+def test_refresh_builds_configurations(redis_client):
+    cache = ProviderConfigurationsCache(max_size=8)
+    build = MagicMock(side_effect=lambda tenant_id: object())
+
+    first = cache.get("tenant", build)
+    refreshed = cache.get("tenant", build, refresh=True)
+
+    assert refreshed is not first
+    assert cache.get("tenant", build) is refreshed
+
+
+def test_configurations_expire(redis_client):
+    cache = ProviderConfigurationsCache(max_size=8)
+    build = MagicMock(side_effect=lambda tenant_id: object())
+
+    with patch("core.helper.provider_configurations_cache.time.monotonic", return_value=0):
+        cache.get("tenant", build)
+    with patch("core.helper.provider_configurations_cache.time.monotonic", return_value=3600):
+        cache.get("tenant", build)
+
+    assert build.call_count == 2
+
+
+def test_configurations_are_not_cached_without_version(redis_client):
+    cache = ProviderConfigurationsCache(max_size=8)
+    build = MagicMock(side_effect=lambda tenant_id: object())
+    redis_client.get.side_effect = ConnectionError
+
+    cache.get("tenant", build)
+    cache.get("tenant", build)
+
+    assert build.call_count == 2
+
+
+def test_cache_can_be_disabled(redis_client):
+    cache = ProviderConfigurationsCache(max_size=8)
+    build = MagicMock(side_effect=lambda tenant_id: object())
+
+    with patch("core.helper.provider_configurations_cache.dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL", 0):
+        cache.get("tenant", build)
+        cache.get("tenant", build)
+
+    assert build.call_count == 2
+    redis_client.get.assert_not_called()
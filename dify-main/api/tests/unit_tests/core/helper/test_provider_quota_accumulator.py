@@ -0,0 +1,170 @@
+import threading
+from collections import defaultdict
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from core.helper.provider_quota_accumulator import ProviderQuotaAccumulator
+
+
+class FakeRedis:
+    """In-memory stand-in for the hash and set commands the accumulator uses."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[bytes, int]] = defaultdict(dict)
+        self.sets: dict[str, set[bytes]] = defaultdict(set)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hincrby(self, name, key, amount):
+        field = key.encode()
+        self.hashes[name][field] = self.hashes[name].get(field, 0) + amount
+        return self.hashes[name][field]
+
+    def hgetall(self, name):
+        return {field: str(value).encode() for field, value in self.hashes[name].items()}
+
+    def expire(self, name, time):
+        return True
+
+    def sadd(self, name, value):
+        self.sets[name].add(value.encode())
+
+    def srem(self, name, value):
+        self.sets[name].discard(value.encode())
+
+    def smembers(self, name):
+        return set(self.sets[name])
+
+    def lock(self, name, timeout=None):
+        return MagicMock()
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._commands]
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch("core.helper.provider_quota_accumulator.redis_client", redis):
+        yield redis
+
+
+@pytest.fixture
+def deduct_in_database():
+    with (
+        patch("core.helper.provider_quota_accumulator.Session"),
+        patch("core.helper.provider_quota_accumulator.db"),
+        patch.object(ProviderQuotaAccumulator, "_deduct_in_database") as deduct_in_database,
+        patch.object(ProviderQuotaAccumulator, "_schedule_flush"),
+    ):
+        yield deduct_in_database
+
+
+def test_deductions_are_coalesced_and_pending(fake_redis, deduct_in_database):
+    ProviderQuotaAccumulator.deduct("tenant", "langgenius/openai/openai", "trial", 100)
+    ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 20)
+    ProviderQuotaAccumulator.deduct("tenant", "anthropic", "paid", 1)
+
+    assert ProviderQuotaAccumulator.get_pending("tenant") == {("openai", "trial"): 120, ("anthropic", "paid"): 1}
+    assert ProviderQuotaAccumulator.get_pending("other") == {}
+    deduct_in_database.assert_not_called()
+
+
+def test_flush_writes_one_update_per_provider(fake_redis, deduct_in_database):
+    ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 100)
+    ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 20)
+
+    ProviderQuotaAccumulator.flush()
+
+    deduct_in_database.assert_called_once()
+    assert deduct_in_database.call_args.args[1:] == ("tenant", "openai", "trial", 120)
+    assert ProviderQuotaAccumulator.get_pending("tenant") == {("openai", "trial"): 0}
+    assert not fake_redis.smembers(ProviderQuotaAccumulator._TENANTS_KEY)
+
+    ProviderQuotaAccumulator.flush()
+
+    deduct_in_database.assert_called_once()
+
+
+def test_configurations_are_invalidated_once_deductions_are_no_longer_pending(fake_redis, deduct_in_database):
+    ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 100)
+
+    pending_when_invalidated = []
+    with patch("core.helper.provider_quota_accumulator.ProviderConfigurationsCache.invalidate") as invalidate:
+        invalidate.side_effect = lambda tenant_id: pending_when_invalidated.append(
+            ProviderQuotaAccumulator.get_pending(tenant_id)
+        )
+        ProviderQuotaAccumulator.flush()
+
+    invalidate.assert_called_once_with("tenant")
+    assert pending_when_invalidated == [{("openai", "trial"): 0}]
+
+
+def test_deductions_made_while_flushing_are_kept(fake_redis, deduct_in_database):
+    ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 100)
+    deduct_in_database.side_effect = lambda *args: ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 5)
+
+    ProviderQuotaAccumulator.flush()
+
+    assert ProviderQuotaAccumulator.get_pending("tenant") == {("openai", "trial"): 5}
+    assert fake_redis.smembers(ProviderQuotaAccumulator._TENANTS_KEY) == {b"tenant"}
+
+
+def test_failed_flush_keeps_deductions(fake_redis, deduct_in_database):
+    ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 100)
+    deduct_in_database.side_effect = RuntimeError("database is down")
+
+    ProviderQuotaAccumulator.flush()
+
+    assert ProviderQuotaAccumulator.get_pending("tenant") == {("openai", "trial"): 100}
+    assert fake_redis.smembers(ProviderQuotaAccumulator._TENANTS_KEY) == {b"tenant"}
+
+
+def test_deductions_are_written_directly_without_flush_interval(fake_redis, deduct_in_database):
+    with patch("core.helper.provider_quota_accumulator.dify_config.HOSTED_QUOTA_FLUSH_INTERVAL", 0):
+        ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 100)
+
+    assert deduct_in_database.call_args.args[1:] == ("tenant", "openai", "trial", 100)
+    assert ProviderQuotaAccumulator.get_pending("tenant") == {}
+
+
+def test_deductions_are_written_directly_when_redis_fails(deduct_in_database):
+    with patch("core.helper.provider_quota_accumulator.redis_client") as redis_client:
+        redis_client.pipeline.side_effect = ConnectionError
+        ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 100)
+
+    assert deduct_in_database.call_args.args[1:] == ("tenant", "openai", "trial", 100)
+
+
+def test_flush_is_rescheduled_from_the_timer_when_another_process_is_flushing(fake_redis):
+    lock = MagicMock()
+    lock.acquire.side_effect = [False, True]
+    written = threading.Event()
+    with (
+        patch("core.helper.provider_quota_accumulator.Session"),
+        patch("core.helper.provider_quota_accumulator.db"),
+        patch.object(ProviderQuotaAccumulator, "_deduct_in_database", side_effect=lambda *args: written.set()),
+        patch("core.helper.provider_quota_accumulator.dify_config.HOSTED_QUOTA_FLUSH_INTERVAL", 0.01),
+        patch.object(fake_redis, "lock", return_value=lock),
+        Flask(__name__).app_context(),
+    ):
+        ProviderQuotaAccumulator.deduct("tenant", "openai", "trial", 100)
+
+        assert written.wait(timeout=5)
+        timer = ProviderQuotaAccumulator._timer
+        if timer is not None:
+            timer.join(timeout=5)
+
+    assert lock.acquire.call_count == 2
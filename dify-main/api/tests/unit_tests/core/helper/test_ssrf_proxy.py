@@ -1,9 +1,17 @@
+import asyncio
 import secrets
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 
-from core.helper.ssrf_proxy import SSRF_DEFAULT_MAX_RETRIES, STATUS_FORCELIST, make_request
+from core.helper.ssrf_proxy import (
+    SSRF_DEFAULT_MAX_RETRIES,
+    STATUS_FORCELIST,
+    _get_client,
+    make_request,
+    make_request_async,
+)
 
 
 @patch("httpx.Client.request")
@@ -50,3 +58,69 @@ def test_retry_logic_success(mock_request):
     assert response.status_code == 200
     assert mock_request.call_count == SSRF_DEFAULT_MAX_RETRIES + 1
     assert mock_request.call_args_list[0][1].get("method") == "GET"
+
+
+@patch("httpx.Client.request")
+def test_client_is_reused_across_requests(mock_request):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_request.return_value = mock_response
+
+    make_request("GET", "http://example.com")
+    make_request("GET", "http://example.com/other")
+
+    assert _get_client(True) is _get_client(True)
+    assert _get_client(True) is not _get_client(False)
+    assert mock_request.call_count == 2
+
+
+@patch("httpx.AsyncClient.request")
+def test_async_request_retries(mock_request):
+    mock_response_500 = MagicMock()
+    mock_response_500.status_code = 500
+    mock_response_200 = MagicMock()
+    mock_response_200.status_code = 200
+    mock_request.side_effect = [mock_response_500, mock_response_200]
+
+    with patch("core.helper.ssrf_proxy.BACKOFF_FACTOR", 0):
+        response = asyncio.run(make_request_async("GET", "http://example.com", max_retries=1))
+
+    assert response.status_code == 200
+    assert mock_request.call_count == 2
+
+
+def _set_cookie_response(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, headers={"Set-Cookie": "session=secret; Path=/"}, request=request)
+
+
+def test_cookies_are_not_shared_between_requests():
+    sent_cookies = []
+
+    def handle_request(transport, request):
+        sent_cookies.append(request.headers.get("cookie"))
+        return _set_cookie_response(request)
+
+    with patch("httpx.HTTPTransport.handle_request", handle_request):
+        make_request("GET", "http://example.com/login")
+        make_request("GET", "http://example.com/profile")
+        make_request("GET", "http://example.com/profile", headers={"Cookie": "theme=dark"})
+
+    assert sent_cookies == [None, None, "theme=dark"]
+    assert not _get_client(True).cookies
+
+
+def test_async_cookies_are_not_shared_between_requests():
+    sent_cookies = []
+
+    async def handle_async_request(transport, request):
+        sent_cookies.append(request.headers.get("cookie"))
+        return _set_cookie_response(request)
+
+    async def make_requests():
+        await make_request_async("GET", "http://example.com/login")
+        await make_request_async("GET", "http://example.com/profile")
+
+    with patch("httpx.AsyncHTTPTransport.handle_async_request", handle_async_request):
+        asyncio.run(make_requests())
+
+    assert sent_cookies == [None, None]
@@ -0,0 +1,56 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.memory.token_buffer_memory import TokenBufferMemory
+from core.model_runtime.entities import AssistantPromptMessage, PromptMessage, UserPromptMessage
+from models.model import Conversation
+
+
+def _count_tokens(prompt_messages: list[PromptMessage]) -> int:
+    # one token per word plus a per-message overhead, like most chat tokenizers
+    return sum(len(str(prompt_message.content).split()) + 3 for prompt_message in prompt_messages)
+
+
+def _linear_prune(prompt_messages: list[PromptMessage], max_token_limit: int) -> list[PromptMessage]:
+    prompt_messages = list(prompt_messages)
+    while _count_tokens(prompt_messages) > max_token_limit and len(prompt_messages) > 1:
+        prompt_messages.pop(0)
+    return prompt_messages
+
+
+def _memory() -> tuple[TokenBufferMemory, MagicMock]:
+    model_instance = MagicMock()
+    model_instance.get_llm_num_tokens.side_effect = _count_tokens
+    return TokenBufferMemory(conversation=Conversation(), model_instance=model_instance), model_instance
+
+
+def _history(turns: int) -> tuple[list[PromptMessage], list]:
+    prompt_messages: list[PromptMessage] = []
+    known_token_counts: list = []
+    for i in range(turns):
+        prompt_messages.append(UserPromptMessage(content=" ".join(["question"] * (i % 7 + 1))))
+        known_token_counts.append(None)
+        answer = " ".join(["answer"] * (i % 5 * 10 + 2))
+        prompt_messages.append(AssistantPromptMessage(content=answer))
+        known_token_counts.append(len(answer.split()))
+    return prompt_messages, known_token_counts
+
+
+@pytest.mark.parametrize("max_token_limit", [1, 20, 100, 333, 1000, 100000])
+def test_prune_matches_dropping_one_message_at_a_time(max_token_limit):
+    memory, _ = _memory()
+    prompt_messages, known_token_counts = _history(60)
+
+    pruned = memory._prune_prompt_messages(prompt_messages, known_token_counts, max_token_limit)
+
+    assert pruned == _linear_prune(prompt_messages, max_token_limit)
+
+
+def test_prune_counts_tokens_a_few_times():
+    memory, model_instance = _memory()
+    prompt_messages, known_token_counts = _history(200)
+
+    memory._prune_prompt_messages(prompt_messages, known_token_counts, 500)
+
+    assert model_instance.get_llm_num_tokens.call_count <= 12
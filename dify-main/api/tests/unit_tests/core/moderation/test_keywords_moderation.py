@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.app.entities.queue_entities import QueueMessageReplaceEvent
+from core.moderation.keywords.keyword_matcher import KeywordMatcher
+from core.moderation.keywords.keywords import KeywordsModeration
+from core.moderation.output_moderation import ModerationRule, OutputModeration
+
+CONFIG = {
+    "inputs_config": {"enabled": True, "preset_response": "input blocked"},
+    "outputs_config": {"enabled": True, "preset_response": "output blocked"},
+    "keywords": "he\nshe\nhis\nhers\n\nΣΟΦΙΑ",
+}
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("ushers", True),
+        ("HIS hat", True),
+        ("a hisser", True),
+        ("hi s", False),
+        ("", False),
+        ("σοφία", False),
+        ("σοφια", True),
+    ],
+)
+def test_matcher_matches_like_substring_search(text, expected):
+    matcher = KeywordMatcher(CONFIG["keywords"].split("\n"))
+
+    assert matcher.search(text) is expected
+
+
+def test_scanner_finds_keywords_across_chunks():
+    scanner = KeywordMatcher(["forbidden"]).scanner()
+
+    assert scanner.feed("this is for") is False
+    assert scanner.feed("BID") is False
+    assert scanner.feed("den!") is True
+    assert scanner.feed("more") is True
+
+
+def test_matcher_is_cached_by_keywords():
+    assert KeywordMatcher.from_keywords_text("a\nb") is KeywordMatcher.from_keywords_text("a\nb")
+    assert KeywordMatcher.from_keywords_text("a\nb") is not KeywordMatcher.from_keywords_text("a\nc")
+
+
+def test_moderation_for_inputs_and_outputs():
+    moderation = KeywordsModeration(app_id="app", tenant_id="tenant", config=CONFIG)
+
+    assert moderation.moderation_for_inputs({"name": "Hers"}).flagged
+    assert not moderation.moderation_for_inputs({"name": "x"}, query="hi").flagged
+    result = moderation.moderation_for_outputs("ushers")
+    assert result.flagged
+    assert result.preset_response == "output blocked"
+
+
+def test_output_moderation_scans_streamed_tokens():
+    queue_manager = MagicMock(spec=AppQueueManager)
+    output_moderation = OutputModeration(
+        tenant_id="tenant",
+        app_id="app",
+        rule=ModerationRule(type="keywords", config=CONFIG),
+        queue_manager=queue_manager,
+    )
+
+    with patch(
+        "core.moderation.output_moderation.ModerationFactory",
+        side_effect=lambda name, app_id, tenant_id, config: KeywordsModeration(app_id, tenant_id, config),
+    ):
+        output_moderation.append_new_token("Tell us ")
+        assert not output_moderation.should_direct_output()
+        output_moderation.append_new_token("about t")
+        output_moderation.append_new_token("he weather")
+
+    # no polling thread is started, the violation is found in the chunk completing the keyword
+    assert output_moderation.thread is None
+    assert output_moderation.should_direct_output()
+    assert output_moderation.get_final_output() == "output blocked"
+    event = queue_manager.publish.call_args.args[0]
+    assert isinstance(event, QueueMessageReplaceEvent)
+    assert event.text == "output blocked"
@@ -0,0 +1,75 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+
+from core.ops import ops_trace_manager
+from core.ops.ops_trace_manager import TraceQueueManager
+from tasks.ops_trace_task import process_trace_tasks_batch
+
+
+def _trace_task(app_id: str, value: str) -> MagicMock:
+    trace_task = MagicMock()
+    trace_task.app_id = app_id
+    trace_task.execute.return_value.model_dump.return_value = {"value": value}
+    return trace_task
+
+
+def _manager() -> TraceQueueManager:
+    manager = TraceQueueManager.__new__(TraceQueueManager)
+    manager.flask_app = Flask(__name__)
+    return manager
+
+
+def test_batch_is_sent_inline_to_one_task():
+    with (
+        patch.object(ops_trace_manager, "process_trace_tasks_batch") as mock_task,
+        patch.object(ops_trace_manager, "storage") as mock_storage,
+    ):
+        _manager().send_batch_to_celery([_trace_task("app-1", "a"), _trace_task("app-2", "b")])
+
+    mock_storage.save.assert_not_called()
+    mock_task.delay.assert_called_once()
+    traces = mock_task.delay.call_args.args[0]["traces"]
+    assert [(trace["app_id"], trace["trace_info"]) for trace in traces] == [
+        ("app-1", {"value": "a"}),
+        ("app-2", {"value": "b"}),
+    ]
+
+
+def test_large_batch_is_stored_as_one_file():
+    with (
+        patch.object(ops_trace_manager, "process_trace_tasks_batch") as mock_task,
+        patch.object(ops_trace_manager, "storage") as mock_storage,
+        patch.object(ops_trace_manager, "trace_manager_inline_max_bytes", 10),
+    ):
+        _manager().send_batch_to_celery([_trace_task("app-1", "a"), _trace_task("app-1", "b")])
+
+    mock_storage.save.assert_called_once()
+    file_path, payload = mock_storage.save.call_args.args
+    file_id = mock_task.delay.call_args.args[0]["file_id"]
+    assert file_path == f"ops_trace/batch/{file_id}.json"
+    assert len(json.loads(payload)) == 2
+
+
+def test_batch_task_traces_each_app_in_one_call():
+    traces = [
+        {"app_id": "app-1", "trace_info_type": "unknown", "trace_info": {"value": "a"}},
+        {"app_id": "app-2", "trace_info_type": "unknown", "trace_info": {"value": "b"}},
+        {"app_id": "app-1", "trace_info_type": "unknown", "trace_info": {"value": "c"}},
+    ]
+    trace_instances = {"app-1": MagicMock(), "app-2": MagicMock()}
+    trace_instances["app-2"].trace_batch.side_effect = Exception("provider down")
+
+    with (
+        Flask(__name__).app_context(),
+        patch(
+            "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance",
+            side_effect=lambda app_id: trace_instances[app_id],
+        ),
+        patch("tasks.ops_trace_task.redis_client") as mock_redis,
+    ):
+        process_trace_tasks_batch({"traces": traces})
+
+    trace_instances["app-1"].trace_batch.assert_called_once_with([{"value": "a"}, {"value": "c"}])
+    mock_redis.incr.assert_called_once_with("FAILED_OPS_TRACE_app-2")
@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock
+
+from core.plugin.impl.base import BasePluginClient, get_plugin_daemon_session
+
+
+def _stream_response(chunks: list[bytes]) -> MagicMock:
+    response = MagicMock()
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+def test_stream_lines_are_split_across_chunks():
+    response = _stream_response([b'data: {"a"', b": 1}\n\ndata: ", b'{"b": 2}\r\n', b"data: {}"])
+
+    assert list(BasePluginClient._iter_stream_lines(response)) == ['{"a": 1}', '{"b": 2}', "{}"]
+
+
+def test_stream_lines_without_data_prefix_and_multibyte_text():
+    payload = '{"text": "xin chào"}'.encode()
+    response = _stream_response([payload[:17], payload[17:] + b"\n", b"\n"])
+
+    assert list(BasePluginClient._iter_stream_lines(response)) == ['{"text": "xin chào"}']
+
+
+def test_plugin_daemon_session_is_reused():
+    assert get_plugin_daemon_session() is get_plugin_daemon_session()
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+from core.rag.models.document import Document
+
+MODULE = "core.rag.datasource.keyword.jieba.jieba_inverted_index"
+
+
+@pytest.fixture
+def db():
+    with patch(f"{MODULE}.db") as db:
+        yield db
+
+
+@pytest.fixture
+def keyword_index():
+    dataset = MagicMock()
+    dataset.id = "dataset-id"
+    dataset.tenant_id = "tenant-id"
+    dataset.dataset_keyword_table = None
+    return JiebaInvertedIndex(dataset)
+
+
+def _inserted_postings(db) -> list[tuple[str, str]]:
+    postings = []
+    for call in db.session.execute.call_args_list:
+        compiled = call.args[0].compile(dialect=postgresql.dialect())
+        assert "ON CONFLICT (dataset_id, keyword, index_node_id) DO NOTHING" in str(compiled)
+        rows = sum(1 for name in compiled.params if name.startswith("keyword_m"))
+        postings.extend((compiled.params[f"keyword_m{i}"], compiled.params[f"index_node_id_m{i}"]) for i in range(rows))
+    return sorted(postings)
+
+
+def test_add_texts_inserts_one_posting_per_keyword_and_node(db, keyword_index):
+    texts = [
+        Document(page_content="apple banana", metadata={"doc_id": "node-1"}),
+        Document(page_content="apple", metadata={"doc_id": "node-2"}),
+    ]
+
+    keyword_index.add_texts(texts, keywords_list=[["apple", "banana", "apple"], ["apple"]])
+
+    assert _inserted_postings(db) == [("apple", "node-1"), ("apple", "node-2"), ("banana", "node-1")]
+    db.session.commit.assert_called()
+
+
+def test_postings_are_inserted_in_batches(db, keyword_index):
+    with patch(f"{MODULE}._POSTINGS_INSERT_BATCH_SIZE", 2):
+        keyword_index.update_segment_keywords_index("node-1", ["a", "b", "c", "d", "e"])
+
+    assert db.session.execute.call_count == 3
+    assert _inserted_postings(db) == [
+        ("a", "node-1"),
+        ("b", "node-1"),
+        ("c", "node-1"),
+        ("d", "node-1"),
+        ("e", "node-1"),
+    ]
+
+
+def test_search_ranks_nodes_by_matched_keywords(db, keyword_index):
+    db.session.execute.return_value = [SimpleNamespace(index_node_id="node-2"), SimpleNamespace(index_node_id="node-1")]
+
+    with (
+        patch(f"{MODULE}.JiebaKeywordTableHandler") as keyword_table_handler,
+        patch.object(JiebaInvertedIndex, "_get_documents_by_chunk_indices", return_value=[]) as get_documents,
+    ):
+        keyword_table_handler.return_value.extract_keywords.return_value = {"apple", "banana"}
+        keyword_index.search("apple banana", top_k=2, document_ids_filter=["document-id"])
+
+    sql = str(db.session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "GROUP BY dataset_keyword_postings.index_node_id" in sql
+    assert "ORDER BY match_count DESC, dataset_keyword_postings.index_node_id" in sql
+    assert "LIMIT" in sql
+    get_documents.assert_called_once_with(["node-2", "node-1"], ["document-id"])
+
+
+def test_search_without_keywords_reads_nothing(db, keyword_index):
+    with (
+        patch(f"{MODULE}.JiebaKeywordTableHandler") as keyword_table_handler,
+        patch.object(JiebaInvertedIndex, "_get_documents_by_chunk_indices", return_value=[]) as get_documents,
+    ):
+        keyword_table_handler.return_value.extract_keywords.return_value = set()
+        keyword_index.search("?")
+
+    db.session.execute.assert_not_called()
+    get_documents.assert_called_once_with([], None)
+
+
+def test_delete_by_ids_deletes_postings_of_the_nodes(db, keyword_index):
+    keyword_index.delete_by_ids([])
+    db.session.query.assert_not_called()
+
+    keyword_index.delete_by_ids(["node-1", "node-2"])
+
+    db.session.query.return_value.where.return_value.delete.assert_called_once_with(synchronize_session=False)
+    db.session.commit.assert_called_once()
+
+
+def test_legacy_keyword_table_is_migrated_once_under_lock(db, keyword_index):
+    legacy_table = MagicMock()
+    legacy_table.keyword_table_dict = {"__data__": {"table": {"apple": ["node-1", "node-2"], "pear": ["node-1"]}}}
+    legacy_table.data_source_type = "file"
+    keyword_index.dataset.dataset_keyword_table = legacy_table
+
+    with patch(f"{MODULE}.redis_client") as redis_client, patch(f"{MODULE}.storage") as storage:
+        keyword_index.text_exists("node-1")
+        keyword_index.text_exists("node-1")
+
+    redis_client.lock.assert_called_once_with("keyword_indexing_lock_dataset-id", timeout=600)
+    assert _inserted_postings(db) == [("apple", "node-1"), ("apple", "node-2"), ("pear", "node-1")]
+    db.session.delete.assert_called_once_with(legacy_table)
+    storage.delete.assert_called_once_with("keyword_files/tenant-id/dataset-id.txt")
+
+
+def test_legacy_keyword_table_migrated_by_another_worker_is_skipped(db, keyword_index):
+    # the table is gone once the lock is acquired
+    type(keyword_index.dataset).dataset_keyword_table = PropertyMock(side_effect=[MagicMock(), None])
+
+    with patch(f"{MODULE}.redis_client"), patch(f"{MODULE}.storage") as storage:
+        keyword_index.delete_by_ids(["node-1"])
+
+    db.session.execute.assert_not_called()
+    db.session.delete.assert_not_called()
+    storage.delete.assert_not_called()
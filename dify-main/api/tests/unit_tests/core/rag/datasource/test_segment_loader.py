@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.rag.datasource.segment_loader import SegmentLoader
+
+
+@pytest.fixture
+def db():
+    with patch("core.rag.datasource.segment_loader.db") as db:
+        yield db
+
+
+def _where(stmt) -> str:
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    return sql.split("WHERE", 1)[1]
+
+
+def _segment(segment_id: str, dataset_id: str, index_node_id: str):
+    return SimpleNamespace(id=segment_id, dataset_id=dataset_id, index_node_id=index_node_id)
+
+
+def test_segments_are_loaded_in_one_query(db):
+    first = _segment("segment-1", "dataset-1", "node-1")
+    duplicate = _segment("segment-2", "dataset-1", "node-1")
+    other = _segment("segment-3", "dataset-2", "node-1")
+    db.session.scalars.return_value = [first, duplicate, other]
+
+    segments = SegmentLoader.load_segments_by_index_node_ids(["dataset-1", "dataset-2"], ["node-1", "node-1"])
+
+    db.session.scalars.assert_called_once()
+    assert segments == {("dataset-1", "node-1"): first, ("dataset-2", "node-1"): other}
+    where = _where(db.session.scalars.call_args.args[0])
+    assert "document_segments.index_node_id IN ('node-1')" in where
+    assert "document_id" not in where
+    assert "enabled" not in where
+
+
+def test_segments_are_filtered_by_document_and_availability(db):
+    db.session.scalars.return_value = []
+
+    SegmentLoader.load_segments_by_index_node_ids(
+        ["dataset-1"], ["node-1"], document_ids_filter=["document-1"], only_available=True
+    )
+
+    where = _where(db.session.scalars.call_args.args[0])
+    assert "document_segments.document_id IN ('document-1')" in where
+    assert "document_segments.enabled = true" in where
+    assert "document_segments.status = 'completed'" in where
+
+
+@pytest.mark.parametrize(
+    "load",
+    [
+        lambda: SegmentLoader.load_segments_by_index_node_ids([], ["node-1"]),
+        lambda: SegmentLoader.load_segments_by_index_node_ids(["dataset-1"], []),
+        lambda: SegmentLoader.load_available_segments_by_ids(["dataset-1"], []),
+        lambda: SegmentLoader.load_segment_keywords_by_index_node_ids([], ["node-1"]),
+        lambda: SegmentLoader.load_child_chunks_by_index_node_ids([]),
+    ],
+)
+def test_nothing_is_queried_without_ids(db, load):
+    assert load() == {}
+    db.session.scalars.assert_not_called()
+    db.session.execute.assert_not_called()
+
+
+def test_available_segments_are_keyed_by_segment_id(db):
+    segment = _segment("segment-1", "dataset-1", "node-1")
+    db.session.scalars.return_value = [segment]
+
+    segments = SegmentLoader.load_available_segments_by_ids(["dataset-1"], ["segment-1"])
+
+    assert segments == {("dataset-1", "segment-1"): segment}
+    where = _where(db.session.scalars.call_args.args[0])
+    assert "document_segments.enabled = true" in where
+    assert "document_segments.status = 'completed'" in where
+
+
+def test_only_stored_keywords_are_returned(db):
+    db.session.execute.return_value = [
+        SimpleNamespace(dataset_id="dataset-1", index_node_id="node-1", keywords=["apple"]),
+        SimpleNamespace(dataset_id="dataset-1", index_node_id="node-2", keywords=[]),
+        SimpleNamespace(dataset_id="dataset-1", index_node_id="node-3", keywords=None),
+    ]
+
+    keywords = SegmentLoader.load_segment_keywords_by_index_node_ids(["dataset-1"], ["node-1", "node-2", "node-3"])
+
+    assert keywords == {("dataset-1", "node-1"): ["apple"]}
+
+
+def test_first_child_chunk_of_each_index_node_is_kept(db):
+    first = SimpleNamespace(index_node_id="node-1", segment_id="segment-1")
+    duplicate = SimpleNamespace(index_node_id="node-1", segment_id="segment-2")
+    db.session.scalars.return_value = [first, duplicate]
+
+    assert SegmentLoader.load_child_chunks_by_index_node_ids(["node-1"]) == {"node-1": first}
@@ -0,0 +1,132 @@
+import gc
+from unittest.mock import MagicMock, call, patch
+
+from pydantic import BaseModel
+
+from core.rag.datasource.vdb.vector_client_registry import VectorClientRegistry
+
+
+class _Config(BaseModel):
+    host: str
+
+
+class _Owner:
+    pass
+
+
+def _registry(**kwargs) -> VectorClientRegistry:
+    params = {"max_size": 2, "idle_timeout": 600, "health_check_interval": 60}
+    params.update(kwargs)
+    return VectorClientRegistry(**params)
+
+
+def test_client_is_shared_per_config():
+    registry = _registry()
+    create = MagicMock(side_effect=lambda: object())
+
+    first = registry.get_client("pgvector", _Config(host="a"), _Owner(), create)
+    second = registry.get_client("pgvector", _Config(host="a"), _Owner(), create)
+    other = registry.get_client("pgvector", _Config(host="b"), _Owner(), create)
+
+    assert first is second
+    assert other is not first
+    assert create.call_count == 2
+
+
+def test_least_recently_used_client_is_closed_when_full():
+    registry = _registry(max_size=2)
+    close = MagicMock()
+
+    client_a = registry.get_client("qdrant", _Config(host="a"), _Owner(), lambda: "client-a", close=close)
+    registry.get_client("qdrant", _Config(host="b"), _Owner(), lambda: "client-b", close=close)
+    registry.get_client("qdrant", _Config(host="a"), _Owner(), lambda: "unused", close=close)
+    registry.get_client("qdrant", _Config(host="c"), _Owner(), lambda: "client-c", close=close)
+
+    close.assert_called_once_with("client-b")
+    assert registry.get_client("qdrant", _Config(host="a"), _Owner(), lambda: "unused", close=close) is client_a
+
+
+def test_idle_client_is_closed_and_recreated():
+    registry = _registry(idle_timeout=10)
+    close = MagicMock()
+
+    with patch("core.rag.datasource.vdb.vector_client_registry.time.monotonic", return_value=100.0):
+        registry.get_client("weaviate", _Config(host="a"), _Owner(), lambda: "old", close=close)
+    with patch("core.rag.datasource.vdb.vector_client_registry.time.monotonic", return_value=111.0):
+        client = registry.get_client("weaviate", _Config(host="a"), _Owner(), lambda: "new", close=close)
+
+    assert client == "new"
+    close.assert_called_once_with("old")
+
+
+def test_unhealthy_client_is_replaced():
+    registry = _registry(health_check_interval=0)
+    close = MagicMock()
+    health_check = MagicMock(side_effect=ConnectionError("gone"))
+
+    registry.get_client(
+        "elasticsearch", _Config(host="a"), _Owner(), lambda: "old", health_check=health_check, close=close
+    )
+    client = registry.get_client(
+        "elasticsearch", _Config(host="a"), _Owner(), lambda: "new", health_check=health_check, close=close
+    )
+
+    assert client == "new"
+    health_check.assert_called_once_with("old")
+    close.assert_called_once_with("old")
+
+
+def test_clear_closes_every_client():
+    registry = _registry()
+    close = MagicMock()
+    registry.get_client("relyt", _Config(host="a"), _Owner(), lambda: "client-a", close=close)
+    registry.get_client("relyt", _Config(host="b"), _Owner(), lambda: "client-b", close=close)
+
+    registry.clear()
+
+    assert close.call_count == 2
+
+
+def test_client_in_use_is_closed_once_released():
+    registry = _registry(max_size=1)
+    close = MagicMock()
+    owner = _Owner()
+
+    registry.get_client("pgvector", _Config(host="a"), owner, lambda: "client-a", close=close)
+    registry.get_client("pgvector", _Config(host="b"), _Owner(), lambda: "client-b", close=close)
+    registry.get_client("pgvector", _Config(host="c"), _Owner(), lambda: "client-c", close=close)
+
+    close.assert_called_once_with("client-b")
+
+    del owner
+    gc.collect()
+
+    assert close.call_args_list == [call("client-b"), call("client-a")]
+
+
+def test_client_in_use_is_never_idle():
+    registry = _registry(idle_timeout=10)
+    close = MagicMock()
+    owner = _Owner()
+
+    with patch("core.rag.datasource.vdb.vector_client_registry.time.monotonic", return_value=100.0):
+        registry.get_client("weaviate", _Config(host="a"), owner, lambda: "client", close=close)
+    with patch("core.rag.datasource.vdb.vector_client_registry.time.monotonic", return_value=200.0):
+        client = registry.get_client("weaviate", _Config(host="a"), _Owner(), lambda: "unused", close=close)
+
+    assert client == "client"
+    close.assert_not_called()
+
+
+def test_clear_keeps_clients_in_use_open():
+    registry = _registry()
+    close = MagicMock()
+    owner = _Owner()
+    registry.get_client("relyt", _Config(host="a"), owner, lambda: "client-a", close=close)
+
+    registry.clear()
+    close.assert_not_called()
+
+    del owner
+    gc.collect()
+    close.assert_called_once_with("client-a")
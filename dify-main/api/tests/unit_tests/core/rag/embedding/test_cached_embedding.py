@@ -0,0 +1,30 @@
+import pickle
+from unittest.mock import MagicMock, patch
+
+from core.rag.embedding.cached_embedding import CacheEmbedding
+from models.dataset import Embedding
+
+
+def _embedding(hash: str, embedding: bytes) -> Embedding:
+    return Embedding(id=f"id-{hash}", model_name="model", hash=hash, provider_name="provider", embedding=embedding)
+
+
+def test_pickled_embeddings_are_migrated_outside_the_scoped_session():
+    pickled = _embedding("a", pickle.dumps([0.5, 1.0]))
+    current = _embedding("b", Embedding.encode_embedding([0.25]))
+    model_instance = MagicMock(model="model", provider="provider")
+
+    with (
+        patch("core.rag.embedding.cached_embedding.db") as db,
+        patch("core.rag.embedding.cached_embedding.Session") as session_class,
+    ):
+        db.session.scalars.return_value.all.return_value = [pickled, current]
+        cached_embeddings = CacheEmbedding(model_instance)._get_cached_embeddings(["a", "b", "a"])
+
+    assert cached_embeddings == {"a": [0.5, 1.0], "b": [0.25]}
+    db.session.commit.assert_not_called()
+    assert pickled.is_pickled
+    session = session_class.return_value.__enter__.return_value
+    _, parameters = session.execute.call_args.args
+    assert parameters == [{"id": "id-a", "embedding": Embedding.encode_embedding([0.5, 1.0])}]
+    session.commit.assert_called_once()
@@ -0,0 +1,78 @@
+import math
+from unittest.mock import patch
+
+import pytest
+
+from core.rag.models.document import Document
+from core.rag.rerank.keyword_scorer import KeywordScorer
+
+
+def _reference_scores(query_keywords: set[str], documents_keywords: list[set[str]]) -> list[float]:
+    total_documents = len(documents_keywords)
+    all_keywords = set().union(*documents_keywords)
+    keyword_idf = {
+        keyword: math.log((1 + total_documents) / (1 + sum(1 for d in documents_keywords if keyword in d))) + 1
+        for keyword in all_keywords
+    }
+    query_tfidf = {keyword: keyword_idf.get(keyword, 0) for keyword in query_keywords}
+
+    scores = []
+    for document_keywords in documents_keywords:
+        document_tfidf = {keyword: keyword_idf[keyword] for keyword in document_keywords}
+        numerator = sum(query_tfidf[k] * document_tfidf[k] for k in set(query_tfidf) & set(document_tfidf))
+        denominator = math.sqrt(sum(v**2 for v in query_tfidf.values())) * math.sqrt(
+            sum(v**2 for v in document_tfidf.values())
+        )
+        scores.append(numerator / denominator if denominator else 0.0)
+    return scores
+
+
+def _fake_extract_keywords(text: str, max_keywords_per_chunk=10) -> set[str]:
+    return set(text.split())
+
+
+@pytest.fixture
+def scorer():
+    with patch(
+        "core.rag.rerank.keyword_scorer.JiebaKeywordTableHandler.extract_keywords",
+        side_effect=_fake_extract_keywords,
+    ):
+        with patch("core.rag.rerank.keyword_scorer.JiebaKeywordTableHandler.__init__", return_value=None):
+            yield KeywordScorer()
+
+
+def test_score_matches_reference_tfidf(scorer):
+    documents = [
+        Document(page_content="apple banana cherry", metadata={"doc_id": "1", "dataset_id": "d"}),
+        Document(page_content="banana durian", metadata={"doc_id": "2", "dataset_id": "d"}),
+        Document(page_content="egg fig", metadata={"doc_id": "3", "dataset_id": "d"}),
+        Document(page_content="apple apple", metadata={"doc_id": "4", "dataset_id": "d"}),
+    ]
+    with patch("core.rag.rerank.keyword_scorer.SegmentLoader.load_segment_keywords_by_index_node_ids", return_value={}):
+        scores = scorer.score("apple banana zebra", documents)
+
+    expected = _reference_scores(
+        {"apple", "banana", "zebra"}, [_fake_extract_keywords(document.page_content) for document in documents]
+    )
+    assert scores == pytest.approx(expected)
+    assert documents[2].metadata["keywords"] == {"egg", "fig"}
+    assert scores[2] == 0.0
+
+
+def test_score_reuses_stored_segment_keywords(scorer):
+    documents = [
+        Document(page_content="unrelated text", metadata={"doc_id": "1", "dataset_id": "d"}),
+        Document(page_content="apple", metadata={"doc_id": "2", "dataset_id": "d"}),
+    ]
+    with patch(
+        "core.rag.rerank.keyword_scorer.SegmentLoader.load_segment_keywords_by_index_node_ids",
+        return_value={("d", "1"): ["apple", "pear"]},
+    ):
+        scores = scorer.score("apple", documents)
+
+    assert documents[0].metadata["keywords"] == {"apple", "pear"}
+    assert scores == pytest.approx(_reference_scores({"apple"}, [{"apple", "pear"}, {"apple"}]))
+
+
+def test_score_without_documents(scorer):
+    assert scorer.score("apple", []) == []
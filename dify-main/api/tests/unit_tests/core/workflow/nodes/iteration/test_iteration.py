@@ -1,8 +1,11 @@
+import subprocess
+import sys
 import time
 import uuid
 from unittest.mock import patch
 
 from core.app.entities.app_invoke_entities import InvokeFrom
+from core.helper.code_executor.code_executor import CodeExecutor
 from core.variables.segments import ArrayAnySegment, ArrayStringSegment
 from core.workflow.entities.node_entities import NodeRunResult
 from core.workflow.entities.variable_pool import VariablePool
@@ -885,3 +888,83 @@ def test_iteration_run_error_handle():
             assert item.run_result.status == WorkflowNodeExecutionStatus.SUCCEEDED
             assert item.run_result.outputs == {"output": ArrayAnySegment(value=[])}
     assert count == 14
+
+
+def test_iteration_of_single_code_node_executes_code_in_batch():
+    code = "def main(arg1: str) -> dict:\n    return {'result': arg1.upper()}\n"
+    graph_config = {
+        "edges": [
+            {"id": "start-source-iteration-1-target", "source": "start", "target": "iteration-1"},
+            {"id": "iteration-start-source-code-target", "source": "iteration-start", "target": "code"},
+        ],
+        "nodes": [
+            {"data": {"title": "Start", "type": "start", "variables": []}, "id": "start"},
+            {
+                "data": {
+                    "iterator_selector": ["start", "items"],
+                    "output_selector": ["code", "result"],
+                    "output_type": "array[string]",
+                    "start_node_id": "iteration-start",
+                    "title": "iteration",
+                    "type": "iteration",
+                },
+                "id": "iteration-1",
+            },
+            {
+                "data": {"iteration_id": "iteration-1", "title": "iteration-start", "type": "iteration-start"},
+                "id": "iteration-start",
+            },
+            {
+                "data": {
+                    "iteration_id": "iteration-1",
+                    "title": "code",
+                    "type": "code",
+                    "code_language": "python3",
+                    "code": code,
+                    "variables": [{"value_selector": ["iteration-1", "item"], "variable": "arg1"}],
+                    "outputs": {"result": {"type": "string"}},
+                },
+                "id": "code",
+            },
+        ],
+    }
+
+    graph = Graph.init(graph_config=graph_config)
+
+    init_params = GraphInitParams(
+        tenant_id="1",
+        app_id="1",
+        workflow_type=WorkflowType.WORKFLOW,
+        workflow_id="1",
+        graph_config=graph_config,
+        user_id="1",
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.DEBUGGER,
+        call_depth=0,
+    )
+
+    pool = VariablePool(system_variables=SystemVariable(user_id="1", files=[]), user_inputs={})
+    pool.add(["start", "items"], ["a", "b", "c"])
+
+    node_config = graph_config["nodes"][1]
+    iteration_node = IterationNode(
+        id=str(uuid.uuid4()),
+        graph_init_params=init_params,
+        graph=graph,
+        graph_runtime_state=GraphRuntimeState(variable_pool=pool, start_at=time.perf_counter()),
+        config=node_config,
+    )
+    iteration_node.init_node_data(node_config["data"])
+
+    def local_sandbox(language, preload, code):
+        # stand-in for the code execution service
+        completed = subprocess.run([sys.executable, "-c", f"{preload}\n{code}"], capture_output=True, text=True)
+        return completed.stdout
+
+    with patch.object(CodeExecutor, "execute_code", side_effect=local_sandbox) as execute_code:
+        events = list(iteration_node._run())
+
+    run_result = next(event.run_result for event in events if isinstance(event, RunCompletedEvent))
+    assert run_result.status == WorkflowNodeExecutionStatus.SUCCEEDED
+    assert run_result.outputs == {"output": ArrayStringSegment(value=["A", "B", "C"])}
+    assert execute_code.call_count == 1
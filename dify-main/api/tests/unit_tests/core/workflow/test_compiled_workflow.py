@@ -0,0 +1,187 @@
+import json
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.workflow.compiled_workflow import CompiledWorkflow, CompiledWorkflowCache
+from core.workflow.entities.variable_pool import VariablePool
+from core.workflow.graph_engine.entities.graph_init_params import GraphInitParams
+from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
+from core.workflow.nodes.answer.answer_node import AnswerNode
+from core.workflow.nodes.answer.answer_stream_processor import AnswerStreamProcessor
+from core.workflow.nodes.knowledge_retrieval.knowledge_retrieval_node import KnowledgeRetrievalNode
+from core.workflow.nodes.llm.node import LLMNode
+from core.workflow.system_variable import SystemVariable
+from models.enums import UserFrom
+from models.workflow import WorkflowType
+
+GRAPH_CONFIG = {
+    "edges": [{"id": "start-source-answer-target", "source": "start", "target": "answer"}],
+    "nodes": [
+        {"data": {"type": "start", "title": "Start"}, "id": "start"},
+        {"data": {"type": "answer", "title": "Answer", "answer": "{{#start.query#}}"}, "id": "answer"},
+    ],
+}
+
+
+def _workflow(workflow_id: str = "workflow-id", graph_config=GRAPH_CONFIG):
+    return SimpleNamespace(id=workflow_id, graph=json.dumps(graph_config), graph_dict=graph_config)
+
+
+def _answer_node(compiled_workflow: CompiledWorkflow) -> AnswerNode:
+    return _node(compiled_workflow, AnswerNode, GRAPH_CONFIG["nodes"][1])
+
+
+def _node(compiled_workflow: CompiledWorkflow, node_class, config):
+    init_params = GraphInitParams(
+        tenant_id="1",
+        app_id="1",
+        workflow_type=WorkflowType.WORKFLOW,
+        workflow_id="1",
+        graph_config=compiled_workflow.graph_config,
+        user_id="1",
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.DEBUGGER,
+        call_depth=0,
+        compiled_workflow=compiled_workflow,
+    )
+    variable_pool = VariablePool(system_variables=SystemVariable(user_id="aaa", files=[]), user_inputs={})
+    return node_class(
+        id=str(uuid.uuid4()),
+        graph_init_params=init_params,
+        graph=compiled_workflow.get_graph(),
+        graph_runtime_state=GraphRuntimeState(variable_pool=variable_pool, start_at=time.perf_counter()),
+        config=config,
+    )
+
+
+def test_graph_is_built_once_per_root_node():
+    compiled_workflow = CompiledWorkflow(graph_config=GRAPH_CONFIG)
+
+    graph = compiled_workflow.get_graph()
+
+    assert graph.root_node_id == "start"
+    assert compiled_workflow.get_graph() is graph
+    start_graph = compiled_workflow.get_graph(root_node_id="start")
+    assert start_graph is not graph
+    assert compiled_workflow.get_graph(root_node_id="start") is start_graph
+
+
+def test_answer_route_state_is_not_shared_between_runs():
+    graph_config = {
+        "edges": [
+            {"id": "start-source-first-target", "source": "start", "target": "first"},
+            {"id": "first-source-second-target", "source": "first", "target": "second"},
+        ],
+        "nodes": [
+            {"data": {"type": "start", "title": "Start"}, "id": "start"},
+            {"data": {"type": "answer", "title": "First", "answer": "first"}, "id": "first"},
+            {"data": {"type": "answer", "title": "Second", "answer": "{{#start.query#}}"}, "id": "second"},
+        ],
+    }
+    graph = CompiledWorkflow(graph_config=graph_config).get_graph()
+    variable_pool = VariablePool(system_variables=SystemVariable(user_id="aaa", files=[]), user_inputs={})
+
+    first_run = AnswerStreamProcessor(graph, variable_pool)
+    second_run = AnswerStreamProcessor(graph, variable_pool)
+    first_run.generate_routes.answer_dependencies["second"].remove("first")
+
+    assert second_run.generate_routes.answer_dependencies["second"] == ["first"]
+    assert graph.answer_stream_generate_routes.answer_dependencies["second"] == ["first"]
+    assert second_run.generate_routes.answer_generate_route is graph.answer_stream_generate_routes.answer_generate_route
+
+
+def test_node_data_is_validated_once():
+    compiled_workflow = CompiledWorkflow(graph_config=GRAPH_CONFIG)
+    first, second = _answer_node(compiled_workflow), _answer_node(compiled_workflow)
+    assert first.compiled_workflow is compiled_workflow
+
+    validated = []
+    init_node_data = AnswerNode.init_node_data
+
+    def validate(node, data):
+        validated.append(node)
+        init_node_data(node, data)
+
+    with patch.object(AnswerNode, "init_node_data", validate):
+        compiled_workflow.init_node_data(first, GRAPH_CONFIG["nodes"][1])
+        compiled_workflow.init_node_data(second, GRAPH_CONFIG["nodes"][1])
+
+    assert validated == [first]
+    assert second.get_base_node_data() is first.get_base_node_data()
+    assert second.get_base_node_data().title == "Answer"
+
+
+def test_stop_sequences_are_kept_in_cached_node_data():
+    model = {
+        "provider": "openai",
+        "name": "gpt-4o",
+        "mode": "chat",
+        "completion_params": {"temperature": 0.7, "stop": ["\n"]},
+    }
+    config = {
+        "id": "llm",
+        "data": {"type": "llm", "title": "LLM", "model": model, "prompt_template": [], "context": {"enabled": False}},
+    }
+    compiled_workflow = CompiledWorkflow(graph_config={**GRAPH_CONFIG, "nodes": [*GRAPH_CONFIG["nodes"], config]})
+
+    with (
+        patch("core.workflow.nodes.llm.llm_utils.ModelManager"),
+        patch("core.workflow.nodes.knowledge_retrieval.knowledge_retrieval_node.ModelManager"),
+        patch("core.workflow.nodes.llm.llm_utils.ModelConfigWithCredentialsEntity", SimpleNamespace),
+        patch(
+            "core.workflow.nodes.knowledge_retrieval.knowledge_retrieval_node.ModelConfigWithCredentialsEntity",
+            SimpleNamespace,
+        ),
+    ):
+        for _ in range(2):
+            node = _node(compiled_workflow, LLMNode, config)
+            compiled_workflow.init_node_data(node, config)
+            model_instance, model_config = LLMNode._fetch_model_config(
+                node_data_model=node._node_data.model, tenant_id="1"
+            )
+            LLMNode.invoke_llm(
+                node_data_model=node._node_data.model,
+                model_instance=model_instance,
+                prompt_messages=[],
+                stop=model_config.stop,
+                user_id="1",
+                structured_output_enabled=False,
+                file_saver=MagicMock(),
+                file_outputs=[],
+                node_id=node.node_id,
+            )
+            _, retrieval_model_config = KnowledgeRetrievalNode.get_model_config(MagicMock(), node._node_data.model)
+
+            assert model_config.stop == retrieval_model_config.stop == ["\n"]
+            assert model_config.parameters == retrieval_model_config.parameters == {"temperature": 0.7}
+            invoke_llm = model_instance.invoke_llm.call_args.kwargs
+            assert invoke_llm["model_parameters"] == {"temperature": 0.7}
+            assert invoke_llm["stop"] == ["\n"]
+
+
+def test_cache_reuses_compiled_workflow_until_graph_changes():
+    cache = CompiledWorkflowCache(max_size=2)
+
+    compiled_workflow = cache.get(_workflow())
+
+    assert cache.get(_workflow()) is compiled_workflow
+    changed_graph = {**GRAPH_CONFIG, "edges": []}
+    assert cache.get(_workflow(graph_config=changed_graph)) is not compiled_workflow
+
+
+def test_cache_is_bounded():
+    cache = CompiledWorkflowCache(max_size=1)
+
+    compiled_workflow = cache.get(_workflow("a"))
+    cache.get(_workflow("b"))
+
+    assert cache.get(_workflow("a")) is not compiled_workflow
+
+
+def test_cache_can_be_disabled():
+    cache = CompiledWorkflowCache(max_size=0)
+
+    assert cache.get(_workflow()) is not cache.get(_workflow())
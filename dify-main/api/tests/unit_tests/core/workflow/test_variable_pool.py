@@ -76,6 +76,36 @@ def test_use_long_selector(pool):
     assert result.value == "test_value"
 
 
+def test_fork_shares_variables_and_keeps_writes_local(pool):
+    pool.add(("node_1", "documents"), ["doc"] * 3)
+    pool.add(("node_2", "text"), "parent")
+
+    forked = pool.fork()
+    forked.add(("node_2", "text"), "forked")
+    forked.add(("node_3", "text"), "new")
+    pool.add(("node_1", "count"), 3)
+
+    assert forked.get(("node_1", "documents")) is pool.get(("node_1", "documents"))
+    assert pool.get(("node_2", "text")).value == "parent"
+    assert forked.get(("node_2", "text")).value == "forked"
+    assert pool.get(("node_3", "text")) is None
+    assert forked.get(("node_1", "count")) is None
+    assert forked.get(("sys", "user_id")).value == "test_user_id"
+
+
+def test_fork_keeps_removals_local(pool):
+    pool.add(("node_1", "a"), "a")
+    pool.add(("node_1", "b"), "b")
+
+    forked = pool.fork()
+    forked.remove(("node_1", "a"))
+    pool.remove(("node_1",))
+
+    assert pool.get(("node_1", "b")) is None
+    assert forked.get(("node_1", "a")) is None
+    assert forked.get(("node_1", "b")).value == "b"
+
+
 class TestVariablePool:
     def test_constructor(self):
         # Test with minimal required SystemVariable
@@ -279,6 +279,20 @@ def test_build_segment_array_any_with_nested_arrays():
     assert segment.value_type == SegmentType.ARRAY_ANY
 
 
+def test_build_segment_array_number_mixed_integers_and_floats():
+    """Test building ArrayNumberSegment from list mixing integers and floats."""
+    values = [1, 2.5, 3]
+    segment = variable_factory.build_segment(values)
+    assert isinstance(segment, ArrayNumberSegment)
+    assert segment.value == values
+
+
+def test_build_segment_array_with_unsupported_nested_value():
+    """Test building a segment from a list with an unsupported value in a nested list."""
+    with pytest.raises(ValueError, match="not supported value"):
+        variable_factory.build_segment(["string", [1, [object()]]])
+
+
 def test_build_segment_array_any_mixed_with_files():
     """Test building ArrayAnySegment from list with files and other types."""
     file = File(
@@ -0,0 +1,46 @@
+import json
+from unittest.mock import patch
+
+from middlewares.chat_logging_middleware import ChatLoggingMiddleware
+
+
+def _event(data: dict) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+
+def test_streamed_answer_is_logged_when_stream_ends():
+    stream = iter(
+        [
+            _event({"event": "message", "answer": "Hel", "conversation_id": "c-1"}),
+            _event({"event": "message", "answer": "lo"}),
+        ]
+    )
+
+    with patch("middlewares.chat_logging_middleware.logging_service") as logging_service:
+        chunks = list(ChatLoggingMiddleware()._log_streamed_chat_interaction(stream, 0, None, {"status_code": 200}))
+
+    assert len(chunks) == 2
+    kwargs = logging_service.log_chat_interaction.call_args.kwargs
+    assert kwargs["output_text"] == "Hello"
+    assert kwargs["conversation_id"] == "c-1"
+    assert kwargs["status"] == "success"
+
+
+def test_wrapped_stream_is_closed_when_client_disconnects():
+    closed = []
+
+    def stream():
+        try:
+            yield _event({"event": "message", "answer": "Hel"})
+            yield _event({"event": "message", "answer": "lo"})
+        finally:
+            closed.append(True)
+
+    with patch("middlewares.chat_logging_middleware.logging_service") as logging_service:
+        inner = stream()
+        wrapped = ChatLoggingMiddleware()._log_streamed_chat_interaction(inner, 0, None, {"status_code": 200})
+        next(wrapped)
+        wrapped.close()
+
+    assert closed == [True]
+    assert logging_service.log_chat_interaction.call_args.kwargs["output_text"] == "Hel"
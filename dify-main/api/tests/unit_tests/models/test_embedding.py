@@ -0,0 +1,29 @@
+import pickle
+
+import pytest
+
+from models.dataset import Embedding
+
+
+def test_embedding_is_stored_as_float32():
+    embedding = Embedding(model_name="model", hash="hash", provider_name="provider")
+    embedding.set_embedding([0.5, -0.25, 1.0])
+
+    assert not embedding.is_pickled
+    assert embedding.embedding.startswith(Embedding.FLOAT32_HEADER)
+    assert len(embedding.embedding) == len(Embedding.FLOAT32_HEADER) + 3 * 4
+    assert embedding.get_embedding() == [0.5, -0.25, 1.0]
+
+
+def test_embedding_reads_legacy_pickle_format():
+    vector = [0.1, 0.2, 0.3]
+    embedding = Embedding(model_name="model", hash="hash", provider_name="provider")
+    embedding.embedding = pickle.dumps(vector, protocol=pickle.HIGHEST_PROTOCOL)
+
+    assert embedding.is_pickled
+    assert embedding.get_embedding() == vector
+
+    embedding.set_embedding(embedding.get_embedding())
+
+    assert not embedding.is_pickled
+    assert embedding.get_embedding() == pytest.approx(vector, rel=1e-6)
@@ -0,0 +1,119 @@
+"""
+Unit tests for the write-behind implementation of WorkflowNodeExecutionRepository.
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.repositories.write_behind_workflow_node_execution_repository import (
+    WriteBehindWorkflowNodeExecutionRepository,
+)
+from core.workflow.entities.workflow_node_execution import WorkflowNodeExecution, WorkflowNodeExecutionStatus
+from core.workflow.nodes.enums import NodeType
+from models.account import Account
+from models.workflow import WorkflowNodeExecutionTriggeredFrom
+
+
+@pytest.fixture
+def session():
+    session = MagicMock(spec=Session)
+    session.__enter__ = MagicMock(return_value=session)
+    session.__exit__ = MagicMock(return_value=None)
+    session_factory = MagicMock(spec=sessionmaker)
+    session_factory.return_value = session
+    return session, session_factory
+
+
+@pytest.fixture
+def repository(session):
+    _, session_factory = session
+    user = Account()
+    user.id = "test-user-id"
+    user._current_tenant = MagicMock()
+    user._current_tenant.id = "test-tenant"
+    with patch("core.repositories.write_behind_workflow_node_execution_repository.dify_config") as mock_config:
+        mock_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_BATCH_SIZE = 3
+        mock_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_FLUSH_INTERVAL = 60
+        yield WriteBehindWorkflowNodeExecutionRepository(
+            session_factory=session_factory,
+            user=user,
+            app_id="test-app",
+            triggered_from=WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN,
+        )
+
+
+def _execution(execution_id: str, status=WorkflowNodeExecutionStatus.RUNNING) -> WorkflowNodeExecution:
+    return WorkflowNodeExecution(
+        id=execution_id,
+        node_execution_id=f"node-execution-{execution_id}",
+        workflow_id="test-workflow-id",
+        workflow_execution_id="test-workflow-run-id",
+        index=1,
+        node_id="test-node-id",
+        node_type=NodeType.LLM,
+        title="Test Node",
+        status=status,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+def _written_rows(session_obj) -> list[list[dict]]:
+    batches = []
+    for call in session_obj.execute.call_args_list:
+        compiled = call.args[0].compile(dialect=postgresql.dialect())
+        batches.append(compiled.params)
+    return batches
+
+
+def test_updates_of_one_execution_are_coalesced(repository, session):
+    session_obj, _ = session
+    execution = _execution("1")
+    repository.save(execution)
+    execution.status = WorkflowNodeExecutionStatus.SUCCEEDED
+    repository.save(execution)
+
+    session_obj.execute.assert_not_called()
+
+    repository.flush()
+
+    session_obj.execute.assert_called_once()
+    params = _written_rows(session_obj)[0]
+    assert params["id_m0"] == "1"
+    assert params["status_m0"] == WorkflowNodeExecutionStatus.SUCCEEDED
+    assert "id_m1" not in params
+    session_obj.commit.assert_called_once()
+
+
+def test_flushes_when_batch_is_full(repository, session):
+    session_obj, _ = session
+    for i in range(3):
+        repository.save(_execution(str(i)))
+
+    session_obj.execute.assert_called_once()
+    assert repository._pending == {}
+
+
+def test_reads_flush_buffered_executions(repository, session):
+    session_obj, _ = session
+    repository.save(_execution("1"))
+    session_obj.scalars.return_value.all.return_value = []
+
+    repository.get_by_workflow_run("test-workflow-run-id")
+
+    session_obj.execute.assert_called_once()
+    session_obj.scalars.assert_called_once()
+
+
+def test_failed_flush_keeps_rows_buffered(repository, session):
+    session_obj, _ = session
+    repository.save(_execution("1"))
+    session_obj.execute.side_effect = Exception("database unavailable")
+
+    with pytest.raises(Exception, match="database unavailable"):
+        repository.flush()
+
+    assert list(repository._pending) == ["1"]
@@ -0,0 +1,120 @@
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+from sqlalchemy.orm import Session
+
+from models.account import Account, Tenant, TenantAccountRole
+from models.model import ApiToken
+from services.api_token_service import ApiTokenAuthCache, ApiTokenUsageRecorder
+
+
+def _api_token() -> ApiToken:
+    api_token = ApiToken()
+    api_token.id = "token-id"
+    api_token.app_id = "app-id"
+    api_token.tenant_id = "tenant-id"
+    api_token.type = "app"
+    api_token.token = "app-secret"
+    api_token.last_used_at = None
+    api_token.created_at = datetime(2024, 1, 1, 12, 30)
+    return api_token
+
+
+def test_model_round_trip():
+    data = ApiTokenAuthCache._dump_model(_api_token())
+    loaded = ApiTokenAuthCache._load_model(ApiToken, json.loads(json.dumps(data)))
+
+    assert loaded.id == "token-id"
+    assert loaded.token == "app-secret"
+    assert loaded.created_at == datetime(2024, 1, 1, 12, 30)
+    assert loaded.last_used_at is None
+
+
+def test_account_secrets_are_not_cached():
+    account = Account(name="owner", email="owner@example.com", password="hashed", password_salt="salt")
+    account.id = "account-id"
+    data = ApiTokenAuthCache._dump_model(account, exclude=ApiTokenAuthCache._ACCOUNT_EXCLUDED_COLUMNS)
+
+    assert "password" not in data
+    assert "password_salt" not in data
+    assert data["email"] == "owner@example.com"
+
+
+def test_cached_api_token_is_read_from_redis_once():
+    redis = MagicMock()
+    redis.get.return_value = json.dumps(ApiTokenAuthCache._dump_model(_api_token())).encode()
+    with patch("services.api_token_service.redis_client", redis):
+        ApiTokenAuthCache.invalidate_api_token("app-secret", "app")
+        first = ApiTokenAuthCache.get_api_token("app-secret", "app")
+        second = ApiTokenAuthCache.get_api_token("app-secret", "app")
+
+    assert first is not None
+    assert second is not None
+    assert second.tenant_id == "tenant-id"
+    redis.get.assert_called_once()
+    # the raw token is never part of the key
+    assert "app-secret" not in redis.get.call_args.args[0]
+
+
+def test_redis_errors_are_cache_misses():
+    redis = MagicMock()
+    redis.get.side_effect = Exception("redis down")
+    with patch("services.api_token_service.redis_client", redis):
+        ApiTokenAuthCache.invalidate_api_token("missing-secret", "app")
+        assert ApiTokenAuthCache.get_api_token("missing-secret", "app") is None
+
+
+def test_cached_tenant_owner_is_attached_to_session():
+    tenant = Tenant(name="workspace")
+    tenant.id = "tenant-id"
+    tenant.status = "normal"
+    account = Account(name="owner", email="owner@example.com")
+    account.id = "account-id"
+
+    redis = MagicMock()
+    with patch("services.api_token_service.redis_client", redis):
+        ApiTokenAuthCache.set_tenant_owner(tenant, account)
+        session = Session()
+        with patch("services.api_token_service.db") as mock_db:
+            mock_db.session = session
+            cached = ApiTokenAuthCache.get_tenant_owner("tenant-id")
+        ApiTokenAuthCache.invalidate_tenant("tenant-id")
+
+    assert cached is not None
+    cached_tenant, cached_account = cached
+    assert cached_tenant in session
+    assert cached_account in session
+    assert cached_account.current_tenant is cached_tenant
+    assert cached_account.current_role == TenantAccountRole.OWNER
+    assert not session.dirty
+
+
+def test_usage_is_recorded_once_per_minute_and_flushed_in_one_update():
+    redis = MagicMock()
+    redis.set.return_value = True
+    app = Flask(__name__)
+    with (
+        patch("services.api_token_service.redis_client", redis),
+        patch.object(ApiTokenUsageRecorder, "_timer", MagicMock()),
+        patch.object(ApiTokenUsageRecorder, "_pending", set()),
+        patch.object(ApiTokenUsageRecorder, "_recorded_at", {}),
+    ):
+        first = _api_token()
+        second = _api_token()
+        second.id = "other-token-id"
+        with app.app_context():
+            for api_token in (first, first, second, first):
+                ApiTokenUsageRecorder.record(api_token)
+
+        assert redis.set.call_count == 2
+        assert ApiTokenUsageRecorder._pending == {"token-id", "other-token-id"}
+
+        with patch("services.api_token_service.Session") as mock_session, patch("services.api_token_service.db"):
+            ApiTokenUsageRecorder.flush(app)
+
+        session = mock_session.return_value.__enter__.return_value
+        session.execute.assert_called_once()
+        session.commit.assert_called_once()
+        assert not ApiTokenUsageRecorder._pending
@@ -0,0 +1,58 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytz
+from sqlalchemy.dialects import postgresql
+
+from services.app_statistic_service import AppStatisticService
+
+
+def _facts_query(timezone: str, start, end, rolled_up_to):
+    with patch.object(AppStatisticService, "get_rolled_up_to", return_value=rolled_up_to):
+        return AppStatisticService.message_facts_query("app-id", timezone, start, end)
+
+
+def test_only_messages_are_scanned_without_rollups():
+    sql, args = _facts_query("UTC", None, None, None)
+
+    assert "app_statistic_hourly_rollups" not in sql
+    assert args == {"app_id": "app-id"}
+
+
+def test_whole_hours_below_watermark_are_read_from_rollups():
+    start = pytz.utc.localize(datetime(2025, 1, 1, 8, 30))
+    end = pytz.utc.localize(datetime(2025, 1, 3, 16, 45))
+
+    sql, args = _facts_query("Asia/Shanghai", start, end, datetime(2025, 1, 2, 12))
+
+    assert "UNION ALL" in sql
+    assert "(created_at < :rollup_from OR created_at >= :rollup_to)" in sql
+    # the partial first hour and everything after the watermark are scanned in messages
+    assert args["rollup_from"] == datetime(2025, 1, 1, 9)
+    assert args["rollup_to"] == datetime(2025, 1, 2, 12)
+    assert args["start"] == start
+    assert args["end"] == end
+
+
+def test_range_end_before_watermark_limits_rollups():
+    end = pytz.utc.localize(datetime(2025, 1, 1, 10, 15))
+
+    _, args = _facts_query("UTC", None, end, datetime(2025, 1, 2))
+
+    assert args["rollup_from"] == datetime.min
+    assert args["rollup_to"] == datetime(2025, 1, 1, 10)
+
+
+def test_partial_hour_timezones_do_not_use_rollups():
+    sql, _ = _facts_query("Asia/Kolkata", None, None, datetime(2025, 1, 2))
+
+    assert "app_statistic_hourly_rollups" not in sql
+
+
+def test_rollup_statement_upserts_hourly_totals():
+    stmt = AppStatisticService._rollup_statement(datetime(2025, 1, 1), datetime(2025, 1, 2))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("INSERT INTO app_statistic_hourly_rollups")
+    assert "GROUP BY messages.app_id, date_trunc(" in sql
+    assert "ON CONFLICT (app_id, hour) DO UPDATE SET message_count = excluded.message_count" in sql
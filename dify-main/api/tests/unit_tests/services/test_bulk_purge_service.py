@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from models.model import Message, MessageFeedback, MessageFile
+from services.bulk_purge_service import BulkPurgeService, PurgeCascade
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _engine(id_batches: list[list[str]]):
+    """Engine whose id queries return the given batches and whose deletes delete one row per id."""
+    engine = MagicMock()
+    selects = []
+    deletes = []
+
+    read_conn = engine.connect.return_value.__enter__.return_value
+
+    def read(stmt):
+        selects.append(stmt)
+        batch = id_batches[len(selects) - 1] if len(selects) <= len(id_batches) else []
+        return MagicMock(all=MagicMock(return_value=[SimpleNamespace(id=i, app_id="app") for i in batch]))
+
+    read_conn.execute.side_effect = read
+
+    write_conn = engine.begin.return_value.__enter__.return_value
+
+    def write(stmt):
+        deletes.append(stmt)
+        return MagicMock(rowcount=len(stmt.compile().params["ids"]))
+
+    write_conn.execute.side_effect = write
+    return engine, selects, deletes
+
+
+def test_purge_deletes_batches_with_cascades_first():
+    engine, selects, deletes = _engine([["1", "2"], ["3"]])
+    service = BulkPurgeService(batch_size=2, engine=engine)
+
+    stats = service.purge(
+        Message,
+        Message.app_id == "app",
+        cascades=(PurgeCascade(MessageFeedback, "message_id"), PurgeCascade(MessageFile, "message_id")),
+    )
+
+    assert stats.batches == 2
+    assert stats.deleted == {"message_feedbacks": 3, "message_files": 3, "messages": 3}
+    assert [_compile(stmt).split(" WHERE")[0] for stmt in deletes[:3]] == [
+        "DELETE FROM message_feedbacks",
+        "DELETE FROM message_files",
+        "DELETE FROM messages",
+    ]
+    assert "messages.id = ANY (CAST(" in _compile(deletes[2])
+    # each batch is one transaction
+    assert engine.begin.call_count == 2
+
+
+def test_purge_uses_keyset_pagination():
+    engine, selects, _ = _engine([["1", "2"], ["3", "4"]])
+    BulkPurgeService(batch_size=2, engine=engine).purge(Message, Message.app_id == "app")
+
+    assert len(selects) == 3
+    assert "messages.id >" not in _compile(selects[0])
+    assert "messages.id >" in _compile(selects[1])
+    assert selects[2].compile().params["id_1"] == "4"
+
+
+def test_select_ids_filters_batch():
+    engine, _, deletes = _engine([["1", "2", "3"]])
+    stats = BulkPurgeService(batch_size=3, engine=engine).purge(
+        Message,
+        Message.app_id == "app",
+        columns=(Message.app_id,),
+        select_ids=lambda rows: [row.id for row in rows if row.id != "2"],
+    )
+
+    assert stats.deleted == {"messages": 2}
+    assert deletes[0].compile().params["ids"] == ["1", "3"]
@@ -0,0 +1,73 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+
+from services.chat_log_writer import ChatLogWriter
+
+
+def _writer(**kwargs) -> ChatLogWriter:
+    params = {"max_queue_size": 10, "batch_size": 3, "flush_interval": 0.01, "enqueue_timeout": 0}
+    params.update(kwargs)
+    writer = ChatLogWriter(**params)
+    writer.init_app(Flask(__name__))
+    return writer
+
+
+def test_rows_are_written_in_batches():
+    writer = _writer(batch_size=3)
+    with patch.object(writer, "_ensure_started"):
+        for i in range(5):
+            assert writer.enqueue({"app_id": str(i)})
+
+    with patch("services.chat_log_writer.db") as mock_db:
+        writer._stopped.set()
+        writer._run()
+
+    batches = [
+        [{key: value for key, value in row.items() if key != "created_at"} for row in call.args[1]]
+        for call in mock_db.session.execute.call_args_list
+    ]
+    assert batches == [[{"app_id": "0"}, {"app_id": "1"}, {"app_id": "2"}], [{"app_id": "3"}, {"app_id": "4"}]]
+    assert mock_db.session.commit.call_count == 2
+
+
+def test_rows_are_dropped_when_queue_is_full():
+    writer = _writer(max_queue_size=2)
+    with patch.object(writer, "_ensure_started"):
+        results = [writer.enqueue({"app_id": str(i)}) for i in range(4)]
+
+    assert results == [True, True, False, False]
+    assert writer.dropped_count == 2
+
+
+def test_failed_insert_is_counted_as_dropped():
+    writer = _writer()
+    with patch("services.chat_log_writer.db") as mock_db:
+        mock_db.session.execute = MagicMock(side_effect=Exception("db down"))
+        writer._write([{"app_id": "a"}, {"app_id": "b"}])
+
+    mock_db.session.rollback.assert_called_once()
+    assert writer.dropped_count == 2
+
+
+def test_shutdown_flushes_queued_rows():
+    writer = _writer()
+    with patch("services.chat_log_writer.db") as mock_db:
+        writer.enqueue({"app_id": "a"})
+        writer.shutdown()
+
+    mock_db.session.execute.assert_called_once()
+    assert writer._queue.empty()
+
+
+def test_rows_are_stamped_when_queued():
+    writer = _writer()
+    row = {"app_id": "a"}
+    with patch.object(writer, "_ensure_started"):
+        writer.enqueue(row)
+
+    queued = writer._queue.get_nowait()
+    assert isinstance(queued["created_at"], datetime)
+    assert queued["created_at"].tzinfo is not None
+    assert row == {"app_id": "a"}
@@ -1,9 +1,17 @@
-from unittest.mock import MagicMock
+from datetime import datetime
+from unittest.mock import MagicMock, patch
 
 import pytest
-
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.repositories.write_behind_workflow_node_execution_repository import (
+    WriteBehindWorkflowNodeExecutionRepository,
+)
+from core.workflow.entities.workflow_node_execution import WorkflowNodeExecution, WorkflowNodeExecutionStatus
+from core.workflow.nodes.enums import NodeType
+from models.account import Account
 from models.model import App
-from models.workflow import Workflow
+from models.workflow import Workflow, WorkflowNodeExecutionTriggeredFrom
 from services.workflow_service import WorkflowService
 
 
@@ -161,3 +169,63 @@ class TestWorkflowService:
         assert workflows == []
         assert has_more is False
         mock_session.scalars.assert_called_once()
+
+    def test_run_draft_workflow_node_reads_back_buffered_execution(self, workflow_service, mock_app):
+        session = MagicMock(spec=Session)
+        session.__enter__ = MagicMock(return_value=session)
+        session.__exit__ = MagicMock(return_value=None)
+        session_factory = MagicMock(spec=sessionmaker, return_value=session)
+        account = Account()
+        account.id = "account-id-1"
+        account._current_tenant = MagicMock(id="tenant-id-1")
+        repository = WriteBehindWorkflowNodeExecutionRepository(
+            session_factory=session_factory,
+            user=account,
+            app_id=mock_app.id,
+            triggered_from=WorkflowNodeExecutionTriggeredFrom.SINGLE_STEP,
+        )
+        node_execution = WorkflowNodeExecution(
+            id="execution-id-1",
+            workflow_id="workflow-id-1",
+            index=1,
+            node_id="node-id-1",
+            node_type=NodeType.LLM,
+            title="LLM",
+            status=WorkflowNodeExecutionStatus.SUCCEEDED,
+            created_at=datetime(2025, 1, 1),
+        )
+        draft_workflow = MagicMock(spec=Workflow)
+        draft_workflow.id = "workflow-id-1"
+        draft_workflow.environment_variables = []
+        draft_workflow.get_node_config_by_id.return_value = {"id": "node-id-1", "data": {"type": "llm"}}
+        draft_workflow.get_enclosing_node_type_and_id.return_value = None
+
+        def get_execution_by_id(execution_id):
+            # the buffered execution must be written before it is read back
+            session.execute.assert_called_once()
+            return MagicMock(id=execution_id, node_id="node-id-1", node_type=NodeType.LLM.value)
+
+        workflow_service._node_execution_service_repo = MagicMock()
+        workflow_service._node_execution_service_repo.get_execution_by_id.side_effect = get_execution_by_id
+
+        with (
+            patch("services.workflow_service.db"),
+            patch("services.workflow_service.Session"),
+            patch("services.workflow_service.WorkflowDraftVariableService"),
+            patch("services.workflow_service.DraftVarLoader"),
+            patch("services.workflow_service.WorkflowEntry"),
+            patch("services.workflow_service.DraftVariableSaver"),
+            patch("services.workflow_service.DifyCoreRepositoryFactory") as repository_factory,
+            patch.object(workflow_service, "_handle_node_run_result", return_value=node_execution),
+        ):
+            repository_factory.create_workflow_node_execution_repository.return_value = repository
+            result = workflow_service.run_draft_workflow_node(
+                app_model=mock_app,
+                draft_workflow=draft_workflow,
+                node_id="node-id-1",
+                user_inputs={},
+                account=account,
+            )
+
+        assert result.id == "execution-id-1"
+        session.commit.assert_called_once()